@@ -3,14 +3,36 @@
 ``sepal_ui`` is a lib designed to create elegant python based dashboard in the SEPAL environment. It is designed on top of the amazing ``ipyvuetify`` library and will help developer to easily create interface for their workflows. By using this libraries, you'll ensure a robust and unified interface for your scripts and a easy and complete integration into the SEPAL dashboard of application.
 """
 
+from typing import TYPE_CHECKING
+
 from sepal_ui.conf import config as config
 from sepal_ui.conf import config_file as config_file
-from sepal_ui.frontend.styles import SepalColor
-from sepal_ui.frontend.styles import get_theme as get_theme
+from sepal_ui.scripts import lazy
 
 __author__ = """Pierrick Rambaud"""
 __email__ = "pierrick.rambaud49@gmail.com"
 __version__ = "2.17.0"
 
-color = SepalColor()
-'color: the colors of sepal. members are in the following list: "main, darker, bg, primary, accent, secondary, success, info, warning, error, menu". They will render according to the selected theme.'
+# the styles (and the sub-packages) are only loaded when requested as they import
+# ipyvuetify, ee and all the heavy dependencies of the lib.
+__getattr__, __dir__, _ = lazy.attach(
+    __name__,
+    {
+        "aoi": [],
+        "frontend": [],
+        "mapping": [],
+        "message": [],
+        "model": [],
+        "planetapi": [],
+        "scripts": [],
+        "sepalwidgets": [],
+        "translator": [],
+        "frontend.styles": ["SepalColor", "color", "get_theme"],
+    },
+)
+__all__ = ["SepalColor", "color", "config", "config_file", "get_theme"]
+
+if TYPE_CHECKING:
+    from sepal_ui.frontend.styles import SepalColor
+    from sepal_ui.frontend.styles import color as color
+    from sepal_ui.frontend.styles import get_theme as get_theme
@@ -12,6 +12,21 @@ Example:
         aoi.AoiTile(gee=False)
 """
 
-from .aoi_model import *
-from .aoi_tile import *
-from .aoi_view import *
+from typing import TYPE_CHECKING
+
+from sepal_ui.scripts import lazy
+
+# the modules are only imported when one of their member is requested
+__getattr__, __dir__, __all__ = lazy.attach(
+    __name__,
+    {
+        "aoi_model": ["AoiModel"],
+        "aoi_tile": ["AoiTile"],
+        "aoi_view": ["AoiView", "select_methods"],
+    },
+)
+
+if TYPE_CHECKING:
+    from .aoi_model import *
+    from .aoi_tile import *
+    from .aoi_view import *
@@ -1,6 +1,7 @@
 """Model object dedicated to AOI selection."""
 
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Union
 
@@ -14,10 +15,12 @@ from ipyleaflet import GeoJSON
 from typing_extensions import Self
 
 from sepal_ui import color
+from sepal_ui.conf import cache_dir
 from sepal_ui.frontend import styles as ss
+from sepal_ui.mapping.layer import ZoomGeoJSON
 from sepal_ui.message import ms
 from sepal_ui.model import Model
-from sepal_ui.scripts import gee
+from sepal_ui.scripts import gee, vector
 from sepal_ui.scripts import utils as su
 
 __all__ = ["AoiModel"]
@@ -32,6 +35,24 @@ class AoiModel(Model):
     MAPPING: Path = Path(__file__).parents[1] / "data" / "gaul_iso.json"
     "GAUL -> ISO-3 mapping of country code"
 
+    ADMIN_CACHE_VERSION: int = 1
+    "The version of the administrative boundaries cache format, increase it to invalidate the existing files"
+
+    ADMIN_CACHE_DIR: Path = cache_dir / "admin"
+    "The folder where the administrative boundaries are cached as GeoParquet files"
+
+    _iso: Optional[Dict[str, str]] = None
+    "The GAUL -> ISO-3 mapping loaded once per process"
+
+    PAGE_SIZE: int = 1000
+    "The number of features requested to GEE in each call when loading the gdf"
+
+    MAX_WORKERS: int = 4
+    "The number of pages requested in parallel to GEE"
+
+    DISPLAY_ZOOMS: List[int] = [6, 10, 14]
+    "The zoom levels from which finer geometries are displayed on the map, full precision is used after the last one"
+
     ASSET_SUFFIX: str = "aoi_"
     "The suffix to identify the asset in GEE"
 
@@ -103,6 +124,9 @@ class AoiModel(Model):
     default_asset: Optional[str] = None
     "The default asset name, need to point to a readable FeatureCollection"
 
+    simplify_tolerance: Optional[float] = None
+    "The max error (in meters) of the geometries simplification when the gdf is loaded from GEE. None to keep the full precision"
+
     # ###########################################################################
     # ###                           model outputs                             ###
     # ###########################################################################
@@ -129,6 +153,7 @@ class AoiModel(Model):
         asset: Optional[Union[str, Path]] = None,
         admin: Optional[str] = None,
         folder: Union[str, Path] = "",
+        simplify_tolerance: Optional[float] = None,
     ) -> None:
         """An Model object dedicated to the sorage and the manipulation of aoi.
 
@@ -143,6 +168,7 @@ class AoiModel(Model):
             admin: the administrative code of the default selection. Need to be GADM if ee==False and GAUL 2015 if ee==True.
             asset: the default asset. Can only work if ee==True
             folder: the init GEE asset folder where the asset selector should start looking (debugging purpose)
+            simplify_tolerance: the max error (in meters) of the geometries simplification when the gdf is loaded from GEE. Default to None (full precision)
 
         .. deprecated:: 2.3.2
             'asset_name' will be used as variable to store 'ASSET' method info. To get the destination saved asset id, please use 'dst_asset_id' variable.
@@ -152,6 +178,7 @@ class AoiModel(Model):
 
         # the ee retated information
         self.gee = gee
+        self.simplify_tolerance = simplify_tolerance
         if gee:
             su.init_ee()
             self.folder = str(folder) or f"projects/{ee.data._cloud_api_user_project}/assets/"
@@ -268,8 +295,9 @@ class AoiModel(Model):
         if not len(values) == len(set(values)):
             raise Exception(ms.aoi_sel.exception.duplicate_key)
 
-        # create the gdf
-        df = pd.read_csv(point_file, sep=None, engine="python")
+        # create the gdf from the id, lng and lat columns only
+        columns = [point_json[c] for c in ["id_column", "lng_column", "lat_column"]]
+        df = vector.read_points(point_file, columns)
         self.gdf = gpd.GeoDataFrame(
             df,
             crs="EPSG:4326",
@@ -371,15 +399,21 @@ class AoiModel(Model):
 
         # get the data from either the pygaul or the pygadm libs
         # pygaul needs extra work as ISO codes are not included in the GEE dataset
+        # the boundaries are read from the local cache if they have already been loaded
+        gdf = self._read_admin_cache(admin)
         if self.gee:
             self.feature_collection = pygaul.AdmItems(admin=admin)
 
             # get the ADM0_CODE to get the ISO code
-            feature = self.feature_collection.first()
-            properties = feature.toDictionary(feature.propertyNames()).getInfo()
+            if gdf is None:
+                feature = self.feature_collection.first()
+                properties = feature.toDictionary(feature.propertyNames()).getInfo()
+            else:
+                self.gdf = gdf
+                properties = gdf.drop(columns="geometry").iloc[0].to_dict()
 
-            iso = json.loads(self.MAPPING.read_text())[str(properties.get("ADM0_CODE"))]
-            names = [value for prop, value in properties.items() if "NAME" in prop]
+            iso = self.get_iso(properties.get("ADM0_CODE"))
+            names = [properties[prop] for prop in sorted(properties) if "NAME" in prop]
 
             # generate the name from the columns
             names = [su.normalize_str(name) for name in names]
@@ -388,7 +422,10 @@ class AoiModel(Model):
             self.name = "_".join(names)
 
         else:
-            self.gdf = pygadm.AdmItems(admin=admin)
+            if gdf is None:
+                gdf = pygadm.AdmItems(admin=admin)
+                self._write_admin_cache(admin, gdf)
+            self.gdf = gdf
 
             # generate the name from the columns
             r = self.gdf.iloc[0]
@@ -397,6 +434,83 @@ class AoiModel(Model):
             self.name = "_".join(names)
         return self
 
+    @classmethod
+    def get_iso(cls, gaul_code: Union[int, str]) -> str:
+        """Return the ISO-3 code of a country from its GAUL code.
+
+        The mapping file is only read once per process.
+
+        Args:
+            gaul_code: the ADM0_CODE of the country in FAO GAUL
+
+        Returns:
+            the ISO-3 code of the country
+        """
+        if cls._iso is None:
+            cls._iso = json.loads(cls.MAPPING.read_text())
+
+        return cls._iso[str(gaul_code)]
+
+    def _admin_cache_file(self, admin: str) -> Path:
+        """Return the cache file of an administrative code.
+
+        The file is specific to the source (GAUL if gee, GADM otherwise), to the version of the lib providing it and to the simplification of the geometries loaded from GEE.
+
+        Args:
+            admin: the admin code in the source nomenclature
+
+        Returns:
+            the path to the GeoParquet file
+        """
+        lib = pygaul if self.gee else pygadm
+        source = f"{lib.__name__}_{lib.__version__}"
+        folder = self.ADMIN_CACHE_DIR / f"v{self.ADMIN_CACHE_VERSION}" / source
+
+        # simplified boundaries must never be read by a full precision model
+        simplified = self.gee and self.simplify_tolerance
+        name = f"{admin}_simplify_{self.simplify_tolerance}" if simplified else admin
+
+        return folder / f"{name}.parquet"
+
+    def _read_admin_cache(self, admin: str) -> Optional[gpd.GeoDataFrame]:
+        """Read the cached boundaries of an administrative code.
+
+        Args:
+            admin: the admin code in the source nomenclature
+
+        Returns:
+            the cached GeoDataFrame or None if it's not available
+        """
+        file = self._admin_cache_file(admin)
+        if not file.is_file():
+            return None
+
+        # a corrupted file is simply ignored, it will be overwritten
+        try:
+            return gpd.read_parquet(file)
+        except Exception:
+            return None
+
+    def _write_admin_cache(self, admin: str, gdf: gpd.GeoDataFrame) -> None:
+        """Save the boundaries of an administrative code in the cache.
+
+        The cache is only an optimization so nothing is raised if the file cannot be written.
+
+        Args:
+            admin: the admin code in the source nomenclature
+            gdf: the boundaries to save
+        """
+        file = self._admin_cache_file(admin)
+        tmp = file.with_suffix(".tmp")
+        try:
+            file.parent.mkdir(parents=True, exist_ok=True)
+            gpd.GeoDataFrame(gdf).to_parquet(tmp)
+            tmp.replace(file)
+        except Exception:
+            tmp.unlink(missing_ok=True)
+
+        return
+
     def clear_output(self) -> Self:
         """Clear the output of the aoi selector without changing the traits and/or the parameters."""
         # reset the outputs
@@ -440,9 +554,7 @@ class AoiModel(Model):
             raise Exception(ms.aoi_sel.exception.no_gdf)
 
         if self.gee:
-            aoi_ee = ee.Feature(self.feature_collection.first())
-            columns = aoi_ee.propertyNames().getInfo()
-            list_ = [col for col in columns if col not in ["system:index", "Shape_Area"]]
+            list_ = vector.get_ee_columns(self.feature_collection)
         else:
             list_ = list(set(["geometry"]) ^ set(self.gdf.columns.to_list()))
 
@@ -462,12 +574,9 @@ class AoiModel(Model):
             raise Exception(ms.aoi_sel.exception.no_gdf)
 
         if self.gee:
-            fields = self.feature_collection.distinct(column).aggregate_array(column)
-            list_ = fields.getInfo()
-        else:
-            list_ = self.gdf[column].to_list()
+            return vector.get_ee_values(self.feature_collection, column)
 
-        return sorted(list_)
+        return sorted(self.gdf[column].to_list())
 
     def get_selected(self, column: str, field: str) -> Union[ee.Feature, gpd.GeoDataFrame]:
         """Select an ee object based on selected column and field.
@@ -515,7 +624,7 @@ class AoiModel(Model):
         self.dst_asset_id = asset_id
 
         # check if the table already exist
-        if asset_id in [a["name"] for a in gee.get_assets(self.folder)]:
+        if gee.is_asset(asset_id):
             return self
 
         # check if the task is running
@@ -537,6 +646,8 @@ class AoiModel(Model):
     def get_ipygeojson(self, style: Optional[dict] = None) -> GeoJSON:
         """Converts current geopandas object into ipyleaflet GeoJSON.
 
+        The geometries are simplified according to the ``DISPLAY_ZOOMS`` levels. Only the coarsest ones are sent at first, the finer ones are displayed when a ``SepalMap`` is zoomed in.
+
         Args:
             style: the predefined style of the aoi. It's by default using a "success" ``sepal_ui.color`` with 0.5 transparent fill color. It can be completely replace by a fully qualified `style dictionary <https://ipyleaflet.readthedocs.io/en/latest/layers/geo_json.html>`__. Use the ``sepal_ui.color`` object to define any color to remain compatible with light and dark theme.
 
@@ -548,11 +659,19 @@ class AoiModel(Model):
         if self.gdf is None:
             raise Exception(ms.aoi_sel.exception.no_gdf)
 
-        # read the data from geojson and add the name as a property of the shape
+        # add the name as a property of the shape
         # useful when handler are added from ipyleaflet
-        data = json.loads(self.gdf.to_json())
-        for f in data["features"]:
-            f["properties"]["name"] = self.name
+        gdf = self.gdf.assign(name=self.name)
+
+        # precompute the geometries of each zoom level once, the tolerance of a level is
+        # the size of a pixel (in degrees) at the zoom where the next level takes over
+        levels, start = {}, 0
+        for zoom in self.DISPLAY_ZOOMS:
+            tolerance = 360 / (256 * 2**zoom)
+            simple_gdf = gdf.assign(**{gdf.geometry.name: gdf.simplify(tolerance)})
+            levels[start] = simple_gdf.__geo_interface__
+            start = zoom
+        levels[start] = gdf.__geo_interface__
 
         # adapt the style to the theme
         if style is None:
@@ -562,7 +681,7 @@ class AoiModel(Model):
         # create a GeoJSON object
         # attribution="SEPAL(c)" is not recognized yet
         # https://github.com/jupyter-widgets/ipyleaflet/issues/847
-        self.ipygeojson = GeoJSON(data=data, style=style, name="aoi")
+        self.ipygeojson = ZoomGeoJSON(levels=levels, style=style, name="aoi")
 
         return self.ipygeojson
 
@@ -587,12 +706,27 @@ class AoiModel(Model):
         self._gdf = value
 
     def _load_gdf(self):
-        """Return a geodataframe from a feature collection."""
-        features = self.feature_collection.getInfo()["features"]
-        self._gdf = gpd.GeoDataFrame.from_features(features).set_crs(epsg=4326)
+        """Return a geodataframe from a feature collection.
+
+        The features are requested by pages of ``PAGE_SIZE`` elements in parallel threads to stay below the GEE payload limits. Each page is converted to a GeoDataFrame as soon as it's received so that the full JSON response is never kept in memory. If ``simplify_tolerance`` is set, the geometries are simplified on the server side.
+        """
+        ee_col = self.feature_collection
+        if self.simplify_tolerance:
+            ee_col = ee_col.map(lambda feat: feat.simplify(maxError=self.simplify_tolerance))
+
+        def _load_page(offset: int) -> gpd.GeoDataFrame:
+            features = ee_col.toList(self.PAGE_SIZE, offset).getInfo()
+            return gpd.GeoDataFrame.from_features(features)
+
+        offsets = range(0, ee_col.size().getInfo(), self.PAGE_SIZE)
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            pages = list(executor.map(_load_page, offsets))
+
+        gdf = pd.concat(pages, ignore_index=True) if pages else gpd.GeoDataFrame(geometry=[])
+        self._gdf = gpd.GeoDataFrame(gdf, geometry="geometry").set_crs(epsg=4326)
 
         if self.method in ["ADMIN0", "ADMIN1", "ADMIN2"]:
 
-            gaul_country = str(self._gdf.ADM0_CODE.unique()[0])
-            iso = json.loads(self.MAPPING.read_text())[gaul_country]
-            self._gdf["ISO"] = iso
+            gaul_country = self._gdf.ADM0_CODE.unique()[0]
+            self._gdf["ISO"] = self.get_iso(gaul_country)
+            self._write_admin_cache(self.admin, self._gdf)
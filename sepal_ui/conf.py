@@ -18,3 +18,6 @@ if not config_file.exists():
     config.set("sepal-ui", "theme", "dark")
     config.set("sepal-ui", "theme", "en")
     config.write(config_file.open("w"))
+
+cache_dir = Path.home() / ".cache" / "sepal-ui"
+"Path: the folder where sepal-ui stores the files that can be regenerated (sidecar rasters, downloaded data...)"
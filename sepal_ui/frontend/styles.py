@@ -189,6 +189,9 @@ class SepalColor(HasTraits, SimpleNamespace):
         return html
 
 
+color: SepalColor = SepalColor()
+'color: the colors of sepal. members are in the following list: "main, darker, bg, primary, accent, secondary, success, info, warning, error, menu". They will render according to the selected theme.'
+
 # load custom styling of sepal_ui
 sepal_ui_css = HTML(f"<style>{(CSS_DIR / 'custom.css').read_text()}</style>")
 
@@ -15,16 +15,48 @@ Example:
         sm.SepalMap(gee=False)
 """
 
-from .aoi_control import *
-from .draw_control import *
-from .fullscreen_control import *
-from .inspector_control import *
-from .layer import *
-from .layer_state_control import *
-from .layers_control import *
-from .legend_control import *
-from .map_btn import *
-from .marker_cluster import *
-from .menu_control import *
-from .sepal_map import *
-from .zoom_control import *
+from typing import TYPE_CHECKING
+
+from sepal_ui.scripts import lazy
+
+# the modules are only imported when one of their member is requested
+# it avoids loading rioxarray, localtileserver, matplotlib... when not needed
+# the sepal-ui members exposed by the former star imports (sw, su...) are kept for backward compatibility
+__getattr__, __dir__, __all__ = lazy.attach(
+    __name__,
+    {
+        "aoi_control": ["AoiControl", "sd"],
+        "basemaps": [],
+        "draw_control": ["DrawControl", "color"],
+        "fullscreen_control": ["FullScreenControl", "rt"],
+        "inspector_control": ["InspectorControl", "ValueInspector"],
+        "layer": ["EELayer", "TiledGeoJSON", "ZoomGeoJSON"],
+        "layer_state_control": ["LayerStateControl"],
+        "layers_control": ["BaseRow", "HeaderRow", "LayerRow", "LayersControl", "VectorRow"],
+        "legend_control": ["LegendControl", "su"],
+        "map_btn": ["MapBtn", "sw"],
+        "marker_cluster": ["MarkerCluster"],
+        "menu_control": ["MenuControl"],
+        "sepal_map": ["SepalMap"],
+        "tile_server": ["BoundTileLayer", "TileServer"],
+        "viz_params": ["VizParams"],
+        "zoom_control": ["ZoomControl"],
+    },
+)
+
+if TYPE_CHECKING:
+    from .aoi_control import *
+    from .draw_control import *
+    from .fullscreen_control import *
+    from .inspector_control import *
+    from .layer import *
+    from .layer_state_control import *
+    from .layers_control import *
+    from .legend_control import *
+    from .map_btn import *
+    from .marker_cluster import *
+    from .menu_control import *
+    from .sepal_map import *
+    from .tile_server import *
+    from .viz_params import *
+    from .zoom_control import *
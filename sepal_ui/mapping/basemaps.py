@@ -1,8 +1,8 @@
 """Module to load basemaps from different providers."""
 
-from typing import Optional
+from collections.abc import Mapping
+from typing import Dict, Iterator, Optional
 
-from box import Box
 from ipyleaflet import TileLayer
 from xyzservices import TileProvider
 from xyzservices import providers as xyz
@@ -67,6 +67,37 @@ def get_xyz_dict(
     return _output
 
 
+def get_basemap_params() -> Dict[str, dict]:
+    """Return the ``TileLayer`` parameters of all the available xyz tile services.
+
+    Only the provider metadata are gathered, no widget is created.
+
+    Returns:
+        A dictionary of ipyleaflet TileLayer parameters indexed by basemap name.
+    """
+    params = {}
+
+    for key, tile in xyz_tiles.items():
+        params[key] = {
+            "url": tile["url"],
+            "name": tile["name"],
+            "attribution": tile["attribution"],
+            "max_zoom": 22,
+            "base": True,
+        }
+
+    for item in get_xyz_dict().values():
+        params[item.name] = {
+            "url": item.build_url(),
+            "name": item.name,
+            "max_zoom": item.get("max_zoom", 22),
+            "attribution": item.attribution,
+            "base": True,
+        }
+
+    return params
+
+
 def xyz_to_leaflet() -> dict:
     """Convert all available xyz tile services to ipyleaflet tile layers.
 
@@ -75,27 +106,62 @@ def xyz_to_leaflet() -> dict:
     Returns:
         A dictionary of ipyleaflet tile layers.
     """
-    leaflet_dict = {}
+    return {k: TileLayer(**p) for k, p in get_basemap_params().items()}
 
-    for key in xyz_tiles:
-        name = xyz_tiles[key]["name"]
-        url = xyz_tiles[key]["url"]
-        attribution = xyz_tiles[key]["attribution"]
-        leaflet_dict[key] = TileLayer(
-            url=url, name=name, attribution=attribution, max_zoom=22, base=True
-        )
 
-    for item in get_xyz_dict().values():
-        leaflet_dict[item.name] = TileLayer(
-            url=item.build_url(),
-            name=item.name,
-            max_zoom=item.get("max_zoom", 22),
-            attribution=item.attribution,
-            base=True,
-        )
+class BasemapRegistry(Mapping):
+
+    _params: Optional[Dict[str, dict]] = None
+    "The TileLayer parameters of every basemap, gathered on first use"
+
+    _layers: Dict[str, TileLayer] = {}
+    "The TileLayer widgets that have already been requested"
+
+    def __init__(self) -> None:
+        """Read-only mapping of the available basemaps.
+
+        It behaves like the former frozen ``Box`` of ``TileLayer`` but only keeps the provider metadata. The ``TileLayer`` widget of a basemap is built the first time it is requested and then reused.
+        """
+        self._params = None
+        self._layers = {}
+
+    @property
+    def params(self) -> Dict[str, dict]:
+        """The TileLayer parameters of every basemap."""
+        if self._params is None:
+            self._params = get_basemap_params()
+
+        return self._params
+
+    def __getitem__(self, key: str) -> TileLayer:
+        """Return the TileLayer of the basemap, create it if needed."""
+        if key not in self._layers:
+            self._layers[key] = TileLayer(**self.params[key])
+
+        return self._layers[key]
+
+    def __getattr__(self, name: str) -> TileLayer:
+        """Give access to the basemaps as attributes like in a ``Box``."""
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(f"{name} is not an available basemap")
+
+    def __contains__(self, key: object) -> bool:
+        """Check the basemap existence without building its layer."""
+        return key in self.params
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the basemap names."""
+        return iter(self.params)
 
-    return leaflet_dict
+    def __len__(self) -> int:
+        """Return the number of available basemaps."""
+        return len(self.params)
 
 
-basemap_tiles: Box = Box(xyz_to_leaflet(), frozen_box=True)
-"the basemaps list as a box"
+basemap_tiles: BasemapRegistry = BasemapRegistry()
+"the basemaps registry, the TileLayer are only created when requested"
@@ -1,24 +1,28 @@
 """Customized ``Control`` to display the value of all available layers on a specific pixel."""
 
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Sequence, Union
+from typing import TYPE_CHECKING, List, Optional, Sequence, Union
 
 import ee
-import geopandas as gpd
 import ipyvuetify as v
-import rasterio as rio
-import rioxarray
+import numpy as np
 from deprecated.sphinx import deprecated
 from ipyleaflet import GeoJSON, Map, Marker
-from rasterio.crs import CRS
 from shapely import geometry as sg
 from traitlets import Bool
 
 from sepal_ui import sepalwidgets as sw
-from sepal_ui.mapping.layer import EELayer
+from sepal_ui.mapping.layer import EELayer, TiledGeoJSON
 from sepal_ui.mapping.menu_control import MenuControl
 from sepal_ui.message import ms
 from sepal_ui.scripts import decorator as sd
+from sepal_ui.scripts.cache import LRUCache
+
+if TYPE_CHECKING:
+    import rasterio as rio
 
 
 class InspectorControl(MenuControl):
@@ -41,6 +45,18 @@ class InspectorControl(MenuControl):
     marker: Optional[Marker] = None
     "The marker of the last visited point"
 
+    executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=8)
+    "The threads reading the layers values in parallel, shared by all the inspectors of the kernel"
+
+    datasets: Optional[LRUCache] = None
+    "The raster datasets opened by this inspector, their reading lock and the file modification time, keyed by file path. The dropped datasets are closed."
+
+    geodataframes: LRUCache = LRUCache(maxsize=16)
+    "The GeoDataFrame of the GeoJSON layers data and their spatial index, keyed by the layer model id (or the data id if there is no layer)"
+
+    MAX_WINDOW: int = 64
+    "The maximum number of pixels read on each side of a raster window"
+
     def __init__(self, m: Map, open_tree: bool = True, **kwargs) -> None:
         """Widget control displaying a btn on the map.
 
@@ -52,6 +68,9 @@ class InspectorControl(MenuControl):
         # set traits
         self.open_tree = open_tree
 
+        # the datasets are closed with the control so they cannot be shared with the other maps
+        self.datasets = LRUCache(maxsize=16, on_evict=lambda k, v: _close_dataset(*v))
+
         # set some default parameters
         kwargs.setdefault("position", "topleft")
         kwargs["m"] = m
@@ -83,6 +102,14 @@ class InspectorControl(MenuControl):
         # add js behaviour
         self.menu.observe(self.toggle_cursor, "v_model")
         self.m.on_interaction(self.read_data)
+        self.m.observe(self._on_controls_change, "controls")
+
+    def _on_controls_change(self, change: dict) -> None:
+        """Close the opened raster datasets when the control is removed from the map."""
+        if self in change["old"] and self not in change["new"]:
+            self.datasets.clear()
+
+        return
 
     def toggle_cursor(self, *args) -> None:
         """Toggle the cursor and marker display.
@@ -129,20 +156,31 @@ class InspectorControl(MenuControl):
         children.append(sw.Html(tag="h4", children=[ms.inspector_control.layers]))
         children.append(tree_view)
 
+        # read the layers data in parallel:
+        # all the EE layers are reduced in a single server call and the local
+        # layers are read in separated threads
+        layers = [lyr for lyr in self.m.layers if not (lyr.base or isinstance(lyr, Marker))]
+        # the asynchronous EE layers are skipped until their object is resolved
+        ee_layers = [lyr for lyr in layers if isinstance(lyr, EELayer) and not lyr.pending]
+        futures = {}
+        if ee_layers:
+            ee_objs = [lyr.ee_object for lyr in ee_layers]
+            ee_future = self.executor.submit(self._from_eelayers, ee_objs, coords)
+        for lyr in layers:
+            if isinstance(lyr, GeoJSON):
+                futures[lyr] = self.executor.submit(self._from_geojson, lyr.data, coords, lyr)
+            elif type(lyr).__name__ == "BoundTileLayer":
+                futures[lyr] = self.executor.submit(self._from_raster, lyr.raster, coords)
+
+        layer_values = {lyr: f.result() for lyr, f in futures.items()}
+        if ee_layers:
+            layer_values.update(zip(ee_layers, ee_future.result()))
+
         # write the layers data
-        items, layers = [], [lyr for lyr in self.m.layers if not lyr.base]
+        items = []
         for i, lyr in enumerate(layers):
-
-            if isinstance(lyr, EELayer):
-                data = self._from_eelayer(lyr.ee_object, coords)
-            elif isinstance(lyr, GeoJSON):
-                data = self._from_geojson(lyr.data, coords)
-            elif type(lyr).__name__ == "BoundTileLayer":
-                data = self._from_raster(lyr.raster, coords)
-            elif isinstance(lyr, Marker):
-                continue
-            else:
-                data = {ms.inspector_control.info.header: ms.inspector_control.info.text}
+            default = {ms.inspector_control.info.header: ms.inspector_control.info.text}
+            data = layer_values.get(lyr, default)
 
             items.append(
                 {
@@ -184,67 +222,110 @@ class InspectorControl(MenuControl):
         Returns:
             tke value associated to the image/feature names
         """
+        return self._from_eelayers([ee_obj], coords)[0]
+
+    @sd.need_ee
+    def _from_eelayers(
+        self, ee_objs: Sequence[ee.ComputedObject], coords: Sequence[float]
+    ) -> List[dict]:
+        """Extract the values of several ee_objects for the considered point in a single server call.
+
+        The reduction of every object is gathered in a single ``ee.List`` that is evaluated once.
+
+        Args:
+            ee_objs: the ee objects to reduce to a single point
+            coords: the coordinates of the point (lng, lat).
+
+        Returns:
+            the values associated to the image/feature names of each object
+        """
         # create a gee point
         ee_point = ee.Geometry.Point(*coords)
 
-        if isinstance(ee_obj, ee.FeatureCollection):
+        reductions = []
+        for ee_obj in ee_objs:
 
-            # filter all the value to the point
-            features = ee_obj.filterBounds(ee_point)
+            if isinstance(ee_obj, ee.FeatureCollection):
 
-            # if there is none, print non for every property
-            if features.size().getInfo() == 0:
-                cols = ee_obj.first().propertyNames().getInfo()
-                pixel_values = {c: None for c in cols if c not in ["system:index"]}
+                # filter all the value to the point
+                # if there is none, send back the property names only
+                # else simply return all the values of the first element
+                features = ee_obj.filterBounds(ee_point)
+                cols = ee_obj.first().propertyNames().remove("system:index")
+                reduction = ee.Algorithms.If(
+                    features.size().eq(0), cols, features.first().toDictionary()
+                )
 
-            # else simply return all the values of the first element
-            else:
-                pixel_values = features.first().toDictionary().getInfo()
+            elif isinstance(ee_obj, ee.Image):
 
-        elif isinstance(ee_obj, ee.Image):
+                # reduce the layer region using mean
+                reduction = ee_obj.reduceRegion(
+                    geometry=ee_point,
+                    scale=self.m.get_scale(),
+                    reducer=ee.Reducer.mean(),
+                )
 
-            # reduce the layer region using mean
-            pixel_values = ee_obj.reduceRegion(
-                geometry=ee_point,
-                scale=self.m.get_scale(),
-                reducer=ee.Reducer.mean(),
-            ).getInfo()
+            else:
+                raise ValueError(f'the layer object is a "{type(ee_obj)}" which is not accepted.')
 
-        else:
-            raise ValueError(f'the layer object is a "{type(ee_obj)}" which is not accepted.')
+            reductions.append(reduction)
 
-        return pixel_values
+        # print None for every property of the empty featureCollections
+        pixel_values = ee.List(reductions).getInfo()
+        return [{c: None for c in v} if isinstance(v, list) else v for v in pixel_values]
 
-    def _from_geojson(self, data: dict, coords: Sequence[float]) -> dict:
+    def _from_geojson(
+        self, data: dict, coords: Sequence[float], layer: Optional[GeoJSON] = None
+    ) -> dict:
         """Extract the values of the data for the considered point.
 
+        The GeoDataFrame of the data and its spatial index are built once and kept in the ``geodataframes`` cache until a new data dict is set in the layer. The ``TiledGeoJSON`` layers already embed the GeoDataFrame of their full dataset, it is used directly.
+
         Args:
             data: the shape to reduce to a single point
             coords: the coordinates of the point (lng, lat).
+            layer: the layer displaying the data
 
         Returns:
             The value associated to the feature names
         """
+        import geopandas as gpd
+
         # extract the coordinates as a poin
         point = sg.Point(*coords)
 
-        # filter the data to 1 point
-        gdf = gpd.GeoDataFrame.from_features(data)
-        gdf_filtered = gdf[gdf.contains(point)]
-        skip_cols = ["geometry", "style"]
+        # get the dataframe of the layer and its spatial index. They are rebuilt
+        # only if a new data dict is set in the layer. The data is kept in the
+        # cache value to detect the change.
+        if isinstance(layer, TiledGeoJSON):
+            gdf, sindex = layer.gdf, layer.sindex
+        else:
+            key = id(data) if layer is None else layer.model_id
+            entry = self.geodataframes.get(key)
+            if entry is None or entry[0] is not data:
+                gdf = gpd.GeoDataFrame.from_features(data)
+                entry = (data, gdf, gdf.sindex)
+                self.geodataframes.set(key, entry)
+            _, gdf, sindex = entry
+
+        # filter the data to 1 point using the index
+        index = sindex.query(point, predicate="within")
+        skip_cols = [gdf.geometry.name, "style"]
 
         # only display the columns name if empty
-        if len(gdf_filtered) == 0:
+        if len(index) == 0:
             cols = gdf.columns.to_list()
             return {c: None for c in cols if c not in skip_cols}
 
         # else print the values of the first element
         else:
-            return gdf_filtered.iloc[0, ~gdf.columns.isin(skip_cols)].to_dict()
+            return gdf.iloc[index.min(), ~gdf.columns.isin(skip_cols)].to_dict()
 
     def _from_raster(self, raster: Union[str, Path], coords: Sequence[float]) -> dict:
         """Extract the values of the data-array for the considered point.
 
+        The dataset is opened once and kept in the ``datasets`` cache. The point is projected in the raster CRS and only the window covering the buffered point is read. When the window is larger than ``MAX_WINDOW`` pixels (zoomed out map) it is decimated so that GDAL can use the overviews of the file.
+
         Args:
             raster: the path to the image to reduce to a single point
             coords: the coordinates of the point (lng, lat).
@@ -252,34 +333,90 @@ class InspectorControl(MenuControl):
         Returns:
             The value associated to the feature names
         """
-        # extract the coordinates as a point
-        point = sg.Point(*coords)
+        import rasterio as rio
+
+        # get the opened dataset, it will be reopened (and the stale one closed) if the file is modified
+        # the dataset can be closed by another thread if it was dropped from the cache meanwhile
+        # so the cache is tried twice before reading a dataset opened only for this point
+        raster = Path(raster)
+        key = str(raster.resolve())
+        for _ in range(2):
+            mtime = raster.stat().st_mtime_ns
+            entry = self.datasets.get_or_set(
+                key, lambda: (rio.open(raster), threading.Lock(), mtime)
+            )
+            if entry[2] != mtime:
+                entry = (rio.open(raster), threading.Lock(), mtime)
+                self.datasets.set(key, entry)
+            ds, lock, _ = entry
+
+            with lock:
+                if not ds.closed:
+                    return self._read_raster(ds, coords)
+
+        with rio.open(raster) as ds:
+            return self._read_raster(ds, coords)
 
-        # extract the pixel size in degrees (equatorial approximation)
-        scale = self.m.get_scale() * 0.00001
+    def _read_raster(self, ds: "rio.DatasetReader", coords: Sequence[float]) -> dict:
+        """Read the mean values of an opened dataset around the considered point.
 
-        # open the image and unproject it
-        da = rioxarray.open_rasterio(raster, masked=True)
-        da = da.chunk((1000, 1000))
-        if da.rio.crs != CRS.from_string("EPSG:4326"):
-            da = da.rio.reproject("EPSG:4326")
+        Args:
+            ds: the opened raster dataset
+            coords: the coordinates of the point (lng, lat).
+
+        Returns:
+            The value associated to the feature names
+        """
+        from rasterio.warp import transform
+        from rasterio.windows import Window, from_bounds
+
+        # project the point in the raster CRS
+        [x], [y] = transform("EPSG:4326", ds.crs, [coords[0]], [coords[1]])
+
+        # extract the pixel size in the raster units (equatorial approximation for degrees)
+        scale = self.m.get_scale()
+        scale = scale * 0.00001 if ds.crs.is_geographic else scale
 
         # sample is not available for da so I do as in GEE a mean reducer around 1px
         # is it an overkill ? yes
-        if sg.box(*da.rio.bounds()).contains(point):
-            bounds = point.buffer(scale).bounds
-            window = rio.windows.from_bounds(*bounds, transform=da.rio.transform())
-            da_filtered = da.rio.isel_window(window)
-            means = da_filtered.mean(axis=(1, 2)).to_numpy()
-            pixel_values = {ms.inspector_control.band.format(i + 1): v for i, v in enumerate(means)}
-
-        # if the point is out of the image display None
-        else:
-            pixel_values = {
-                ms.inspector_control.band.format(i + 1): None for i in range(da.rio.count)
-            }
+        bands = [ms.inspector_control.band.format(i + 1) for i in range(ds.count)]
+        left, bottom, right, top = ds.bounds
+        if not (left <= x <= right and bottom <= y <= top):
+            return {b: None for b in bands}
+
+        # read at least the pixel containing the point when the map pixels are
+        # smaller than the raster ones (zoomed in map)
+        bounds = (x - scale, y - scale, x + scale, y + scale)
+        window = from_bounds(*bounds, transform=ds.transform)
+        col_off, row_off = math.floor(window.col_off), math.floor(window.row_off)
+        width = max(1, math.ceil(window.col_off + window.width) - col_off)
+        height = max(1, math.ceil(window.row_off + window.height) - row_off)
+        window = Window(col_off, row_off, width, height)
+        window = window.intersection(Window(0, 0, ds.width, ds.height))
+        out_shape = (
+            ds.count,
+            min(window.height, self.MAX_WINDOW),
+            min(window.width, self.MAX_WINDOW),
+        )
+
+        data = ds.read(window=window, out_shape=out_shape, masked=True, boundless=False)
+        means = data.mean(axis=(1, 2)).filled(np.nan)
+
+        return {b: float(v) for b, v in zip(bands, means)}
+
+
+def _close_dataset(ds: "rio.DatasetReader", lock: threading.Lock, mtime: int) -> None:
+    """Close a raster dataset dropped from the ``InspectorControl.datasets`` cache.
+
+    Args:
+        ds: the opened dataset
+        lock: the reading lock of the dataset
+        mtime: the modification time of the file when it was opened
+    """
+    with lock:
+        ds.close()
 
-        return pixel_values
+    return
 
 
 @deprecated(version="2.15.1", reason="ValueInspector class is now renamed InspectorControl")
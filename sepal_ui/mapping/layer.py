@@ -1,9 +1,17 @@
-"""Customized ``Layer`` object containing EE metadata."""
+"""Customized ``Layer`` objects containing EE metadata or precomputed vector levels."""
 
-from typing import Optional
+import math
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Set, Tuple
 
 import ee
-from ipyleaflet import TileLayer
+from deprecated.sphinx import versionadded
+from ipyleaflet import GeoJSON, TileLayer
+
+from sepal_ui.scripts.cache import LRUCache
+from sepal_ui.scripts.tiles import tile_index
+
+if TYPE_CHECKING:
+    import geopandas as gpd
 
 
 class EELayer(TileLayer):
@@ -11,6 +19,9 @@ class EELayer(TileLayer):
     ee_object: Optional[ee.ComputedObject] = None
     "ee.object: the ee.object displayed on the map"
 
+    pending: bool = False
+    "Whether the displayed object is still being resolved in the background (asynchronous layers)"
+
     def __init__(self, ee_object: ee.ComputedObject, **kwargs) -> None:
         """Wrapper of the TileLayer class to add the ee object as a member.
 
@@ -22,3 +33,155 @@ class EELayer(TileLayer):
         self.ee_object = ee_object
 
         super().__init__(**kwargs)
+
+
+@versionadded(version="2.18.0")
+class ZoomGeoJSON(GeoJSON):
+
+    levels: Dict[int, dict] = {}
+    "The GeoJSON data to display from each zoom level, sorted by zoom"
+
+    level: int = 0
+    "The zoom level of the displayed data"
+
+    def __init__(self, levels: Dict[int, dict], **kwargs) -> None:
+        """Wrapper of the GeoJSON class switching between precomputed geometries.
+
+        The coarsest level is sent first and the finer ones are only sent when the ``SepalMap`` displaying the layer is zoomed in.
+
+        Args:
+            levels: the GeoJSON data to use from each zoom level. The data of the smallest zoom is displayed at initialization.
+            kwargs: any parameter from a ipyleaflet.GeoJSON. "data" will be ignored.
+        """
+        self.levels = dict(sorted(levels.items()))
+        self.level = next(iter(self.levels))
+        kwargs["data"] = self.levels[self.level]
+
+        super().__init__(**kwargs)
+
+    def set_zoom(self, zoom: float) -> None:
+        """Display the data of the level matching the zoom.
+
+        Args:
+            zoom: the zoom of the map displaying the layer
+        """
+        level = ([z for z in self.levels if z <= zoom] or [next(iter(self.levels))])[-1]
+
+        # the data are only sent to the frontend when the level changes
+        if level != self.level:
+            self.level = level
+            self.data = self.levels[level]
+
+        return
+
+
+@versionadded(version="2.18.0")
+class TiledGeoJSON(GeoJSON):
+
+    MAX_ZOOM: int = 14
+    "The zoom of the finest tiles, their geometries are not simplified"
+
+    gdf: Optional["gpd.GeoDataFrame"] = None
+    "The full dataset displayed by the layer in EPSG:4326"
+
+    sindex: Optional["gpd.sindex.SpatialIndex"] = None
+    "The spatial index of the dataset, built once"
+
+    tiles: Optional[LRUCache] = None
+    "The features of the tiles already cut, keyed by (z, x, y)"
+
+    visible_tiles: Set[Tuple[int, int, int]] = set()
+    "The tiles currently displayed on the map"
+
+    def __init__(self, gdf: "gpd.GeoDataFrame", max_tiles: int = 256, **kwargs) -> None:
+        """Wrapper of the GeoJSON class cutting a large GeoDataFrame in web-mercator tiles.
+
+        Only the features of the tiles intersecting the bounds of the ``SepalMap`` displaying the layer are sent to the browser. Their geometries are simplified to the pixel size of the tile zoom.
+
+        Args:
+            gdf: the vector data to display
+            max_tiles: the number of cut tiles kept in memory
+            kwargs: any parameter from a ipyleaflet.GeoJSON. "data" will be ignored.
+        """
+        # the index is used as feature id to merge the tiles
+        gdf = gdf if gdf.index.is_unique else gdf.reset_index(drop=True)
+        self.gdf = gdf.to_crs(4326) if gdf.crs else gdf
+        self.sindex = self.gdf.sindex
+        self.tiles = LRUCache(maxsize=max_tiles)
+        self.visible_tiles = set()
+
+        kwargs["data"] = {"type": "FeatureCollection", "features": []}
+        super().__init__(**kwargs)
+
+    @staticmethod
+    def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+        """Return the (west, south, east, north) bounds of a web-mercator tile.
+
+        Args:
+            z: the zoom level of the tile
+            x: the column of the tile
+            y: the row of the tile
+
+        Returns:
+            the bounds in degrees
+        """
+        n = 2**z
+
+        def lat(row: int) -> float:
+            return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+        return x / n * 360 - 180, lat(y + 1), (x + 1) / n * 360 - 180, lat(y)
+
+    def get_tile(self, z: int, x: int, y: int) -> List[dict]:
+        """Get the features of a tile, they are cut only once.
+
+        Args:
+            z: the zoom level of the tile
+            x: the column of the tile
+            y: the row of the tile
+
+        Returns:
+            the GeoJSON features intersecting the tile
+        """
+        from shapely.geometry import box
+
+        def cut() -> List[dict]:
+            index = self.sindex.query(box(*self.tile_bounds(z, x, y)), predicate="intersects")
+            gdf = self.gdf.iloc[sorted(index)]
+            if z < self.MAX_ZOOM:
+                tolerance = 360 / (256 * 2**z)
+                gdf = gdf.assign(**{gdf.geometry.name: gdf.simplify(tolerance)})
+            return gdf.__geo_interface__["features"]
+
+        return self.tiles.get_or_set((z, x, y), cut)
+
+    def set_bounds(self, bounds: Sequence[Sequence[float]], zoom: float) -> None:
+        """Display the features of the tiles intersecting the bounds.
+
+        Args:
+            bounds: the ((south, west), (north, east)) bounds of the map
+            zoom: the zoom of the map
+        """
+        if not bounds:
+            return
+
+        # find the tiles covering the bounds
+        z = min(int(zoom), self.MAX_ZOOM)
+        (south, west), (north, east) = bounds
+        xmin, ymin = tile_index(north, west, z)
+        xmax, ymax = tile_index(south, east, z)
+        tiles = {(z, x, y) for x in range(xmin, xmax + 1) for y in range(ymin, ymax + 1)}
+
+        # the data are only sent to the frontend when new tiles are visible
+        if tiles == self.visible_tiles:
+            return
+        self.visible_tiles = tiles
+
+        # features overlapping multiple tiles are only sent once
+        features = {}
+        for tile in sorted(tiles):
+            features.update({f["id"]: f for f in self.get_tile(*tile)})
+
+        self.data = {"type": "FeatureCollection", "features": list(features.values())}
+
+        return
@@ -10,27 +10,25 @@ if "GDAL_DATA" in list(os.environ.keys()):
 if "PROJ_LIB" in list(os.environ.keys()):
     del os.environ["PROJ_LIB"]
 
+import asyncio
 import json
 import math
 import random
 import string
 import warnings
-from distutils.util import strtobool
+from concurrent.futures import Future, ThreadPoolExecutor
+from copy import deepcopy
+from functools import partial
 from pathlib import Path
-from typing import List, Optional, Sequence, Union, cast
+from typing import List, Optional, Sequence, Tuple, Union, cast
 
 import ee
 import ipyleaflet as ipl
 import ipyvuetify as v
 import ipywidgets as widgets
-import matplotlib.pyplot as plt
 import numpy as np
-import rioxarray
-from deprecated.sphinx import deprecated
-from localtileserver import TileClient, get_leaflet_tile_layer
-from matplotlib import colorbar
+from deprecated.sphinx import deprecated, versionadded
 from matplotlib import colors as mpc
-from rasterio.crs import CRS
 from typing_extensions import Self
 
 from sepal_ui import color as scolors
@@ -39,18 +37,24 @@ from sepal_ui.frontend import styles as ss
 from sepal_ui.mapping.basemaps import basemap_tiles
 from sepal_ui.mapping.draw_control import DrawControl
 from sepal_ui.mapping.inspector_control import InspectorControl
-from sepal_ui.mapping.layer import EELayer
+from sepal_ui.mapping.layer import EELayer, TiledGeoJSON, ZoomGeoJSON
 from sepal_ui.mapping.layer_state_control import LayerStateControl
 from sepal_ui.mapping.layers_control import LayersControl
 from sepal_ui.mapping.legend_control import LegendControl
+from sepal_ui.mapping.tile_server import BoundTileLayer, get_cog, tile_server
+from sepal_ui.mapping.viz_params import VizParams
 from sepal_ui.mapping.zoom_control import ZoomControl
 from sepal_ui.message import ms
 from sepal_ui.scripts import decorator as sd
 from sepal_ui.scripts import utils as su
+from sepal_ui.scripts.cache import LRUCache
 from sepal_ui.scripts.warning import SepalWarning
 
 __all__ = ["SepalMap"]
 
+PLACEHOLDER_URL = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="
+"A transparent tile used by the EE layers until their url is resolved"
+
 
 class SepalMap(ipl.Map):
     # ##########################################################################
@@ -72,6 +76,12 @@ class SepalMap(ipl.Map):
     state: Optional[sw.StateBar] = None
     "The statebar to inform the user about tile loading"
 
+    map_id_cache: LRUCache = LRUCache(maxsize=256, ttl=3600)
+    "The tile urls of the EE images already displayed, shared by all the maps of the kernel"
+
+    executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=8)
+    "The threads resolving the asynchronous EE layers, shared by all the maps of the kernel"
+
     def __init__(
         self,
         basemaps: List[str] = [],
@@ -151,6 +161,20 @@ class SepalMap(ipl.Map):
         self.add_class(self._id)
 
         v.theme.observe(self._on_theme_change, "dark")
+        self.observe(self._on_zoom_change, "zoom")
+        self.observe(self._on_bounds_change, "bounds")
+
+    def _on_zoom_change(self, change: dict) -> None:
+        """Display the geometries matching the new zoom in the multi-level vector layers."""
+        for layer in self.layers:
+            if isinstance(layer, ZoomGeoJSON):
+                layer.set_zoom(change["new"])
+
+    def _on_bounds_change(self, change: dict) -> None:
+        """Display the tiles intersecting the new bounds in the tiled vector layers."""
+        for layer in self.layers:
+            if isinstance(layer, TiledGeoJSON):
+                layer.set_bounds(change["new"], self.zoom)
 
     def _on_theme_change(self, _) -> None:
         """Change the url of the basemaps."""
@@ -224,6 +248,9 @@ class SepalMap(ipl.Map):
             layer: the localTile layer to zoom on. it needs to embed the "raster" member
             zoom_out: Zoom out the bounding zoom
         """
+        import rioxarray
+        from rasterio.crs import CRS
+
         da = rioxarray.open_rasterio(layer.raster, masked=True)
 
         # unproject if necessary
@@ -259,9 +286,13 @@ class SepalMap(ipl.Map):
         opacity: float = 1.0,
         fit_bounds: bool = True,
         key: str = "",
+        optimize: bool = False,
+        alert: Optional[sw.Alert] = None,
     ) -> ipl.TileLayer:
         """Adds a local raster dataset to the map.
 
+        The raster is rendered by the ``TileServer`` shared by all the maps of the kernel. It renders the tiles in a bounded thread pool and keeps them in memory so panning back and forth doesn't render them again. Use ``prewarm_raster`` to render the tiles of the current view in advance.
+
         If used on a cloud platform (or distant jupyter), this method won't know where the entry point of the client is set and will thus fail to display the image. Please follow instructions from https://localtileserver.banesullivan.com/installation/remote-jupyter.html and set up the ``LOCALTILESERVER_CLIENT_PREFIX`` environment variable.
 
         Args:
@@ -272,17 +303,23 @@ class SepalMap(ipl.Map):
             opacity: the opacity of the layer, default 1.0.
             key: the unequivocal key of the layer. by default use a normalized str of the layer name
             fit_bounds: Whether or not we should fit the map to the image bounds. Default to True.
+            optimize: Whether or not to display a tiled copy of the raster with overviews (COG) if the file is big and lacks them. The copy is stored in the sepal-ui cache folder and reused in later calls. Default to False.
+            alert: the alert displaying the progress of the optimization
 
         Returns:
             the local tile layer embedding the raster member (to be used with other tools of sepal-ui)
         """
-        # force cast to Path and then start the client
+        # heavy dependencies only needed to display local rasters
+        import matplotlib.pyplot as plt
+
+        # force cast to Path and then get the shared client
         image = Path(image)
 
         if not image.is_file():
             raise Exception(ms.mapping.no_image)
 
-        client = TileClient(image)
+        # the displayed file can be an optimized sidecar
+        client = tile_server.get_client(get_cog(image, alert) if optimize else image)
 
         # check inputs
         if layer_name in [layer.name for layer in self.layers]:
@@ -293,14 +330,14 @@ class SepalMap(ipl.Map):
             cmap = plt.get_cmap(name=colormap)
         color_list = [mpc.rgb2hex(cmap(i)) for i in range(cmap.N)]
 
-        da = rioxarray.open_rasterio(image, masked=True)
-        da = da.chunk((1000, 1000))
+        # the number of bands is read from the metadata of the opened file
+        nb_bands = client.rasterio.count
 
         multi_band = False
-        if len(da.band) > 1 and not isinstance(bands, int):
+        if nb_bands > 1 and not isinstance(bands, int):
             multi_band = True
             bands = bands if bands else [3, 2, 1]
-        elif len(da.band) == 1:
+        elif nb_bands == 1:
             bands = 1
 
         if multi_band:
@@ -320,19 +357,23 @@ class SepalMap(ipl.Map):
             }
 
         # create the layer
-        layer = get_leaflet_tile_layer(
-            client,
-            style=style,
+        # the raster is embeded in the layer as an extra member for the v_inspector
+        layer_id = tile_server.register(client, style)
+        south, north, west, east = client.bounds()
+        layer = BoundTileLayer(
+            raster=image,
+            layer_id=layer_id,
+            url=tile_server.get_url(layer_id),
+            bounds=[[south, west], [north, east]],
+            attribution="Raster file served by sepal-ui",
             name=layer_name,
             opacity=opacity,
             max_zoom=20,
             max_native_zoom=20,
+            show_loading=True,
         )
         self.add_layer(layer, key=key)
 
-        # add the da to the layer as an extra member for the v_inspector
-        layer.raster = str(image)
-
         # zoom on the layer if requested
         if fit_bounds is True:
             self.center = client.center()
@@ -340,6 +381,26 @@ class SepalMap(ipl.Map):
 
         return layer
 
+    @versionadded(version="2.18.0")
+    def prewarm_raster(self, layer: BoundTileLayer, zoom_levels: int = 1) -> List[Future]:
+        """Render in the background the tiles of a raster layer covering the current view.
+
+        The tiles are rendered by the shared ``TileServer`` threads and kept in its cache. If the map is not displayed yet, the full extent of the raster is used.
+
+        Args:
+            layer: a layer created by ``add_raster``
+            zoom_levels: the number of zoom levels to prepare, starting from the current one
+
+        Returns:
+            the futures of the tile renderings
+        """
+        zoom = int(round(self.zoom))
+        futures = []
+        for z in range(zoom, min(zoom + zoom_levels, layer.max_native_zoom + 1)):
+            futures += tile_server.prewarm(layer.layer_id, self.bounds, z)
+
+        return futures
+
     @deprecated(version="2.8.0", reason="use dc methods instead")
     def show_dc(self) -> Self:
         """Show the drawing control on the map."""
@@ -382,6 +443,9 @@ class SepalMap(ipl.Map):
             layer_name: Layer name of the colorbar to be associated with. Defaults to None.
             kwargs: any other argument of the colorbar object from matplotlib
         """
+        import matplotlib.pyplot as plt
+        from matplotlib import colorbar
+
         width, height = 6.0, 0.4
         alpha = 1
 
@@ -450,13 +514,18 @@ class SepalMap(ipl.Map):
         opacity: float = 1.0,
         viz_name: str = "",
         key: str = "",
-    ) -> None:
+        cache: bool = True,
+        asynchronous: bool = False,
+    ) -> Optional[Future]:
         """Customized add_layer method designed for EE objects.
 
         Copy the addLayer method from geemap to read and guess the vizaulization
         parameters the same way as in SEPAL recipes.
         If the vizparams are empty and visualization metadata exist, SepalMap will use
         them automatically.
+        The tile url of the image is searched in the ``map_id_cache`` first so re-adding a layer doesn't call the server again.
+
+        If ``asynchronous`` is set, the layer is added at once with an empty placeholder url and the server calls are performed by the ``executor`` threads. The layer is flagged as loading in the ``LayerStateControl`` and pending (ignored by the inspector) until its url is set. If the resolution fails, the placeholder is removed and the error is reported in the statebar, as a ``SepalWarning`` and in the returned future.
 
         Args:
             ee_object: the ee OBject to draw on the map
@@ -466,6 +535,11 @@ class SepalMap(ipl.Map):
             opacity: the opcity of the layer from 0 to 1, default to 1.
             viz_name: the name of the vizaulization you want to use. default to the first one if existing
             key: the unequivocal key of the layer. by default use a normalized str of the layer name
+            cache: whether to use the tile url cache or not. default to True
+            asynchronous: whether to resolve the tile url in the background or not. default to False
+
+        Returns:
+            the future of the url resolution if asynchronous, None otherwise
         """
         # check the type of the ee object and raise an error if it's not recognized
         if not isinstance(
@@ -483,20 +557,73 @@ class SepalMap(ipl.Map):
                 "one of ee.Image, ee.Geometry, ee.Feature or ee.FeatureCollection."
             )
 
-        # get the list of viz params
-        viz = self.get_viz_params(ee_object)
+        # create the layer based on these new values
+        if not name:
+            layer_count = len(self.layers)
+            name = "Layer " + str(layer_count + 1)
 
-        # get the requested vizparameters name
-        # if non is set use the first one
-        if viz:
-            viz_name = viz_name or viz[next(iter(viz))]["name"]
+        args = (ee_object, vis_params, viz_name, cache)
+        obj, url = (ee_object, PLACEHOLDER_URL) if asynchronous else self._resolve_ee_layer(*args)
+
+        # create the colored image
+        tile_layer = EELayer(
+            ee_object=obj,
+            url=url,
+            attribution="Google Earth Engine",
+            name=name,
+            opacity=opacity,
+            visible=shown,
+            max_zoom=24,
+        )
+
+        self.add_layer(tile_layer, key=key)
+
+        if not asynchronous:
+            return None
+
+        # flag the placeholder as loading once it's monitored by the statebar
+        # and resolve the url in the background
+        tile_layer.pending = True
+        tile_layer.set_trait("loading", True)
+        future = self.executor.submit(self._resolve_ee_layer, *args)
+
+        # the widgets are updated back in the event loop of the caller (the kernel one in a notebook)
+        # so that the trait observers never run concurrently. Without running loop (scripts)
+        # the update is done in the worker thread.
+        callback = partial(self._set_ee_layer, tile_layer)
+        try:
+            loop = asyncio.get_running_loop()
+            future.add_done_callback(lambda f: loop.call_soon_threadsafe(callback, f))
+        except RuntimeError:
+            future.add_done_callback(callback)
+
+        return future
+
+    def _resolve_ee_layer(
+        self, ee_object: ee.ComputedObject, vis_params: dict, viz_name: str, cache: bool
+    ) -> Tuple[ee.ComputedObject, str]:
+        """Compute the displayed object and the tile url of an EE layer.
+
+        This method performs all the server calls needed by ``add_ee_layer``.
+
+        Args:
+            ee_object: the ee OBject to draw on the map
+            vis_params: the visualization parameters set as in GEE
+            viz_name: the name of the vizaulization you want to use. default to the first one if existing
+            cache: whether to use the tile url cache or not
+
+        Returns:
+            the object stored in the EELayer and the url of its tiles
+        """
+        # get the list of viz params, only needed if no vis_params are provided
+        viz = VizParams() if vis_params else self.get_viz_params(ee_object)
 
         # apply it to vis_params
-        if not vis_params and viz:
+        if viz:
             # find the viz params in the list
-            try:
-                vis_params = next(i for p, i in viz.items() if i["name"] == viz_name)
-            except StopIteration:
+            # if no name is set use the first one
+            vis_params = viz.get_params(viz_name)
+            if vis_params is None:
                 raise ValueError(
                     f"the provided viz_name ({viz_name}) cannot be found in the image metadata"
                 )
@@ -559,11 +686,6 @@ class SepalMap(ipl.Map):
                 ee_object = asset.select(vis_params["bands"]).hsvToRgb()
                 vis_params["bands"] = ["red", "green", "blue"]
 
-        # create the layer based on these new values
-        if not name:
-            layer_count = len(self.layers)
-            name = "Layer " + str(layer_count + 1)
-
         # force cast to featureCollection if needed
         if isinstance(
             ee_object,
@@ -608,22 +730,56 @@ class SepalMap(ipl.Map):
         elif isinstance(ee_object, ee.imagecollection.ImageCollection):
             image = obj = ee_object.mosaic()
 
-        # create the colored image
-        map_id_dict = ee.Image(image).getMapId(vis_params)
-        tile_layer = EELayer(
-            ee_object=obj,
-            url=map_id_dict["tile_fetcher"].url_format,
-            attribution="Google Earth Engine",
-            name=name,
-            opacity=opacity,
-            visible=shown,
-            max_zoom=24,
-        )
+        return obj, self.get_tile_url(image, vis_params, cache)
 
-        self.add_layer(tile_layer, key=key)
+    def _set_ee_layer(self, layer: EELayer, future: Future) -> None:
+        """Set the resolved url of a placeholder layer or remove it if the resolution failed.
+
+        Args:
+            layer: the placeholder layer
+            future: the finished resolution of the layer
+        """
+        # stop the loading before any removal so that the statebar count stays consistent
+        layer.set_trait("loading", False)
+
+        if future.exception() is not None:
+            self.remove_layer(layer, none_ok=True)
+            msg = ms.layer_state.error.format(layer.name, future.exception())
+            self.state.w_state.msg = msg
+            warnings.warn(msg, SepalWarning)
+            return
+
+        layer.ee_object, layer.url = future.result()
+        layer.pending = False
 
         return
 
+    @classmethod
+    def get_tile_url(cls, image: ee.Image, vis_params: dict = {}, cache: bool = True) -> str:
+        """Return the tile url of an EE image rendered with the given visualization parameters.
+
+        The url is read from the ``map_id_cache`` if the same expression has already been rendered with the same parameters. The key of the cache is the serialized image expression so no server call is needed to look it up.
+
+        Args:
+            image: the image to display
+            vis_params: the visualization parameters set as in GEE
+            cache: whether to use the cache or to always call the server
+
+        Returns:
+            the xyz url of the image tiles
+        """
+        image = ee.Image(image)
+
+        def _get_url() -> str:
+            return image.getMapId(vis_params)["tile_fetcher"].url_format
+
+        if cache is False:
+            return _get_url()
+
+        key = (image.serialize(), json.dumps(vis_params, sort_keys=True, default=str))
+
+        return cls.map_id_cache.get_or_set(key, _get_url)
+
     @staticmethod
     def get_basemap_list() -> List[str]:
         """Get the complete list of available basemaps.
@@ -634,83 +790,33 @@ class SepalMap(ipl.Map):
         Returns:
             The list of the basemap names
         """
-        return [k for k in basemap_tiles.keys()]
+        return list(basemap_tiles.keys())
 
     @staticmethod
-    def get_viz_params(image: ee.Image) -> dict:
+    def get_viz_params(image: ee.Image) -> VizParams:
         """Return the vizual parameters that are set in the metadata of the image.
 
+        Only the visualization properties are requested in a single server call and the parsed result is memoized for each image (see :py:class:`VizParams <sepal_ui.mapping.VizParams>`).
+
         Args:
             image: the image to analyse
 
         Returns:
             The dictionary of the find properties
         """
-        # the constant prefix for SEPAL visualization parameters
-        PREFIX = "visualization"
-
-        # init the property list
-        props = {}
-
         # check image type
         if not isinstance(image, ee.Image):
-            return props
-
-        # check that image have properties
-        if "properties" not in image.getInfo():
-            return props
-
-        # build a raw prop list
-        raw_prop_list = {
-            p: val for p, val in image.getInfo()["properties"].items() if p.startswith(PREFIX)
-        }
-
-        # decompose each property by its number
-        # and gather the properties in a sub dictionary
-        for p, val in raw_prop_list.items():
-            # extract the number and create the sub-dict
-            _, number, name = p.split("_")
-            props.setdefault(number, {})
-
-            # modify the values according to prop key
-            if isinstance(val, str):
-                if name in ["bands", "palette", "labels"]:
-                    val = val.split(",")
-                elif name in ["max", "min", "values"]:
-                    val = [float(i) for i in val.split(",")]
-                elif name in ["inverted"]:
-                    val = [bool(strtobool(i)) for i in val.split(",")]
-
-            # set the value
-            props[number][name] = val
-
-        for i in props.keys():
-            if "type" in props[i]:
-                # categorical values need to be cast to int
-                if props[i]["type"] == "categorical":
-                    props[i]["values"] = [int(val) for val in props[i]["values"]]
-            else:
-                # if no "type" is provided guess it from the different parameters gathered
-                if len(props[i]["bands"]) == 1:
-                    props[i]["type"] = "continuous"
-                elif len(props[i]["bands"]) == 3:
-                    props[i]["type"] = "rgb"
-                else:
-                    warnings.warn(
-                        "the embed viz properties are incomplete or badly set, "
-                        "please review our documentation",
-                        SepalWarning,
-                    )
-                    props = {}
-
-        return props
+            return VizParams()
+
+        # return a copy to protect the memoized values
+        return deepcopy(VizParams.from_image(image))
 
     def remove_layer(
         self, key: Union[ipl.Layer, int, str], base: bool = False, none_ok: bool = False
     ) -> None:
         """Remove a layer based on a key.
 
-        The key can be, a Layer object, the name of a layer or the index in the layer list.
+        The key can be, a Layer object, the name of a layer or the index in the layer list. The local raster layers are also unregistered from the tile server.
 
         Args:
             key: the key to find the layer to delete
@@ -723,6 +829,10 @@ class SepalMap(ipl.Map):
         if layer is not None:
             super().remove(layer)
 
+        # local rasters are not served anymore
+        if isinstance(layer, BoundTileLayer):
+            tile_server.unregister(layer.layer_id)
+
         return
 
     def remove_all(self, base: bool = False) -> None:
@@ -755,8 +865,12 @@ class SepalMap(ipl.Map):
         layer.key = key if key else su.normalize_str(layer.name)
 
         # remove existing layer before addition
+        # (a layer added again is only moved on top so that its tiles are still served)
         existing_layer = self.find_layer(layer.key, none_ok=True)
-        not existing_layer or self.remove_layer(existing_layer)
+        if existing_layer is layer:
+            super().remove(layer)
+        elif existing_layer is not None:
+            self.remove_layer(existing_layer)
 
         # apply default coloring for geoJson
         if isinstance(layer, ipl.GeoJSON):
@@ -771,6 +885,12 @@ class SepalMap(ipl.Map):
             hover_style = default_hover_style if hover else layer.hover_style
             layer.hover_style = layer.hover_style or hover_style
 
+        # display the geometries matching the current zoom
+        if isinstance(layer, ZoomGeoJSON):
+            layer.set_zoom(self.zoom)
+        elif isinstance(layer, TiledGeoJSON):
+            layer.set_bounds(self.bounds, self.zoom)
+
         super().add(layer)
 
         return
@@ -781,7 +901,7 @@ class SepalMap(ipl.Map):
         Args:
             basemap: Can be one of string from basemaps. Defaults to 'HYBRID'.
         """
-        if basemap not in basemap_tiles.keys():
+        if basemap not in basemap_tiles:
             keys = "\n".join(basemap_tiles.keys())
             msg = f"Basemap can only be one of the following:\n{keys}"
             raise ValueError(msg)
@@ -0,0 +1,424 @@
+"""Tile server shared by all the maps to display the local rasters."""
+
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from deprecated.sphinx import versionadded
+from ipyleaflet import TileLayer
+
+from sepal_ui.conf import cache_dir
+from sepal_ui.message import ms
+from sepal_ui.scripts.cache import LRUCache
+from sepal_ui.scripts.tiles import tile_index
+
+__all__ = ["BoundTileLayer", "TileServer", "get_cog", "needs_cog"]
+
+TILE_PATH = re.compile(r"/(?P<layer_id>\w+)/(?P<z>\d+)/(?P<x>\d+)/(?P<y>\d+)\.png")
+"The path of the tiles requested to the server"
+
+COG_MIN_SIZE = 1024
+"The size (in pixels) from which a raster needs to be tiled and to embed overviews to be displayed"
+
+COG_BLOCK_SIZE = 512
+"The size of the internal tiles of the generated sidecar rasters"
+
+
+@versionadded(version="2.18.0")
+class BoundTileLayer(TileLayer):
+
+    raster: str = ""
+    "The path to the displayed raster file"
+
+    layer_id: str = ""
+    "The id of the layer in the tile server"
+
+    def __init__(self, raster: Union[str, Path], layer_id: str, **kwargs) -> None:
+        """TileLayer displaying a local raster rendered by the shared ``TileServer``.
+
+        Args:
+            raster: the path to the displayed raster file
+            layer_id: the id of the layer in the tile server
+            kwargs: any argument of an ipyleaflet.TileLayer
+        """
+        self.raster = str(raster)
+        self.layer_id = layer_id
+
+        super().__init__(**kwargs)
+
+
+@versionadded(version="2.18.0")
+class TileServer:
+
+    max_workers: int = 4
+    "The number of threads rendering the tiles"
+
+    tiles: Optional[LRUCache] = None
+    "The rendered tiles keyed by (layer_id, z, x, y), bounded by their size in bytes"
+
+    clients: Optional[LRUCache] = None
+    "The local tile clients of the rasters keyed by path, modification time and size"
+
+    executor: Optional[ThreadPoolExecutor] = None
+    "The bounded pool of threads rendering the tiles requested by the browser or prewarmed"
+
+    sources: Dict[str, Tuple[Any, dict]] = {}
+    "The tile client and the style of each registered layer"
+
+    port: Optional[int] = None
+    "The port of the server, None if it's not started yet"
+
+    def __init__(self, max_workers: int = 4, max_bytes: int = 256 * 2**20) -> None:
+        """Single tile server rendering all the local rasters of the kernel.
+
+        The server is a small WSGI application started in a background thread on the first layer registration. Tiles are rendered with ``localtileserver`` in a bounded thread pool and kept in memory in a LRU cache limited by size. A tile requested several times while it's rendered is only rendered once.
+
+        Args:
+            max_workers: the number of threads rendering the tiles
+            max_bytes: the maximum size of the rendered tiles kept in memory (in bytes)
+        """
+        self.max_workers = max_workers
+        self.tiles = LRUCache(maxsize=100_000, maxbytes=max_bytes)
+        self.clients = LRUCache(maxsize=64)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.sources = {}
+        self.port = None
+
+        self._server = None
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[str, int, int, int], Future] = {}
+
+    def configure(self, max_workers: Optional[int] = None, max_bytes: Optional[int] = None) -> None:
+        """Change the number of rendering threads or the size of the tile cache.
+
+        Args:
+            max_workers: the number of threads rendering the tiles
+            max_bytes: the maximum size of the rendered tiles kept in memory (in bytes)
+        """
+        if max_workers is not None and max_workers != self.max_workers:
+            executor, self.executor = self.executor, ThreadPoolExecutor(max_workers=max_workers)
+            self.max_workers = max_workers
+            executor.shutdown(wait=False)
+
+        if max_bytes is not None:
+            self.tiles.maxbytes = max_bytes
+
+        return
+
+    def get_client(self, raster: Union[str, Path]) -> Any:
+        """Return the local tile client of a raster.
+
+        The client is reused as long as the file is not modified.
+
+        Args:
+            raster: the path to the raster file
+
+        Returns:
+            the ``localtileserver.client.LocalTileClient`` of the file
+        """
+        from localtileserver.client import LocalTileClient
+
+        raster = Path(raster).resolve()
+        stat = raster.stat()
+        key = (str(raster), stat.st_mtime, stat.st_size)
+
+        return self.clients.get_or_set(key, lambda: LocalTileClient(raster))
+
+    def start(self) -> int:
+        """Start the server in a background thread if it's not running yet.
+
+        Returns:
+            the port of the server
+        """
+        from server_thread import ServerThread
+
+        with self._lock:
+            if self._server is None:
+                self._server = ServerThread(self, port=0)
+                self.port = self._server.port
+
+        return self.port
+
+    @property
+    def base_url(self) -> str:
+        """The url of the server as seen by the browser.
+
+        It uses the same environment variables as ``localtileserver`` (``LOCALTILESERVER_CLIENT_HOST``, ``LOCALTILESERVER_CLIENT_PORT`` and ``LOCALTILESERVER_CLIENT_PREFIX``) to work behind a proxy.
+        """
+        from localtileserver.configure import get_default_client_params
+
+        host, port, prefix = get_default_client_params()
+
+        if host is None and port is None and prefix is None:
+            return f"http://127.0.0.1:{self.port}"
+
+        scheme = "http://" if host is not None and not host.startswith("http") else ""
+        if host is not None:
+            base = f"{scheme}{host}" if port is None else f"{scheme}{host}:{port}"
+        elif port is not None:
+            base = f"http://127.0.0.1:{port}"
+        else:
+            base = "/"
+
+        if prefix is not None:
+            base = f"{base}{prefix.replace('{port}', str(self.port))}"
+
+        return f"/{base.lstrip('/')}" if base.startswith("/") else base
+
+    def register(self, client: Any, style: dict) -> str:
+        """Register a raster style in the server.
+
+        Args:
+            client: the local tile client of the raster
+            style: the large-image style of the layer
+
+        Returns:
+            the id of the layer in the server
+        """
+        self.start()
+        layer_id = uuid.uuid4().hex
+        self.sources[layer_id] = (client, style)
+
+        return layer_id
+
+    def unregister(self, layer_id: str) -> None:
+        """Remove a layer from the server, its tiles are not served anymore.
+
+        Args:
+            layer_id: the id of the layer in the server
+        """
+        self.sources.pop(layer_id, None)
+
+        return
+
+    def get_url(self, layer_id: str) -> str:
+        """Return the xyz url template of a registered layer.
+
+        Args:
+            layer_id: the id of the layer in the server
+
+        Returns:
+            the url of the layer tiles
+        """
+        return f"{self.base_url.rstrip('/')}/{layer_id}/{{z}}/{{x}}/{{y}}.png"
+
+    def _render(self, layer_id: str, z: int, x: int, y: int) -> bytes:
+        """Render a tile of a registered layer."""
+        client, style = self.sources[layer_id]
+        return bytes(client.get_tile(z, x, y, style=style))
+
+    def _fill(self, key: Tuple[str, int, int, int]) -> bytes:
+        """Render a tile in the thread pool and store it in the cache."""
+        try:
+            start = time.perf_counter()
+            tile = self._render(*key)
+            self.tiles.set(key, tile, time.perf_counter() - start)
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+        return tile
+
+    def _submit(self, key: Tuple[str, int, int, int]) -> Future:
+        """Return the rendering of a tile, only one rendering of the same tile runs at a time."""
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._pending[key] = self.executor.submit(self._fill, key)
+
+        return future
+
+    def get_tile(self, layer_id: str, z: int, x: int, y: int) -> bytes:
+        """Return a tile from the cache or wait for its rendering in the thread pool.
+
+        Args:
+            layer_id: the id of the layer in the server
+            z: the zoom level of the tile
+            x: the column of the tile
+            y: the row of the tile
+
+        Returns:
+            the png bytes of the tile
+        """
+        key, missing = (layer_id, z, x, y), object()
+        tile = self.tiles.get(key, missing)
+
+        return self._submit(key).result() if tile is missing else tile
+
+    def prewarm(
+        self, layer_id: str, bounds: Optional[Sequence[Sequence[float]]], zoom: int
+    ) -> List[Future]:
+        """Render in the background the tiles of a layer that cover the given bounds.
+
+        The tiles are rendered in the thread pool and stored in the cache so that they are served at once when the browser requests them.
+
+        Args:
+            layer_id: the id of the layer in the server
+            bounds: the ((south, west), (north, east)) bounds to cover, default to the full raster
+            zoom: the zoom level of the tiles
+
+        Returns:
+            the futures of the tile renderings
+        """
+        # restrict the bounds to the raster extent
+        client, _ = self.sources[layer_id]
+        south, north, west, east = client.bounds()
+        if bounds:
+            (s, w), (n, e) = bounds
+            south, north, west, east = max(s, south), min(n, north), max(w, west), min(e, east)
+
+        if south > north or west > east:
+            return []
+
+        xmin, ymin = tile_index(north, west, zoom)
+        xmax, ymax = tile_index(south, east, zoom)
+
+        futures = []
+        for x in range(xmin, xmax + 1):
+            for y in range(ymin, ymax + 1):
+                key = (layer_id, zoom, x, y)
+                if key not in self.tiles:
+                    futures.append(self._submit(key))
+
+        return futures
+
+    def __call__(self, environ: dict, start_response: Callable) -> List[bytes]:
+        """Answer the tile requests of the browser (WSGI application)."""
+        match = TILE_PATH.fullmatch(environ.get("PATH_INFO", ""))
+        if match is None or match.group("layer_id") not in self.sources:
+            start_response("404 Not Found", [("Content-Type", "text/plain")])
+            return [b"unknown tile"]
+
+        layer_id = match.group("layer_id")
+        z, x, y = (int(match.group(i)) for i in ["z", "x", "y"])
+
+        try:
+            tile = self.get_tile(layer_id, z, x, y)
+        except Exception as e:
+            start_response("500 Internal Server Error", [("Content-Type", "text/plain")])
+            return [str(e).encode()]
+
+        headers = [
+            ("Content-Type", "image/png"),
+            ("Content-Length", str(len(tile))),
+            ("Access-Control-Allow-Origin", "*"),
+        ]
+        start_response("200 OK", headers)
+
+        return [tile]
+
+
+tile_server: TileServer = TileServer()
+"The tile server shared by all the maps of the kernel"
+
+
+@versionadded(version="2.18.0")
+def needs_cog(raster: Union[str, Path]) -> bool:
+    """Check if a raster is too big to be displayed without internal tiles and overviews.
+
+    Args:
+        raster: the path to the raster file
+
+    Returns:
+        True if the raster is bigger than ``COG_MIN_SIZE`` and is not tiled or has no overviews
+    """
+    import rasterio as rio
+
+    with rio.open(raster) as ds:
+        if max(ds.width, ds.height) <= COG_MIN_SIZE:
+            return False
+
+        return not (ds.profile.get("tiled", False) and ds.overviews(1))
+
+
+@versionadded(version="2.18.0")
+def get_cog(raster: Union[str, Path], alert: Optional[Any] = None) -> Path:
+    """Return a version of the raster that is tiled and embeds overviews.
+
+    If the raster needs it, a Cloud Optimized GeoTIFF sidecar is written in the sepal-ui cache folder. Its name is based on the source path, modification time and size so it's reused as long as the source is not modified.
+
+    Args:
+        raster: the path to the raster file
+        alert: a ``sw.Alert`` to display the progress of the generation
+
+    Returns:
+        the path to the sidecar file or to the raster itself if it's already optimized
+    """
+    import numpy as np
+    import rasterio as rio
+    from rasterio.enums import Resampling
+    from rasterio.shutil import copy
+
+    raster = Path(raster).resolve()
+    if not needs_cog(raster):
+        return raster
+
+    stat = raster.stat()
+    key = hashlib.md5(f"{raster}:{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest()
+    sidecar = cache_dir / "cog" / f"{raster.stem}_{key}.tif"
+    if sidecar.is_file():
+        return sidecar
+
+    sidecar.parent.mkdir(parents=True, exist_ok=True)
+
+    def update(progress: float) -> None:
+        not alert or alert.update_progress(progress, ms.mapping.cog.format(raster.name))
+
+    # the files are written with unique temporary names and moved in place at the end
+    # so that concurrent or interrupted calls never leave a truncated sidecar
+    def temporary() -> Path:
+        fd, name = tempfile.mkstemp(suffix=".tif", prefix=f"{sidecar.stem}_", dir=sidecar.parent)
+        os.close(fd)
+        return Path(name)
+
+    tmp, cog = temporary(), temporary()
+
+    # the GDAL creation options of the tiled copy and of the COG
+    options = {
+        "tiled": True,
+        "blockxsize": COG_BLOCK_SIZE,
+        "blockysize": COG_BLOCK_SIZE,
+        "compress": "deflate",
+        "BIGTIFF": "IF_SAFER",
+    }
+
+    try:
+        # write a tiled copy of the raster block by block
+        # the progress is only updated every percent to limit the widget updates
+        with rio.open(raster) as src:
+            profile = src.profile.copy()
+            profile.update(driver="GTiff", **options)
+            with rio.open(tmp, "w", **profile) as dst:
+                windows = [w for _, w in dst.block_windows(1)]
+                for i, window in enumerate(windows):
+                    dst.write(src.read(window=window), window=window)
+                    if int(100 * i / len(windows)) != int(100 * (i + 1) / len(windows)):
+                        update(0.8 * (i + 1) / len(windows))
+
+        # build the overviews down to a single tile
+        with rio.open(tmp, "r+") as dst:
+            is_float = np.issubdtype(np.dtype(dst.dtypes[0]), np.floating)
+            resampling = Resampling.average if is_float else Resampling.nearest
+            factors, size = [], max(dst.width, dst.height)
+            while size / 2 ** len(factors) > COG_BLOCK_SIZE:
+                factors.append(2 ** (len(factors) + 1))
+            dst.build_overviews(factors, resampling)
+        update(0.9)
+
+        # reorganize the file as a COG and move it in place
+        copy(tmp, cog, driver="GTiff", copy_src_overviews=True, **options)
+        os.replace(cog, sidecar)
+        update(1)
+
+    finally:
+        tmp.unlink(missing_ok=True)
+        cog.unlink(missing_ok=True)
+
+    return sidecar
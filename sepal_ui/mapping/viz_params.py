@@ -0,0 +1,128 @@
+"""Parsed visualization parameters embedded in the metadata of EE images."""
+
+import warnings
+from copy import deepcopy
+from typing import List, Optional
+
+import ee
+from deprecated.sphinx import versionadded
+from typing_extensions import Self
+
+from sepal_ui.scripts.cache import LRUCache
+from sepal_ui.scripts.warning import SepalWarning
+
+__all__ = ["VizParams"]
+
+
+@versionadded(version="2.18.0")
+class VizParams(dict):
+
+    PREFIX: str = "visualization"
+    "The constant prefix of the SEPAL visualization properties"
+
+    cache: LRUCache = LRUCache(maxsize=256)
+    "The parsed visualization parameters of the images already requested"
+
+    def __init__(self, properties: dict = {}) -> None:
+        """Dictionary of the visualization parameters set in the metadata of an image.
+
+        The SEPAL visualization properties are named ``visualization_<number>_<name>`` and their values are stored as comma separated strings. They are parsed once and gathered by number: ``{"0": {"name": ..., "bands": [...], "type": ...}, ...}``.
+
+        Args:
+            properties: the image properties. Only the ones starting with "visualization" are used.
+        """
+        super().__init__()
+
+        # decompose each property by its number
+        # and gather the properties in a sub dictionary
+        for p, val in properties.items():
+            if not p.startswith(self.PREFIX):
+                continue
+
+            # extract the number and create the sub-dict
+            _, number, name = p.split("_")
+            self.setdefault(number, {})
+
+            # modify the values according to prop key
+            if isinstance(val, str):
+                if name in ["bands", "palette", "labels"]:
+                    val = val.split(",")
+                elif name in ["max", "min", "values"]:
+                    val = [float(i) for i in val.split(",")]
+                elif name in ["inverted"]:
+                    val = [self._to_bool(i) for i in val.split(",")]
+
+            # set the value
+            self[number][name] = val
+
+        for i in self.keys():
+            if "type" in self[i]:
+                # categorical values need to be cast to int
+                if self[i]["type"] == "categorical":
+                    self[i]["values"] = [int(val) for val in self[i]["values"]]
+            else:
+                # if no "type" is provided guess it from the different parameters gathered
+                if len(self[i]["bands"]) == 1:
+                    self[i]["type"] = "continuous"
+                elif len(self[i]["bands"]) == 3:
+                    self[i]["type"] = "rgb"
+                else:
+                    warnings.warn(
+                        "the embed viz properties are incomplete or badly set, "
+                        "please review our documentation",
+                        SepalWarning,
+                    )
+                    self.clear()
+                    break
+
+    @classmethod
+    def from_image(cls, image: ee.Image, cache: bool = True) -> Self:
+        """Read the visualization parameters of an image in a single server call.
+
+        Only the "visualization" properties are requested to the server (not the bands description). The result is memoized using the serialized image expression as key.
+
+        Args:
+            image: the image to analyse
+            cache: whether to use the memoized values or not
+
+        Returns:
+            the parsed visualization parameters
+        """
+
+        def _read() -> Self:
+            names = image.propertyNames().filter(ee.Filter.stringStartsWith("item", cls.PREFIX))
+            return cls(image.toDictionary(names).getInfo())
+
+        if cache is False:
+            return _read()
+
+        return cls.cache.get_or_set(image.serialize(), _read)
+
+    @staticmethod
+    def _to_bool(value: str) -> bool:
+        """Cast a str representation of a boolean (true/false, yes/no, 1/0...)."""
+        return value.strip().lower() in ["true", "t", "yes", "y", "on", "1"]
+
+    @property
+    def names(self) -> List[str]:
+        """The names of the available visualizations."""
+        return [p.get("name") for p in self.values()]
+
+    def get_params(self, name: str = "") -> Optional[dict]:
+        """Return a copy of the visualization parameters using the given name.
+
+        The returned dictionary can be modified without altering the memoized values.
+
+        Args:
+            name: the name of the visualization. default to the first one.
+
+        Returns:
+            the visualization parameters or None if the name cannot be found
+        """
+        if not self:
+            return None
+
+        name = name or self.names[0]
+        params = next((p for p in self.values() if p.get("name") == name), None)
+
+        return deepcopy(params)
@@ -12,5 +12,21 @@ Example:
         planetapi.PlanetView()
 """
 
-from .planet_model import *
-from .planet_view import *
+from typing import TYPE_CHECKING
+
+from sepal_ui.scripts import lazy
+
+# the modules are only imported when one of their member is requested
+# the sepal-ui members exposed by the former star imports (ms, sw...) are kept for backward compatibility
+__getattr__, __dir__, __all__ = lazy.attach(
+    __name__,
+    {
+        "planet_model": ["Model", "PlanetModel", "ms"],
+        "planet_view": ["PlanetView", "loading_button"],
+        "planet_widgets": ["InfoCard", "InfoView", "sw"],
+    },
+)
+
+if TYPE_CHECKING:
+    from .planet_model import *
+    from .planet_view import *
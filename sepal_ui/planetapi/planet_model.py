@@ -1,29 +1,106 @@
 """Model object dedicated to Planet interface."""
 
 import asyncio
+import json
+import math
+import queue
+import threading
+import time
+from bisect import bisect_right
+from concurrent.futures import Future
 from datetime import datetime
-from typing import Dict, List, Optional, Union
-
-import nest_asyncio
+from functools import wraps
+from hashlib import sha256
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Coroutine,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Union,
+)
+
+import ipyvuetify as v
 import planet.data_filter as filters
 import traitlets as t
-from deprecated.sphinx import deprecated
+from deprecated.sphinx import deprecated, versionadded
 from planet import DataClient
 from planet.auth import Auth
-from planet.exceptions import NoPermission
+from planet.exceptions import MissingResource, NoPermission
 from planet.http import Session
+from shapely import geometry as sg
+from shapely.ops import unary_union
 
+from sepal_ui.conf import cache_dir
 from sepal_ui.message import ms
 from sepal_ui.model import Model
 
-# known problem https://github.com/jupyter/notebook/issues/3397
-nest_asyncio.apply()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+"The event loop shared by all the planet models, running in a background thread"
+
+_loop_lock: threading.Lock = threading.Lock()
+"The lock preventing the shared event loop from being started twice"
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Return the event loop shared by all the planet models, it's started on the first call.
+
+    Returns:
+        the running event loop
+    """
+    global _loop
+
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, daemon=True).start()
+
+    return _loop
+
+
+def _in_loop(func: Callable) -> Callable:
+    """Decorator to execute a coroutine method of the model in the model event loop.
+
+    The session of the model can then be used from any other event loop (e.g. the Jupyter one).
+
+    Args:
+        func: the coroutine method of the model
+
+    Returns:
+        The return statement of the decorated method
+    """
+
+    @wraps(func)
+    async def wrapper_loop(self, *args, **kwargs):
+        coro = func(self, *args, **kwargs)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is self.loop:
+            return await coro
+
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+    return wrapper_loop
 
 
 class PlanetModel(Model):
     SUBS_URL: str = "https://api.planet.com/auth/v1/experimental/public/my/subscriptions"
     "The url of the planet API subscription"
 
+    EARTH_CIRCUMFERENCE: float = 40075016.68557849
+    "The length of the equator in the web-mercator projection used by the mosaics (m)"
+
+    MAX_CONCURRENCY: int = 16
+    "The maximum number of quads requested at the same time"
+
     credentials: List[str] = []
     "list containing [api_key] or pair of [username, password] to log in"
 
@@ -36,6 +113,21 @@ class PlanetModel(Model):
     active = t.Bool(False).tag(sync=True)
     "Value to determine if at least one subscription has the active true state"
 
+    loop: Optional[asyncio.AbstractEventLoop] = None
+    "The event loop running in a background thread that owns the session, shared by all the models"
+
+    MOSAICS_CACHE_DIR: Path = cache_dir / "planet" / "mosaics"
+    "The folder where the mosaic catalogues are cached, one file per API key"
+
+    MOSAICS_TTL: int = 24 * 3600
+    "The number of seconds before the cached mosaic catalogues are reloaded from the API"
+
+    _catalogue: Optional[dict] = None
+    "The mosaics of the current session indexed by name and by date"
+
+    _catalogue_task: Optional[asyncio.Future] = None
+    "The running load of the mosaic catalogue"
+
     def __init__(self, credentials: Union[str, List[str]] = "") -> None:
         """Planet model helper to connect planet API client and perform requests.
 
@@ -46,8 +138,11 @@ class PlanetModel(Model):
         Args:
             credentials: planet API key or tuple of username and password of planet explorer.
         """
+        # a single event loop thread is started for all the models of the kernel
+        self.loop = _get_loop()
+
         self.subscriptions = {}
-        self.session = None
+        self.close_session()
         self.active = False
 
         if credentials:
@@ -81,6 +176,8 @@ class PlanetModel(Model):
             self.auth = Auth.from_key(credentials[0])
 
         self.credentials = self.auth._key
+        self._catalogue = None
+        self.close_session()
         self.session = Session(auth=self.auth)
         self._is_active()
 
@@ -113,16 +210,53 @@ class PlanetModel(Model):
 
         return
 
+    @versionadded(version="2.18.0")
+    def run(self, coro: Coroutine) -> Any:
+        """Run a coroutine in the model event loop and wait for its result.
+
+        Args:
+            coro: the coroutine to run
+
+        Returns:
+            the result of the coroutine
+        """
+        return self.submit(coro).result()
+
+    @versionadded(version="2.18.0")
+    def submit(self, coro: Coroutine) -> Future:
+        """Schedule a coroutine in the model event loop without waiting.
+
+        Args:
+            coro: the coroutine to run
+
+        Returns:
+            the future of the coroutine result
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    @versionadded(version="2.18.0")
+    def close_session(self) -> None:
+        """Close the connections of the current session."""
+        if self.session is not None:
+            self.submit(self.session.aclose())
+            self.session = None
+
+        return
+
     def get_subscriptions(self) -> dict:
         """Load the user subscriptions.
 
         Returns:
             the dictionary of user subscription or empty list if nothing found
         """
-        req = self.session.request("GET", self.SUBS_URL)
+        return self.run(self.get_subscriptions_async())
 
+    @versionadded(version="2.18.0")
+    @_in_loop
+    async def get_subscriptions_async(self) -> dict:
+        """Asynchronous version of ``get_subscriptions``."""
         try:
-            response = asyncio.run(req)
+            response = await self.session.request("GET", self.SUBS_URL)
 
         except NoPermission:
             raise Exception(
@@ -141,6 +275,7 @@ class PlanetModel(Model):
         end: Union[str, datetime],
         cloud_cover: float,
         limit: int = 0,
+        split: int = 1,
     ) -> list:
         """Request imagery items from the planet API for the requested dates.
 
@@ -150,43 +285,209 @@ class PlanetModel(Model):
             end: the end of the request (YYYY-mm-dd))
             cloud_cover: maximum cloud coverage.
             limit: number of items to constrain the search. Defaults to 0 to use all of them.
+            split: split the AOI in a split x split grid and search each cell concurrently. Defaults to 1 to use a single search.
 
         Returns:
             items found using the search query
 
         """
+        return self.run(self.get_items_async(aoi, start, end, cloud_cover, limit, split))
+
+    @versionadded(version="2.18.0")
+    @_in_loop
+    async def get_items_async(
+        self,
+        aoi: dict,
+        start: Union[str, datetime],
+        end: Union[str, datetime],
+        cloud_cover: float,
+        limit: int = 0,
+        split: int = 1,
+    ) -> list:
+        """Asynchronous version of ``get_items``."""
+        return [i async for i in self.iter_items_async(aoi, start, end, cloud_cover, limit, split)]
+
+    @versionadded(version="2.18.0")
+    def iter_items(
+        self,
+        aoi: dict,
+        start: Union[str, datetime],
+        end: Union[str, datetime],
+        cloud_cover: float,
+        limit: int = 0,
+        split: int = 1,
+    ) -> Iterator[dict]:
+        """Yield the imagery items from the planet API as soon as their page is received.
+
+        The search is stopped if the generator is closed before the end.
+
+        Args:
+            aoi: geojson clipping geometry
+            start: the start of the request (YYYY-mm-dd))
+            end: the end of the request (YYYY-mm-dd))
+            cloud_cover: maximum cloud coverage.
+            limit: number of items to constrain the search. Defaults to 0 to use all of them.
+            split: split the AOI in a split x split grid and search each cell concurrently. Defaults to 1 to use a single search.
+
+        Yields:
+            the items found using the search query, without duplicates
+        """
+        items, done = queue.Queue(), object()
+        coro = self._search_items(aoi, start, end, cloud_cover, limit, split, items.put)
+        future = self.submit(coro)
+        future.add_done_callback(lambda _: items.put(done))
+
+        try:
+            while (item := items.get()) is not done:
+                yield item
+            future.result()
+        finally:
+            future.cancel()
+
+        return
+
+    @versionadded(version="2.18.0")
+    async def iter_items_async(
+        self,
+        aoi: dict,
+        start: Union[str, datetime],
+        end: Union[str, datetime],
+        cloud_cover: float,
+        limit: int = 0,
+        split: int = 1,
+    ) -> AsyncIterator[dict]:
+        """Asynchronous version of ``iter_items``."""
+        loop, items, done = asyncio.get_running_loop(), asyncio.Queue(), object()
+
+        def put(item: dict) -> None:
+            loop.call_soon_threadsafe(items.put_nowait, item)
+
+        coro = self._search_items(aoi, start, end, cloud_cover, limit, split, put)
+        task = asyncio.ensure_future(coro)
+        task.add_done_callback(lambda _: items.put_nowait(done))
+
+        try:
+            while (item := await items.get()) is not done:
+                yield item
+            await task
+        finally:
+            task.cancel()
+
+    @_in_loop
+    async def _search_items(
+        self,
+        aoi: dict,
+        start: Union[str, datetime],
+        end: Union[str, datetime],
+        cloud_cover: float,
+        limit: int,
+        split: int,
+        put: Callable[[dict], None],
+    ) -> None:
+        """Run the searches of the AOI cells concurrently and send the new items to a callback.
+
+        Args:
+            aoi: geojson clipping geometry
+            start: the start of the request (YYYY-mm-dd))
+            end: the end of the request (YYYY-mm-dd))
+            cloud_cover: maximum cloud coverage.
+            limit: number of items to constrain the search, 0 to use all of them.
+            split: the number of rows and columns of the AOI grid
+            put: the function called with each new item
+        """
         # cast start and end to str
         start = datetime.strptime(start, "%Y-%m-%d") if isinstance(start, str) else start
         end = datetime.strptime(end, "%Y-%m-%d") if isinstance(end, str) else end
 
-        and_filter = filters.and_filter(
-            [
-                filters.geometry_filter(aoi),
-                filters.range_filter("cloud_cover", lte=cloud_cover),
-                filters.date_range_filter("acquired", gt=start),
-                filters.date_range_filter("acquired", lt=end),
-            ]
-        )
-
         # PSScene3Band and PSScene4Band item type and assets are deprecated
         # since January 2023 so we are now only looking at PSScene
         item_types = ["PSScene"]
 
-        async def _main():
-            """Create an asyncrhonous function here to avoid making the main get_items as async.
+        client = DataClient(self.session)
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENCY)
+        seen = set()
+
+        async def search(geometry: dict) -> None:
+            and_filter = filters.and_filter(
+                [
+                    filters.geometry_filter(geometry),
+                    filters.range_filter("cloud_cover", lte=cloud_cover),
+                    filters.date_range_filter("acquired", gt=start),
+                    filters.date_range_filter("acquired", lt=end),
+                ]
+            )
+
+            async with semaphore:
+                items = client.search(item_types, and_filter, name="quick_search", limit=limit)
+                async for item in items:
+                    if limit and len(seen) >= limit:
+                        break
+                    elif item["id"] not in seen:
+                        seen.add(item["id"])
+                        put(item)
+
+                    # don't wait for the next page once the limit is reached
+                    if limit and len(seen) >= limit:
+                        break
+
+            return
+
+        await asyncio.gather(*[search(g) for g in self._split_aoi(aoi, split)])
+
+        return
+
+    @staticmethod
+    def _split_aoi(aoi: dict, split: int) -> List[dict]:
+        """Split an AOI in the cells of a regular grid over its bounding box.
+
+        Args:
+            aoi: geojson clipping geometry
+            split: the number of rows and columns of the grid
+
+        Returns:
+            the non empty parts of the AOI as geojson geometries
+        """
+        geom = PlanetModel._aoi_geometry(aoi)
+        if split <= 1 or geom.area == 0:
+            return [aoi]
+
+        west, south, east, north = geom.bounds
+        width, height = (east - west) / split, (north - south) / split
+        cells = [
+            geom.intersection(sg.box(x, y, x + width, y + height))
+            for x in [west + i * width for i in range(split)]
+            for y in [south + j * height for j in range(split)]
+        ]
+
+        # only the polygonal parts of the cells are kept as the API rejects the geometry collections
+        # and the cells touching the geometry on an edge only are dropped
+        polygons = [PlanetModel._polygonal(c) for c in cells]
+        return [sg.mapping(p) for p in polygons if p.area > 0]
+
+    @staticmethod
+    def _polygonal(geom: sg.base.BaseGeometry) -> sg.base.BaseGeometry:
+        """Return the union of the polygonal parts of a geometry.
+
+        Args:
+            geom: the geometry, possibly a collection of polygons, lines and points
 
-            So we can keep calling get_items without any change.
-            """
-            client = DataClient(self.session)
-            items = client.search(item_types, and_filter, name="quick_search", limit=limit)
-            items_list = [item async for item in items]
-            return items_list
+        Returns:
+            the Polygon or MultiPolygon part of the geometry, empty if there is none
+        """
+        if isinstance(geom, (sg.Polygon, sg.MultiPolygon)):
+            return geom
 
-        return asyncio.run(_main())
+        parts = getattr(geom, "geoms", [])
+        return unary_union([p for p in parts if isinstance(p, (sg.Polygon, sg.MultiPolygon))])
 
-    def get_mosaics(self) -> dict:
+    def get_mosaics(self, refresh: bool = False) -> List[dict]:
         """Get all the mosaics available in a client without pagination limitations.
 
+        All the pages of the catalogue are loaded once and kept in memory and on disk (per API key) for ``MOSAICS_TTL`` seconds.
+
+        Args:
+            refresh: reload the catalogue from the API even if it's cached
+
         Returns:
             The mosaics contained in the API request.
 
@@ -219,11 +520,94 @@ class PlanetModel(Model):
                     "quad_download": true
                 }
         """
-        mosaics_url = "https://api.planet.com/basemaps/v1/mosaics"
-        request = self.session.request("GET", mosaics_url)
-        response = asyncio.run(request)
+        return self.run(self.get_mosaics_async(refresh))
+
+    @versionadded(version="2.18.0")
+    @_in_loop
+    async def get_mosaics_async(self, refresh: bool = False) -> List[dict]:
+        """Asynchronous version of ``get_mosaics``."""
+        if self._catalogue is None or refresh:
+            # concurrent calls share the same load of the catalogue
+            if self._catalogue_task is None or self._catalogue_task.done():
+                self._catalogue_task = asyncio.ensure_future(self._load_catalogue(refresh))
+            await asyncio.shield(self._catalogue_task)
+
+        return self._catalogue["mosaics"]
+
+    @versionadded(version="2.18.0")
+    def get_mosaic(self, name: str) -> dict:
+        """Get a mosaic of the catalogue from its name.
+
+        Args:
+            name: the name of the mosaic
+
+        Returns:
+            the mosaic information (see ``get_mosaics``) or an empty dict if it doesn't exist
+        """
+        self._catalogue is not None or self.get_mosaics()
+
+        return self._catalogue["names"].get(name, {})
+
+    @versionadded(version="2.18.0")
+    def get_mosaics_by_date(self, date: Union[str, datetime]) -> List[dict]:
+        """Get the mosaics of the catalogue acquired at a specific date.
+
+        Args:
+            date: the date as a datetime or an ISO string
+
+        Returns:
+            the mosaics whose acquisition interval contains the date
+        """
+        self._catalogue is not None or self.get_mosaics()
 
-        return response.json().get("mosaics", [])
+        # compare the dates as "YYYY-MM-DDTHH:MM:SS" strings like in the catalogue index
+        if isinstance(date, str):
+            date = datetime.fromisoformat(date.replace("Z", "+00:00"))
+        date = date.strftime("%Y-%m-%dT%H:%M:%S")
+        starts, mosaics = self._catalogue["dates"]
+
+        # mosaics are sorted by first acquisition date, only check the ones that already started
+        mosaics = mosaics[: bisect_right(starts, date)]
+
+        return [m for m in mosaics if date < m.get("last_acquired", "")[:19]]
+
+    async def _load_catalogue(self, refresh: bool) -> None:
+        """Load the mosaic catalogue from the disk cache or from all the pages of the API.
+
+        Args:
+            refresh: ignore the disk cache
+        """
+        file = self.MOSAICS_CACHE_DIR / f"{sha256(self.auth._key.encode()).hexdigest()}.json"
+
+        mosaics = None
+        if not refresh and file.is_file() and time.time() - file.stat().st_mtime < self.MOSAICS_TTL:
+            # a corrupted file is simply ignored, it will be overwritten
+            try:
+                mosaics = json.loads(file.read_text())
+            except ValueError:
+                pass
+
+        if mosaics is None:
+            mosaics, url = [], "https://api.planet.com/basemaps/v1/mosaics"
+            while url:
+                page = (await self.session.request("GET", url)).json()
+                mosaics += page.get("mosaics", [])
+                url = page.get("_links", {}).get("_next")
+
+            file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = file.with_suffix(".json.tmp")
+            tmp.write_text(json.dumps(mosaics))
+            tmp.replace(file)
+
+        # index the catalogue by name and by first acquisition date
+        by_date = sorted(mosaics, key=lambda m: m.get("first_acquired", ""))
+        self._catalogue = {
+            "mosaics": mosaics,
+            "names": {m["name"]: m for m in mosaics},
+            "dates": ([m.get("first_acquired", "")[:19] for m in by_date], by_date),
+        }
+
+        return
 
     def get_quad(self, mosaic: dict, quad_id: str) -> dict:
         """Get a quad response for a specific mosaic and quad.
@@ -252,14 +636,164 @@ class PlanetModel(Model):
                     "percent_covered": 100
                 }
         """
+        return self.run(self.get_quad_async(mosaic, quad_id))
+
+    @versionadded(version="2.18.0")
+    @_in_loop
+    async def get_quad_async(self, mosaic: dict, quad_id: str) -> dict:
+        """Asynchronous version of ``get_quad``."""
         quads_url = "https://api.planet.com/basemaps/v1/mosaics/{}/quads/{}"
         quads_url = quads_url.format(mosaic["id"], quad_id)
 
-        request = self.session.request("GET", quads_url)
-        response = asyncio.run(request)
+        response = await self.session.request("GET", quads_url)
 
         return response.json() or {}
 
+    @staticmethod
+    def _aoi_geometry(aoi: Union[dict, Sequence[float]]) -> sg.base.BaseGeometry:
+        """Read an AOI as a shapely geometry.
+
+        Args:
+            aoi: a geojson geometry, feature or feature collection or a [west, south, east, north] bbox
+
+        Returns:
+            the geometry of the AOI
+        """
+        if isinstance(aoi, dict) and "features" in aoi:
+            return unary_union([sg.shape(f["geometry"]) for f in aoi["features"]])
+        elif isinstance(aoi, dict):
+            return sg.shape(aoi.get("geometry", aoi))
+
+        return sg.box(*aoi)
+
+    @versionadded(version="2.18.0")
+    @staticmethod
+    def get_quad_ids(mosaic: dict, aoi: Union[dict, Sequence[float]]) -> List[str]:
+        """Compute the ids of the mosaic quads intersecting an AOI.
+
+        The quads are the cells of the mosaic web-mercator grid, their ids are the "<column>-<row>" indices of the cell from the bottom-left corner of the grid.
+
+        Args:
+            mosaic: A dict representing a mosaic in the format of list_mosaic
+            aoi: a geojson geometry, feature or feature collection or a [west, south, east, north] bbox
+
+        Returns:
+            the quad ids
+        """
+        # read the aoi and restrict it to the mosaic extent
+        geom = PlanetModel._aoi_geometry(aoi)
+        geom = geom.intersection(sg.box(*mosaic["bbox"])) if "bbox" in mosaic else geom
+        if geom.is_empty:
+            return []
+
+        # number of quads along each axis of the grid
+        grid = mosaic["grid"]
+        size = PlanetModel.EARTH_CIRCUMFERENCE / (grid["resolution"] * grid["quad_size"])
+        n = 2 ** round(math.log2(size))
+
+        def col(lng: float) -> int:
+            return min(max(int((lng + 180) / 360 * n), 0), n - 1)
+
+        def row(lat: float) -> int:
+            lat = math.radians(min(max(lat, -85.0511), 85.0511))
+            y = int((1 + math.asinh(math.tan(lat)) / math.pi) / 2 * n)
+            return min(max(y, 0), n - 1)
+
+        def lat(y: int) -> float:
+            return math.degrees(math.atan(math.sinh(math.pi * (2 * y / n - 1))))
+
+        # keep the quads of the aoi bbox that intersect the geometry
+        west, south, east, north = geom.bounds
+        quad_ids = []
+        for x in range(col(west), col(east) + 1):
+            for y in range(row(south), row(north) + 1):
+                quad = sg.box(x / n * 360 - 180, lat(y), (x + 1) / n * 360 - 180, lat(y + 1))
+                not quad.intersects(geom) or quad_ids.append(f"{x}-{y}")
+
+        return quad_ids
+
+    @versionadded(version="2.18.0")
+    def get_quads(
+        self,
+        mosaic: dict,
+        aoi: Union[dict, Sequence[float]],
+        folder: Union[str, Path, None] = None,
+        alert: Optional[v.Alert] = None,
+    ) -> List[dict]:
+        """Get all the quads of a mosaic intersecting an AOI.
+
+        The quads are requested concurrently (at most ``MAX_CONCURRENCY`` at a time), the requests rejected by the API rate limits are retried with an exponential backoff by the planet session. The quads that don't exist in the mosaic are ignored.
+
+        Args:
+            mosaic: A dict representing a mosaic in the format of list_mosaic
+            aoi: a geojson geometry, feature or feature collection or a [west, south, east, north] bbox
+            folder: if set, the quads are downloaded in parallel in this folder as "<quad_id>.tif". Existing files are not downloaded again.
+            alert: an alert to display the progress of the requests
+
+        Returns:
+            The quads information (see ``get_quad``). When downloaded, the path to the file is added in the "file" key.
+        """
+        return self.run(self.get_quads_async(mosaic, aoi, folder, alert))
+
+    @versionadded(version="2.18.0")
+    @_in_loop
+    async def get_quads_async(
+        self,
+        mosaic: dict,
+        aoi: Union[dict, Sequence[float]],
+        folder: Union[str, Path, None] = None,
+        alert: Optional[v.Alert] = None,
+    ) -> List[dict]:
+        """Asynchronous version of ``get_quads``."""
+        quad_ids = self.get_quad_ids(mosaic, aoi)
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENCY)
+        not folder or Path(folder).mkdir(parents=True, exist_ok=True)
+        done = []
+
+        async def fetch(quad_id: str) -> dict:
+            async with semaphore:
+                try:
+                    quad = await self.get_quad_async(mosaic, quad_id)
+                    if folder and quad.get("_links", {}).get("download"):
+                        quad["file"] = str(await self._download_quad(quad, Path(folder)))
+                except MissingResource:
+                    quad = {}
+
+            done.append(quad_id)
+            if alert:
+                msg = ms.planet.quads.format(len(quad_ids))
+                alert.update_progress(len(done) / len(quad_ids), msg)
+
+            return quad
+
+        quads = await asyncio.gather(*[fetch(i) for i in quad_ids])
+
+        return [q for q in quads if q]
+
+    async def _download_quad(self, quad: dict, folder: Path) -> Path:
+        """Stream the download of a quad to the disk.
+
+        Args:
+            quad: the quad information
+            folder: the destination folder
+
+        Returns:
+            the path to the downloaded file
+        """
+        file = folder / f"{quad['id']}.tif"
+        if file.exists():
+            return file
+
+        # write in a temporary file to never leave incomplete quads on the disk
+        tmp = file.with_suffix(".tif.tmp")
+        async with self.session.stream("GET", quad["_links"]["download"]) as response:
+            with tmp.open("wb") as f:
+                async for chunk in response.aiter_bytes():
+                    f.write(chunk)
+        tmp.replace(file)
+
+        return file
+
     @staticmethod
     def search_status(d: dict) -> List[Dict[str, bool]]:
         """Get the status of a specific subscription.
@@ -272,8 +806,8 @@ class PlanetModel(Model):
         """
         states = []
 
-        for v in d.values():
-            for subs in v:
+        for subscriptions in d.values():
+            for subs in subscriptions:
                 if "plan" in subs:
                     plan = subs.get("plan")
                     state = True if plan.get("state") == "active" else False
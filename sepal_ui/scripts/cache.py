@@ -0,0 +1,212 @@
+"""In-memory caches used to avoid repeating expensive server calls."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from deprecated.sphinx import versionadded
+
+
+@versionadded(version="2.18.0")
+class LRUCache:
+
+    maxsize: int = 128
+    "The maximum number of entries kept in the cache"
+
+    ttl: Optional[float] = None
+    "The lifetime of an entry in seconds, None for no expiration"
+
+    maxbytes: Optional[int] = None
+    "The maximum total size of the values (measured with ``len``) in bytes, None for no limit"
+
+    nbytes: int = 0
+    "The total size of the values currently stored, only measured if maxbytes is set"
+
+    hits: int = 0
+    "The number of requests answered by the cache"
+
+    misses: int = 0
+    "The number of requests that needed to be computed"
+
+    saved_time: float = 0.0
+    "The computation time spared by the hits (in seconds)"
+
+    on_evict: Optional[Callable[[Hashable, Any], None]] = None
+    "The function called with the key and the value of the entries dropped by the cache"
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        ttl: Optional[float] = None,
+        maxbytes: Optional[int] = None,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+    ) -> None:
+        """Thread-safe least recently used cache with an optional time to live.
+
+        When the cache is full, the least recently used entry is evicted. Each entry keeps the time that was needed to compute it so the cache can report how much time the hits saved.
+
+        Args:
+            maxsize: The maximum number of entries kept in the cache
+            ttl: The lifetime of an entry in seconds. Default to None (no expiration)
+            maxbytes: The maximum total size of the values in bytes. Default to None (no limit). The values need to support ``len`` (e.g. bytes) if set.
+            on_evict: The function called with the key and the value of each entry dropped because it's evicted, expired, replaced or cleared (e.g. to close a file). It's not called for the entries removed with ``pop`` as they are returned to the caller.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxbytes = maxbytes
+        self.on_evict = on_evict
+        self.hits, self.misses, self.saved_time, self.nbytes = 0, 0, 0.0, 0
+
+        # each entry is stored as (value, creation time, computation time)
+        self._data: "OrderedDict[Hashable, Tuple[Any, float, float]]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _sizeof(self, value: Any) -> int:
+        """Return the size of a value in bytes, 0 if the size is not monitored."""
+        return 0 if self.maxbytes is None else len(value)
+
+    def _remove(self, key: Hashable) -> Optional[Tuple[Any, float, float]]:
+        """Remove an entry and update the stored size. Must be called under the lock."""
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.nbytes -= self._sizeof(entry[0])
+
+        return entry
+
+    def _evict(self, entries: List[Tuple[Hashable, Any]]) -> None:
+        """Call ``on_evict`` on the dropped entries. Must be called outside of the lock."""
+        if self.on_evict is not None:
+            for key, value in entries:
+                self.on_evict(key, value)
+
+        return
+
+    def _expired(self, created: float) -> bool:
+        """Check if an entry created at the given time is expired."""
+        return self.ttl is not None and time.monotonic() - created > self.ttl
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value of the key and update the counters.
+
+        Args:
+            key: the key of the entry
+            default: the value to return if the key is missing or expired
+
+        Returns:
+            the cached value or the default
+        """
+        with self._lock:
+            entry = self._data.get(key)
+
+            if entry is None or self._expired(entry[1]):
+                expired = self._remove(key)
+                self.misses += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+                self.saved_time += entry[2]
+                return entry[0]
+
+        not expired or self._evict([(key, expired[0])])
+
+        return default
+
+    def set(self, key: Hashable, value: Any, cost: float = 0.0) -> None:
+        """Store a value in the cache and evict the least recently used entries if needed.
+
+        Args:
+            key: the key of the entry
+            value: the value to store
+            cost: the time needed to compute the value (in seconds)
+        """
+        with self._lock:
+            replaced = self._remove(key)
+            self._data[key] = (value, time.monotonic(), cost)
+            self.nbytes += self._sizeof(value)
+
+            dropped = [] if replaced is None or replaced[0] is value else [(key, replaced[0])]
+            while len(self._data) > self.maxsize or (
+                self.maxbytes is not None and self.nbytes > self.maxbytes and len(self._data) > 1
+            ):
+                oldest = next(iter(self._data))
+                dropped.append((oldest, self._remove(oldest)[0]))
+
+        self._evict(dropped)
+
+        return
+
+    def get_or_set(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """Return the cached value of the key or compute and store it.
+
+        The computation is not performed under the lock so that several missing keys can be computed concurrently.
+
+        Args:
+            key: the key of the entry
+            func: the function without arguments that computes the value
+
+        Returns:
+            the cached or computed value
+        """
+        missing = object()
+        value = self.get(key, missing)
+
+        if value is missing:
+            start = time.perf_counter()
+            value = func()
+            self.set(key, value, time.perf_counter() - start)
+
+        return value
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove an entry from the cache.
+
+        Args:
+            key: the key of the entry
+            default: the value to return if the key is missing
+
+        Returns:
+            the removed value or the default
+        """
+        with self._lock:
+            entry = self._remove(key)
+
+        return default if entry is None else entry[0]
+
+    def clear(self) -> None:
+        """Remove all the entries and reset the counters."""
+        with self._lock:
+            dropped = [(k, e[0]) for k, e in self._data.items()]
+            self._data.clear()
+            self.hits, self.misses, self.saved_time, self.nbytes = 0, 0, 0.0, 0
+
+        self._evict(dropped)
+
+        return
+
+    def stats(self) -> Dict[str, float]:
+        """Return the usage statistics of the cache.
+
+        Returns:
+            the number of hits, misses, entries and stored bytes, the hit ratio and the saved time (in seconds)
+        """
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "nbytes": self.nbytes,
+                "hit_ratio": self.hits / requests if requests else 0.0,
+                "saved_time": self.saved_time,
+            }
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Check if a valid entry exists without updating the counters."""
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and not self._expired(entry[1])
+
+    def __len__(self) -> int:
+        """Return the number of entries (including the expired ones not yet evicted)."""
+        return len(self._data)
@@ -1,43 +1,209 @@
 """All the heleper methods to interface Google Earthengine with sepal-ui."""
 
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from functools import partial
 from pathlib import Path
-from typing import List, Union
+from typing import Callable, Dict, Iterator, List, Optional, Union
 
 import ee
 import ipyvuetify as v
+from deprecated.sphinx import versionadded, versionchanged
 
 from sepal_ui.message import ms
 from sepal_ui.scripts import decorator as sd
+from sepal_ui.scripts.cache import LRUCache
 
 
+@versionadded(version="2.18.0")
+class TaskMonitor:
+
+    MIN_DELAY: float = 2
+    "The delay between 2 polls after a state change (s)"
+
+    MAX_DELAY: float = 10
+    "The maximum delay between 2 polls (s), i.e. the maximum latency to notice the end of a task"
+
+    BACKOFF: float = 1.5
+    "The factor applied to the delay when no watched task has changed"
+
+    MAX_ERRORS: int = 5
+    "The number of consecutive failed polls after which the watched tasks are dropped"
+
+    ENDED: List[str] = ["COMPLETED", "FAILED", "CANCELLED", "UNKNOWN"]
+    "The final states of a task"
+
+    tasks: Dict[str, dict] = {}
+    "The watched tasks keyed by id, each of them with its last status, future and callbacks"
+
+    def __init__(self) -> None:
+        """Monitor the state of the GEE tasks in a single background thread.
+
+        All the watched tasks are polled together with an exponential backoff: the delay is reset to ``MIN_DELAY`` when a task changes state and multiplied by ``BACKOFF`` otherwise, up to ``MAX_DELAY``.
+        """
+        self.tasks = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def watch(self, task_id: str, callback: Optional[Callable[[dict], None]] = None) -> Future:
+        """Start watching a task.
+
+        Args:
+            task_id: the id of the task
+            callback: a function called with the new status of the task every time its state changes
+
+        Returns:
+            a future resolved with the final status of the task. It raises an exception if the task fails or is cancelled. Use ``asyncio.wrap_future`` to await it.
+        """
+        with self._lock:
+            entry = self.tasks.setdefault(
+                task_id, {"status": {}, "future": Future(), "callbacks": []}
+            )
+            not callback or entry["callbacks"].append(callback)
+
+            # (re)start the polling thread
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+        self._wake.set()
+
+        return entry["future"]
+
+    def _run(self) -> None:
+        """Poll the watched tasks until they all end."""
+        try:
+            self._poll()
+        except Exception as e:
+            # never leave a future pending without a thread to resolve it
+            with self._lock:
+                ids = list(self.tasks)
+            for task_id in ids:
+                self._end(task_id, {"id": task_id}, e)
+        finally:
+            with self._lock:
+                if self._thread is threading.current_thread():
+                    self._thread = None
+
+        return
+
+    def _poll(self) -> None:
+        """Request the status of the watched tasks and notify their changes until they all end."""
+        delay, errors = self.MIN_DELAY, 0
+        while True:
+            with self._lock:
+                if not self.tasks:
+                    self._thread = None
+                    return
+                ids = list(self.tasks)
+
+            # request the status of all the watched tasks at once
+            try:
+                statuses = ee.data.getTaskStatus(ids)
+                errors = 0
+            except Exception as e:
+                errors += 1
+                statuses = []
+                if errors == self.MAX_ERRORS:
+                    for task_id in ids:
+                        self._end(task_id, {"id": task_id}, e)
+                    errors = 0
+
+            changed = False
+            for status in statuses:
+                with self._lock:
+                    entry = self.tasks.get(status["id"])
+                if entry is None or status["state"] == entry["status"].get("state"):
+                    continue
+
+                changed, entry["status"] = True, status
+
+                # a failing callback only ends its own task
+                error = None
+                for callback in list(entry["callbacks"]):
+                    try:
+                        callback(status)
+                    except Exception as e:
+                        error = e
+                        break
+
+                ended = status["state"] in self.ENDED
+                if error is None and ended and status["state"] != "COMPLETED":
+                    error = Exception(ms.status.format(status["state"]))
+                if ended or error is not None:
+                    self._end(status["id"], status, error)
+
+            # wait for the next poll or a new task
+            delay = self.MIN_DELAY if changed else min(delay * self.BACKOFF, self.MAX_DELAY)
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def _end(self, task_id: str, status: dict, error: Optional[Exception] = None) -> None:
+        """Stop watching a task and resolve its future.
+
+        Args:
+            task_id: the id of the task
+            status: the final status of the task
+            error: the exception to raise in the future if the task did not complete
+        """
+        with self._lock:
+            entry = self.tasks.pop(task_id, None)
+
+        if entry is None:
+            return
+
+        if error is None:
+            entry["future"].set_result(status)
+        else:
+            entry["future"].set_exception(error)
+
+        return
+
+
+task_monitor = TaskMonitor()
+"The monitor shared by all the tasks of the kernel"
+
+
+@versionchanged(
+    version="2.18.0",
+    reason="raise an exception if the task is cancelled or unknown instead of waiting forever",
+)
 @sd.need_ee
 def wait_for_completion(task_descripsion: str, widget_alert: v.Alert = None) -> str:
     """Wait until the selected process is finished. Display some output information.
 
+    The task is searched once by description and then watched by id with the shared ``task_monitor``.
+
     Args:
         task_descripsion: name of the running task
         widget_alert: alert to display the output messages
 
     Returns:
-        the final state of the task
+        the final state of the task, always "COMPLETED"
+
+    Raises:
+        Exception: if the task ends in the "FAILED", "CANCELLED" or "UNKNOWN" state
     """
-    state = "UNSUBMITTED"
-    while state != "COMPLETED":
+    # print in a widget
+    if widget_alert:
+        widget_alert.add_live_msg(ms.status.format("UNSUBMITTED"))
 
-        # print in a widget
-        if widget_alert:
-            widget_alert.add_live_msg(ms.status.format(state))
+    # search for the task in task_list
+    current_task = is_task(task_descripsion)
+    if current_task is None:
+        raise Exception(ms.status.format("UNKNOWN"))
 
-        # wait 5 seconds
-        time.sleep(5)
+    # print the state changes in the widget
+    def callback(status: dict) -> None:
+        widget_alert.add_live_msg(ms.status.format(status["state"]))
 
-        # search for the task in task_list
-        current_task = is_task(task_descripsion)
-        state = current_task.state
+    future = task_monitor.watch(current_task.id, callback if widget_alert else None)
+    state = future.result()["state"]
 
-        if state == "FAILED":
-            raise Exception(ms.status.format(state))
+    # the task may have written new assets
+    clear_asset_cache()
 
     # print in a widget
     if widget_alert:
@@ -83,66 +249,209 @@ def is_running(task_descripsion: str) -> ee.batch.Task:
     return current_task
 
 
+asset_cache: LRUCache = LRUCache(maxsize=1024, ttl=600)
+"The direct children of the GEE folders already listed, keyed by folder name"
+
+executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=8)
+"The threads listing the GEE folders in parallel"
+
+
+def _parent(asset_id: Union[str, Path]) -> str:
+    """Return the name of the folder containing an asset."""
+    return str(asset_id).rstrip("/").rsplit("/", 1)[0]
+
+
+@versionadded(version="2.18.0")
+@sd.need_ee
+def list_folder(folder: Union[str, Path], cache: bool = True) -> List[dict]:
+    """Get the direct children of a GEE folder.
+
+    All the pages of the listing are requested and the result is kept in the ``asset_cache`` for 10 minutes.
+
+    Args:
+        folder: the GEE folder
+        cache: whether to use the cached listing. If False, the folder is listed again and the cache is updated.
+
+    Returns:
+        the asset list. each asset is a dict with at least 3 keys: 'type', 'name' and 'id'
+    """
+    folder = str(folder).rstrip("/")
+
+    def fetch() -> List[dict]:
+        assets, params = [], {"parent": folder, "pageSize": 1000}
+        while True:
+            response = ee.data.listAssets(params)
+            assets += response.get("assets", [])
+            if not response.get("nextPageToken"):
+                return assets
+            params["pageToken"] = response["nextPageToken"]
+
+    if not cache:
+        asset_cache.pop(folder)
+
+    return asset_cache.get_or_set(folder, fetch)
+
+
+@versionadded(version="2.18.0")
+def clear_asset_cache(asset_id: Union[str, Path] = "") -> None:
+    """Remove the listing of the folders affected by an asset modification from the cache.
+
+    Args:
+        asset_id: the created or deleted asset. If not set, the full cache is cleared.
+    """
+    if not asset_id:
+        asset_cache.clear()
+        return
+
+    asset_cache.pop(str(asset_id).rstrip("/"))
+    asset_cache.pop(_parent(asset_id))
+
+    return
+
+
+@versionadded(version="2.18.0")
+@sd.need_ee
+def iter_assets(
+    folder: Union[str, Path] = "", refresh: bool = False, cache: bool = True
+) -> Iterator[Dict[str, List[dict]]]:
+    """Walk the nested folders one nesting level at a time.
+
+    The folders of the same level are listed in parallel and the listings are cached (see ``list_folder``).
+
+    Args:
+        folder: the initial GEE folder
+        refresh: whether to list again the initial folder and the nested folders whose update time changed since their cached listing
+        cache: whether to use the cached listings. If False, every folder is listed again.
+
+    Yields:
+        the direct children of each folder of the level, keyed by folder name
+    """
+    folder = str(folder) or f"projects/{ee.data._cloud_api_user_project}/assets/"
+    folders = {folder.rstrip("/"): refresh}
+
+    while folders:
+        # keep the outdated listings to compare the update times of the subfolders
+        previous = {f: asset_cache.pop(f) or [] for f, force in folders.items() if force}
+        listings = dict(zip(folders, executor.map(partial(list_folder, cache=cache), folders)))
+        yield listings
+
+        folders = {}
+        for parent, assets in listings.items():
+            times = {a["name"]: a.get("updateTime") for a in previous.get(parent, [])}
+            for asset in (a for a in assets if a["type"] == "FOLDER"):
+                changed = times.get(asset["name"]) != asset.get("updateTime")
+                folders[asset["name"]] = parent in previous and changed
+
+
 @sd.need_ee
-def get_assets(folder: Union[str, Path] = "") -> List[dict]:
+def get_assets(folder: Union[str, Path] = "", cache: bool = False) -> List[dict]:
     """Get all the assets from the parameter folder. every nested asset will be displayed.
 
+    The folders of the same nesting level are listed in parallel (see ``iter_assets``). The listings are stored in the ``asset_cache``, they can be reused but they may then miss the assets created in the last 10 minutes by other means than ``wait_for_completion`` (e.g. in the Code Editor).
+
     Args:
         folder: the initial GEE folder
+        cache: whether to use the cached listings. Default to False (fresh listing).
 
     Returns:
         the asset list. each asset is a dict with 3 keys: 'type', 'name' and 'id'
     """
-    # set the folder and init the list
-    asset_list = []
+    # set the folder
     folder = str(folder) or f"projects/{ee.data._cloud_api_user_project}/assets/"
 
-    def _recursive_get(folder, asset_list):
+    # list the folders level by level
+    children = {}
+    for listings in iter_assets(folder, cache=cache):
+        children.update(listings)
 
-        # loop in the assets
-        for asset in ee.data.listAssets({"parent": folder})["assets"]:
+    # gather the assets in the same order as a recursive listing
+    def _recursive_get(folder: str) -> List[dict]:
+        asset_list = []
+        for asset in children[folder]:
             asset_list += [asset]
             if asset["type"] == "FOLDER":
-                asset_list = _recursive_get(asset["name"], asset_list)
-
+                asset_list += _recursive_get(asset["name"])
         return asset_list
 
-    return _recursive_get(folder, asset_list)
+    return _recursive_get(folder.rstrip("/"))
+
+
+NOT_FOUND_MESSAGES: List[str] = ["not found", "does not exist"]
+"The parts of the GEE error messages raised when an asset is missing (lower case)"
+
+
+def _is_not_found_error(error: Exception) -> bool:
+    """Check if an exception was raised because the requested asset does not exist.
+
+    The GEE API only exposes the message of the errors, it is matched against ``NOT_FOUND_MESSAGES``. The messages known so far are "Asset '<name>' not found." and "Asset '<name>' does not exist or doesn't allow this operation.".
+
+    Args:
+        error: the exception raised by the GEE API
+
+    Returns:
+        True if the message reports a missing asset
+    """
+    msg = str(error).lower()
+    return any(m in msg for m in NOT_FOUND_MESSAGES)
 
 
 @sd.need_ee
 def is_asset(asset_name: str, folder: Union[str, Path] = "") -> bool:
     """Check if the asset already exist in the user asset folder.
 
+    The asset metadata are directly requested, the folder is not listed anymore.
+
     Args:
         asset_descripsion: the descripsion of the asset
-        folder: the folder of the glad assets
+        folder: the folder that should contain the asset (at any nesting level). If not set, the asset can be anywhere.
 
     Returns:
         true if already in folder
     """
-    # get the folder
-    folder = str(folder) or f"projects/{ee.data._cloud_api_user_project}/assets/"
+    try:
+        asset = ee.data.getAsset(str(asset_name))
+    except ee.EEException as e:
+        if _is_not_found_error(e):
+            return False
+        raise e
 
-    # get all the assets
-    asset_list = get_assets(folder)
+    # the asset can be identified by its legacy id or its full name
+    folder = str(folder).rstrip("/")
+    names = [str(asset_name), asset.get("name", ""), asset.get("id", "")]
 
-    # search for asset existence
-    exist = False
-    for asset in asset_list:
-        if asset_name == asset["name"]:
-            exist = True
-            break
+    return not folder or any(n.startswith(f"{folder}/") for n in names)
 
-    return exist
 
+DELETE_WORKERS: int = 8
+"The number of assets deleted in parallel"
 
+DELETE_RATE: float = 20
+"The maximum number of deletion requests sent per second"
+
+DELETE_RETRIES: int = 5
+"The number of times a deletion rejected by the GEE quotas is retried"
+
+
+def _is_quota_error(error: Exception) -> bool:
+    """Check if an exception was raised by the GEE request quotas."""
+    msg = str(error).lower()
+    return "quota" in msg or "too many requests" in msg or "rate limit" in msg
+
+
+@versionchanged(
+    version="2.18.0",
+    reason="return the names of the assets in a dict and raise an exception if some assets could not be deleted",
+)
 @sd.need_ee
-def delete_assets(asset_id: str, dry_run: bool = True) -> None:
+def delete_assets(
+    asset_id: str, dry_run: bool = True, alert: Optional[v.Alert] = None
+) -> Dict[str, List[str]]:
     """Delete the selected asset and all its content.
 
     This method will delete all the files and folders existing in an asset folder. By default a dry run will be launched and if you are satisfyed with the displayed names, change the ``dry_run`` variable to ``False``. No other warnng will be displayed.
 
+    The assets of the same nesting level are deleted in parallel on ``DELETE_WORKERS`` threads with at most ``DELETE_RATE`` requests per second. The requests rejected by the GEE quotas are retried with an exponential backoff and the folders containing assets that failed are skipped.
+
     .. warning::
 
         If this method is used on the root directory you will loose all your data, it's highly recommended to use a dry run first and carefully review the destroyed files.
@@ -150,40 +459,89 @@ def delete_assets(asset_id: str, dry_run: bool = True) -> None:
     Args:
         asset_id: the Id of the asset or a folder
         dry_run: whether or not a dry run should be launched. dry run will only display the files name without deleting them.
+        alert: an alert to display the progress of the deletion
+
+    Returns:
+        the names of the assets "to_delete", "deleted", "failed" and "skipped". Only "to_delete" is filled in a dry run.
+
+    Raises:
+        Exception: if some assets could not be deleted, once all the others are deleted
     """
-    # define the action to execute for each asset based on the dry run mode
+    lock, next_call = threading.Lock(), [time.monotonic()]
+
+    # delete a single asset, retrying the requests rejected by the quotas
     def delete(id: str) -> None:
-        if dry_run is True:
-            print(f"to be deleted: {id}")
-        else:
-            print(f"deleting: {id}")
-            ee.data.deleteAsset(id)
+        print(f"deleting: {id}")
+        for i in range(DELETE_RETRIES + 1):
+            # wait for the next available request slot
+            with lock:
+                now = time.monotonic()
+                wait, next_call[0] = next_call[0] - now, max(now, next_call[0]) + 1 / DELETE_RATE
+            time.sleep(max(wait, 0))
+
+            try:
+                ee.data.deleteAsset(id)
+                break
+            except ee.EEException as e:
+                if i == DELETE_RETRIES or not _is_quota_error(e):
+                    raise e
+                time.sleep(2**i)
+
+        clear_asset_cache(id)
 
         return
 
     # identify the type of asset
     asset_info = ee.data.getAsset(asset_id)
+    asset_list = get_assets(folder=asset_id) if asset_info["type"] == "FOLDER" else []
 
-    if asset_info["type"] == "FOLDER":
-
-        # get all the assets
-        asset_list = get_assets(folder=asset_id)
-
-        # split the files by nesting levels
-        # we will need to delete the more nested files first
-        assets_ordered = {}
-        for asset in asset_list:
-            lvl = len(asset["id"].split("/"))
-            assets_ordered.setdefault(lvl, [])
-            assets_ordered[lvl].append(asset)
-
-        # delete all items starting from the more nested one but not folders
-        assets_ordered = dict(sorted(assets_ordered.items(), reverse=True))
-        for lvl in assets_ordered:
-            for i in assets_ordered[lvl]:
-                delete(i["name"])
-
-    # delete the initial folder/asset
-    delete(asset_id)
-
-    return
+    # split the files by nesting levels
+    # we will need to delete the more nested files first and the initial folder/asset last
+    assets_ordered = {}
+    for asset in asset_list:
+        assets_ordered.setdefault(len(asset["name"].split("/")), []).append(asset["name"])
+    levels = [assets_ordered[lvl] for lvl in sorted(assets_ordered, reverse=True)]
+    levels.append([asset_info["name"]])
+
+    to_delete = [n for names in levels for n in names]
+    summary = {"to_delete": to_delete, "deleted": [], "failed": [], "skipped": []}
+
+    # only display the names in dry run mode
+    if dry_run is True:
+        for name in to_delete:
+            print(f"to be deleted: {name}")
+        print(f"to_delete: {len(to_delete)}")
+        return summary
+
+    def update_progress() -> None:
+        done = sum(len(summary[k]) for k in ["deleted", "failed", "skipped"])
+        alert.update_progress(done / (len(asset_list) + 1), ms.gee.delete.format(asset_id))
+
+    with ThreadPoolExecutor(max_workers=DELETE_WORKERS) as pool:
+        for names in levels:
+            # the folders still containing assets cannot be deleted
+            kept = [f"{n}/" for n in summary["failed"] + summary["skipped"]]
+            skipped = [n for n in names if any(k.startswith(f"{n}/") for k in kept)]
+            summary["skipped"] += skipped
+
+            futures = {pool.submit(delete, n): n for n in names if n not in skipped}
+            for future in as_completed(futures):
+                if future.exception() is not None:
+                    print(f"failed: {futures[future]} ({future.exception()})")
+                    summary["failed"].append(futures[future])
+                else:
+                    summary["deleted"].append(futures[future])
+                not alert or update_progress()
+
+            # the skipped assets are also counted as done
+            not alert or update_progress()
+
+    print(", ".join(f"{k}: {len(summary[k])}" for k in ["deleted", "failed", "skipped"]))
+
+    # report the assets that are still there
+    if summary["failed"]:
+        msg = ms.gee.delete_failed.format(len(summary["failed"]), ", ".join(summary["failed"]))
+        not alert or alert.append_msg(msg, type_="error")
+        raise Exception(msg)
+
+    return summary
@@ -0,0 +1,80 @@
+"""Helpers to defer the import of the sepal-ui sub-packages content.
+
+Most of the sepal-ui modules rely on heavy dependencies (``ee``, ``rioxarray``, ``localtileserver``, ``geopandas``, ``planet``...) that take seconds to import. The packages are thus exposing their content lazily: the module hosting a member is only imported the first time this member is requested.
+
+Example:
+    .. code-block:: python
+
+        # sepal_ui/mapping/__init__.py
+        from sepal_ui.scripts import lazy
+
+        __getattr__, __dir__, __all__ = lazy.attach(
+            __name__, {"sepal_map": ["SepalMap"]}
+        )
+"""
+
+import importlib
+import sys
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+def attach(
+    package_name: str,
+    submod_attrs: Dict[str, List[str]],
+    default: Optional[str] = None,
+) -> Tuple[Callable, Callable, List[str]]:
+    """Create the module level ``__getattr__`` and ``__dir__`` functions of a lazy package.
+
+    The submodules are only imported when one of their member is accessed for the first time. The resolved member is then cached in the package namespace so the lookup is only performed once.
+
+    Args:
+        package_name: the name of the package to populate (``__name__``)
+        submod_attrs: the submodule names (relative to the package) and the list of members they expose. A direct submodule with no member can still be accessed as an attribute of the package.
+        default: the submodule used to resolve any name that is not listed in ``submod_attrs``. If set, the returned list should not be assigned to ``__all__`` as its public members are only added to it when a star import is performed.
+
+    Returns:
+        the ``__getattr__`` and ``__dir__`` functions and the ``__all__`` list of the package
+    """
+    attr_to_module = {a: m for m, attrs in submod_attrs.items() for a in attrs}
+    all_ = sorted({m for m in submod_attrs if "." not in m} | set(attr_to_module))
+
+    def _public_names(module_name: str) -> List[str]:
+        module = importlib.import_module(f"{package_name}.{module_name}")
+        return [n for n in vars(module) if not n.startswith("_")]
+
+    def __getattr__(name: str):
+        package = sys.modules[package_name]
+
+        # the list of names is only complete once the default module is loaded
+        if name == "__all__" and default is not None:
+            value = sorted(set(all_) | set(_public_names(default)))
+
+        elif name in submod_attrs:
+            value = importlib.import_module(f"{package_name}.{name}")
+
+        elif name in attr_to_module:
+            module = importlib.import_module(f"{package_name}.{attr_to_module[name]}")
+            value = getattr(module, name)
+
+        elif default is not None and not name.startswith("_"):
+            module = importlib.import_module(f"{package_name}.{default}")
+            try:
+                value = getattr(module, name)
+            except AttributeError:
+                raise AttributeError(f"module {package_name!r} has no attribute {name!r}")
+
+        else:
+            raise AttributeError(f"module {package_name!r} has no attribute {name!r}")
+
+        # cache the value to avoid calling __getattr__ again
+        setattr(package, name, value)
+
+        return value
+
+    def __dir__() -> List[str]:
+        names = set(all_)
+        if default:
+            names.update(_public_names(default))
+        return sorted(names)
+
+    return __getattr__, __dir__, all_
@@ -0,0 +1,26 @@
+"""Helpers to work with the web-mercator tile grid used by the maps."""
+
+import math
+from typing import Tuple
+
+from deprecated.sphinx import versionadded
+
+
+@versionadded(version="2.18.0")
+def tile_index(lat: float, lng: float, zoom: int) -> Tuple[int, int]:
+    """Return the (x, y) index of the web-mercator tile containing a point.
+
+    Args:
+        lat: the latitude of the point
+        lng: the longitude of the point
+        zoom: the zoom level of the tile
+
+    Returns:
+        the column and the row of the tile
+    """
+    n = 2**zoom
+    lat = math.radians(min(max(lat, -85.0511), 85.0511))
+    x = int((lng + 180) / 360 * n)
+    y = int((1 - math.asinh(math.tan(lat)) / math.pi) / 2 * n)
+
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
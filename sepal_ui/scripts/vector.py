@@ -0,0 +1,204 @@
+"""Helper methods to read the schema and the values of vector sources without loading them."""
+
+import csv
+from pathlib import Path
+from typing import List, Union
+
+import ee
+import pandas as pd
+from deprecated.sphinx import versionadded
+
+from sepal_ui.scripts import decorator as sd
+from sepal_ui.scripts.cache import LRUCache
+
+SKIP_PROPERTIES: List[str] = ["system:index", "Shape_Area"]
+"The properties of the GEE tables that are not displayed to the user"
+
+SNIFF_SIZE: int = 64 * 1024
+"The number of bytes read at the start of a point table to find its delimiter"
+
+schemas: LRUCache = LRUCache(maxsize=64)
+"The columns and values of the vector sources, keyed by ee object or by file path and modification time"
+
+tables: LRUCache = LRUCache(maxsize=8)
+"The parsed point tables, keyed by file path, modification time and columns"
+
+
+def _file_key(path: Union[str, Path]) -> tuple:
+    """Return a key that changes when the file is modified.
+
+    Args:
+        path: the path to the file
+
+    Returns:
+        the resolved path and the modification time of the file
+    """
+    path = Path(path).resolve()
+
+    return str(path), path.stat().st_mtime_ns
+
+
+def _sorted(values: list) -> list:
+    """Sort the values of a column, mixed types (e.g. with missing values) are sorted as strings.
+
+    Args:
+        values: the values to sort
+
+    Returns:
+        the sorted values
+    """
+    try:
+        return sorted(values)
+    except TypeError:
+        return sorted(values, key=str)
+
+
+@versionadded(version="2.18.0")
+@sd.need_ee
+def get_ee_columns(feature_collection: Union[str, ee.FeatureCollection]) -> List[str]:
+    """Get the columns of a GEE table from its first feature.
+
+    The result is cached by the serialized definition of the table.
+
+    Args:
+        feature_collection: the table or its asset id
+
+    Returns:
+        the name of the columns
+    """
+    if isinstance(feature_collection, str):
+        feature_collection = ee.FeatureCollection(feature_collection)
+
+    def fetch() -> List[str]:
+        columns = ee.Feature(feature_collection.first()).propertyNames()
+        return [str(c) for c in columns.removeAll(SKIP_PROPERTIES).getInfo()]
+
+    return schemas.get_or_set(("ee", feature_collection.serialize()), fetch)
+
+
+@versionadded(version="2.18.0")
+@sd.need_ee
+def get_ee_values(feature_collection: Union[str, ee.FeatureCollection], column: str) -> list:
+    """Get the distinct values of a column of a GEE table.
+
+    Only this column is aggregated on the server and the result is cached by the serialized definition of the table.
+
+    Args:
+        feature_collection: the table or its asset id
+        column: the column to read
+
+    Returns:
+        the sorted distinct values of the column
+    """
+    if isinstance(feature_collection, str):
+        feature_collection = ee.FeatureCollection(feature_collection)
+
+    def fetch() -> list:
+        return _sorted(feature_collection.aggregate_array(column).distinct().getInfo())
+
+    return schemas.get_or_set(("ee", feature_collection.serialize(), column), fetch)
+
+
+@versionadded(version="2.18.0")
+def get_file_columns(path: Union[str, Path]) -> List[str]:
+    """Get the columns of a vector file from its metadata.
+
+    The features are not read and the result is cached until the file is modified.
+
+    Args:
+        path: the path to the vector file
+
+    Returns:
+        the name of the columns
+    """
+    import pyogrio
+
+    def fetch() -> List[str]:
+        return [str(c) for c in pyogrio.read_info(path)["fields"]]
+
+    return schemas.get_or_set(("file", *_file_key(path)), fetch)
+
+
+@versionadded(version="2.18.0")
+def get_file_values(path: Union[str, Path], column: str) -> list:
+    """Get the distinct values of a column of a vector file.
+
+    Only this column is read and the result is cached until the file is modified.
+
+    Args:
+        path: the path to the vector file
+        column: the column to read
+
+    Returns:
+        the sorted distinct values of the column
+    """
+    import pyogrio
+
+    def fetch() -> list:
+        df = pyogrio.read_dataframe(path, columns=[column], read_geometry=False)
+        return _sorted(list(set(df[column].to_list())))
+
+    return schemas.get_or_set(("file", *_file_key(path), column), fetch)
+
+
+@versionadded(version="2.18.0")
+def get_delimiter(path: Union[str, Path]) -> str:
+    """Find the delimiter of a point table from the first lines of the file.
+
+    Args:
+        path: the path to the .csv or .txt file
+
+    Returns:
+        the delimiter of the table, default to ","
+    """
+
+    def fetch() -> str:
+        with open(path, newline="") as f:
+            sample = f.read(SNIFF_SIZE)
+
+        # only use complete lines to sniff the delimiter
+        sample = sample.rsplit("\n", 1)[0] if len(sample) == SNIFF_SIZE else sample
+        try:
+            return csv.Sniffer().sniff(sample, delimiters=",;\t| ").delimiter
+        except csv.Error:
+            return ","
+
+    return schemas.get_or_set(("delimiter", *_file_key(path)), fetch)
+
+
+@versionadded(version="2.18.0")
+def get_table_columns(path: Union[str, Path]) -> List[str]:
+    """Get the columns of a point table by reading its header only.
+
+    Args:
+        path: the path to the .csv or .txt file
+
+    Returns:
+        the name of the columns
+    """
+
+    def fetch() -> List[str]:
+        return pd.read_csv(path, sep=get_delimiter(path), nrows=0).columns.tolist()
+
+    return schemas.get_or_set(("table", *_file_key(path)), fetch)
+
+
+@versionadded(version="2.18.0")
+def read_points(path: Union[str, Path], columns: List[str]) -> pd.DataFrame:
+    """Read the selected columns of a point table.
+
+    The table is parsed with the pyarrow engine and cached until the file is modified.
+
+    Args:
+        path: the path to the .csv or .txt file
+        columns: the columns to read (typically id, lng and lat)
+
+    Returns:
+        a copy of the cached dataframe
+    """
+
+    def fetch() -> pd.DataFrame:
+        df = pd.read_csv(path, sep=get_delimiter(path), usecols=columns, engine="pyarrow")
+        return df[columns]
+
+    return tables.get_or_set(("points", *_file_key(path), tuple(columns)), fetch).copy()
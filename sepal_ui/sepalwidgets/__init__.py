@@ -12,14 +12,56 @@ Example:
         sw.Btn()
 """
 
-from sepal_ui.sepalwidgets.sepal_ipyvuetify import *  # noqa: I
-
-# import and/or overwrite with our customized widgets
-from sepal_ui.sepalwidgets.sepalwidget import *
-from sepal_ui.sepalwidgets.alert import *
-from sepal_ui.sepalwidgets.app import *
-from sepal_ui.sepalwidgets.btn import *
-from sepal_ui.sepalwidgets.inputs import *
-from sepal_ui.sepalwidgets.tile import *
-from sepal_ui.sepalwidgets.widget import *
-from sepal_ui.sepalwidgets.radio import *
+from typing import TYPE_CHECKING
+
+from sepal_ui.scripts import lazy
+
+# the modules are only imported when one of their member is requested.
+# Our customized widgets overwrite the ipyvuetify ones and every other name is
+# resolved in the automatically generated sepal_ipyvuetify module.
+# __all__ is not set as it depends on the generated module, it's resolved by __getattr__
+__getattr__, __dir__, _ = lazy.attach(
+    __name__,
+    {
+        "alert": ["Alert", "Banner", "Divider", "StateBar"],
+        "app": [
+            "App",
+            "AppBar",
+            "DrawerItem",
+            "Footer",
+            "LocaleSelect",
+            "NavDrawer",
+            "ThemeSelect",
+        ],
+        "btn": ["Btn", "DownloadBtn"],
+        "inputs": [
+            "AssetSelect",
+            "DatePicker",
+            "FileInput",
+            "LoadTableField",
+            "NumberField",
+            "PasswordField",
+            "SimpleSlider",
+            "VectorField",
+        ],
+        "radio": ["Radio", "RadioGroup"],
+        "sepal_ipyvuetify": [],
+        "sepalwidget": ["SepalWidget", "Tooltip"],
+        "tile": ["Tile", "TileAbout", "TileDisclaimer"],
+        "widget": ["CopyToClip", "Markdown", "StateIcon"],
+    },
+    default="sepal_ipyvuetify",
+)
+
+if TYPE_CHECKING:
+    from sepal_ui.sepalwidgets.sepal_ipyvuetify import *  # noqa: I
+
+    # import and/or overwrite with our customized widgets
+    from sepal_ui.sepalwidgets.sepalwidget import *
+    from sepal_ui.sepalwidgets.alert import *
+    from sepal_ui.sepalwidgets.app import *
+    from sepal_ui.sepalwidgets.btn import *
+    from sepal_ui.sepalwidgets.inputs import *
+    from sepal_ui.sepalwidgets.tile import *
+    from sepal_ui.sepalwidgets.widget import *
+    from sepal_ui.sepalwidgets.radio import *
@@ -12,16 +12,18 @@ Example:
 """
 
 import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Any, List, Optional, Union
+from typing import Any, Iterator, List, Optional, Union
 
 import ee
 import geopandas as gpd
 import ipyvuetify as v
 import pandas as pd
 import traitlets as t
-from deprecated.sphinx import versionadded
+from deprecated.sphinx import deprecated, versionadded
 from natsort import humansorted
 from traitlets import link, observe
 from typing_extensions import Self
@@ -29,7 +31,7 @@ from typing_extensions import Self
 from sepal_ui.frontend import styles as ss
 from sepal_ui.message import ms
 from sepal_ui.scripts import decorator as sd
-from sepal_ui.scripts import gee
+from sepal_ui.scripts import gee, vector
 from sepal_ui.scripts import utils as su
 from sepal_ui.sepalwidgets.btn import Btn
 from sepal_ui.sepalwidgets.sepalwidget import SepalWidget
@@ -575,19 +577,20 @@ class LoadTableField(v.Col, SepalWidget):
         if path is None:
             return self
 
-        df = pd.read_csv(path, sep=None, engine="python")
+        # only read the header of the table
+        columns = vector.get_table_columns(path)
 
-        if len(df.columns) < 3:
+        if len(columns) < 3:
             self._set_v_model("pathname", None)
             self.fileInput.selected_file.error_messages = ms.widgets.load_table.too_small
             return self
 
         # set the items
-        self.IdSelect.items = df.columns.tolist()
+        self.IdSelect.items = columns
 
         # pre load values that sounds like what we are looking for
         # it will only keep the first occurrence of each one
-        for name in reversed(df.columns.tolist()):
+        for name in reversed(columns):
             lname = name.lower()
             if "id" in lname:
                 self.IdSelect.v_model = name
@@ -655,6 +658,18 @@ class AssetSelect(v.Combobox, SepalWidget):
     types: t.List = t.List().tag(sync=True)
     "The list of types accepted by the asset selector. names need to be valid TYPES and changing this value will trigger the reload of the asset items."
 
+    executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=4)
+    "The threads loading the nested assets, shared by all the instances of the kernel"
+
+    future: Optional[Future] = None
+    "The loading of the nested assets running in the background"
+
+    _load_id: int = 0
+    "The number of the last loading, used to ignore the outdated ones"
+
+    _lock: Optional[threading.Lock] = None
+    "The lock preventing an outdated loading from setting the items of a newer one"
+
     @sd.need_ee
     def __init__(
         self,
@@ -672,6 +687,7 @@ class AssetSelect(v.Combobox, SepalWidget):
             types: the list of asset type you want to display to the user. type need to be from: ['IMAGE', 'FOLDER', 'IMAGE_COLLECTION', 'TABLE','ALGORITHM']. Default to 'IMAGE' & 'TABLE'
             kwargs (optional): any parameter from a v.ComboBox.
         """
+        self._lock = threading.Lock()
         self.valid = False
         self.asset_info = None
 
@@ -705,7 +721,7 @@ class AssetSelect(v.Combobox, SepalWidget):
         self._fill_no_data({})
 
         # add js behaviours
-        self.on_event("click:prepend", self._get_items)
+        self.on_event("click:prepend", self._reload)
         self.observe(self._get_items, "default_asset")
 
     def _fill_no_data(self, _: dict) -> None:
@@ -750,8 +766,24 @@ class AssetSelect(v.Combobox, SepalWidget):
 
         return
 
-    @sd.switch("loading", "disabled")
-    def _get_items(self, *args) -> Self:
+    def _reload(self, *args) -> None:
+        """Reload the items, only the folders modified since their last listing are requested."""
+        self._get_items(refresh=True)
+
+        return
+
+    def _get_items(self, *args, refresh: bool = False) -> Self:
+        """Load the items of the combobox.
+
+        The first level of the folder is displayed at once and the nested assets are added in the background as soon as their folders are listed. The listings are shared by all the instances through the ``gee.asset_cache``.
+
+        Args:
+            refresh: whether to list again the folders modified since their cached listing
+        """
+        with self._lock:
+            load_id = self._load_id = self._load_id + 1
+        self.loading = self.disabled = True
+
         # init the item list
         items = []
 
@@ -766,11 +798,66 @@ class AssetSelect(v.Combobox, SepalWidget):
             items += [{"divider": True}, {"header": header}]
             items += [default for default in self.default_asset]
 
-        # get the list of user asset
-        raw_assets = gee.get_assets(self.folder)
+        streaming = False
+        try:
+            # display the first level of the user assets
+            levels = gee.iter_assets(self.folder, refresh)
+            raw_assets = [a for assets in next(levels).values() for a in assets]
+            self._set_items(items, raw_assets, load_id)
+
+            # stream the nested ones
+            args = (items, raw_assets, levels, load_id)
+            self.future = self.executor.submit(self._stream_items, *args)
+            streaming = True
+        finally:
+            self.disabled = False
+            if not streaming:
+                self.loading = False
+
+        return self
+
+    def _stream_items(
+        self, items: list, raw_assets: List[dict], levels: Iterator[dict], load_id: int
+    ) -> None:
+        """Add the assets of each nesting level to the items until a new loading starts.
+
+        Args:
+            items: the default items displayed before the user assets
+            raw_assets: the user assets already displayed
+            levels: the remaining nesting levels of the user folder
+            load_id: the number of the loading
+        """
+        try:
+            # stop listing the folders as soon as a new loading starts
+            while load_id == self._load_id:
+                listings = next(levels, None)
+                if listings is None:
+                    break
+                raw_assets = raw_assets + [a for assets in listings.values() for a in assets]
+                self._set_items(items, raw_assets, load_id)
+        except Exception as e:
+            # display the error, it is also kept in the future
+            if load_id == self._load_id:
+                self.error_messages = ms.widgets.asset_select.list_error.format(self.folder, e)
+            raise e
+        finally:
+            if load_id == self._load_id:
+                self.loading = False
+
+        return
+
+    def _set_items(self, items: list, raw_assets: List[dict], load_id: int = 0) -> None:
+        """Set the items of the combobox, sorted by types.
+
+        Args:
+            items: the default items displayed before the user assets
+            raw_assets: the user assets
+            load_id: the number of the loading, the items are not set if a newer one started
+        """
         assets = {k: sorted([e["id"] for e in raw_assets if e["type"] == k]) for k in self.types}
 
         # sort the assets by types
+        items = list(items)
         for k in self.types:
             if len(assets[k]):
                 items += [
@@ -779,9 +866,12 @@ class AssetSelect(v.Combobox, SepalWidget):
                     *assets[k],
                 ]
 
-        self.items = items
+        with self._lock:
+            if load_id and load_id != self._load_id:
+                return
+            self.items = items
 
-        return self
+        return
 
     @observe("types")
     def _check_types(self, change: dict) -> None:
@@ -883,9 +973,6 @@ class VectorField(v.Col, SepalWidget):
     original_gdf: Optional[gpd.GeoDataFrame] = None
     "The originally selected dataframe"
 
-    df: Optional[pd.DataFrame] = None
-    "the original dataframe without the geometry (for column naming)"
-
     gdf: Optional[gpd.GeoDataFrame] = None
     "The selected dataframe"
 
@@ -966,13 +1053,25 @@ class VectorField(v.Col, SepalWidget):
 
         return self
 
+    @property
+    @deprecated(
+        version="2.18.0",
+        reason="the columns and values are read on demand with the sepal_ui.scripts.vector functions",
+    )
+    def df(self) -> Optional[pd.DataFrame]:
+        """The original dataframe without the geometry (for column naming), None for the GEE tables."""
+        path = self.v_model["pathname"]
+        if not isinstance(self.w_file, FileInput) or not path:
+            return None
+
+        return gpd.read_file(path, ignore_geometry=True)
+
     @sd.switch("loading", on_widgets=["w_column", "w_value"])
     def _update_file(self, change: dict) -> Self:
         """Update the file name, the v_model and reset the other widgets."""
         # reset the widgets
         self.w_column.items, self.w_value.items = [], []
         self.w_column.v_model = self.w_value.v_model = None
-        self.df = None
         self.feature_collection = None
 
         # set the pathname value
@@ -982,15 +1081,13 @@ class VectorField(v.Col, SepalWidget):
         if not change["new"]:
             return self
 
+        # read the columns from the shared schema cache
         if isinstance(self.w_file, FileInput):
-            # read the file
-            self.df = gpd.read_file(change["new"], ignore_geometry=True)
-            columns = self.df.columns.to_list()
+            columns = vector.get_file_columns(change["new"])
 
         elif isinstance(self.w_file, AssetSelect):
             self.feature_collection = ee.FeatureCollection(change["new"])
-            columns = self.feature_collection.first().getInfo()["properties"]
-            columns = [str(col) for col in columns if col not in ["system:index", "Shape_Area"]]
+            columns = vector.get_ee_columns(self.feature_collection)
 
         # update the columns
         self.w_column.items = self.column_base_items + sorted(set(columns))
@@ -1020,16 +1117,12 @@ class VectorField(v.Col, SepalWidget):
 
         # read the colmun
         if isinstance(self.w_file, FileInput):
-            values = self.df[change["new"]].to_list()
+            values = vector.get_file_values(self.v_model["pathname"], change["new"])
 
         elif isinstance(self.w_file, AssetSelect):
-            values = (
-                self.feature_collection.distinct(change["new"])
-                .aggregate_array(change["new"])
-                .getInfo()
-            )
+            values = vector.get_ee_values(self.feature_collection, change["new"])
 
-        self.w_value.items = sorted(set(values))
+        self.w_value.items = values
 
         su.show_component(self.w_value)
 
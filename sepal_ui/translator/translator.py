@@ -1,15 +1,22 @@
 """The translator object allow developer to support translation for their application."""
 
+import hashlib
 import json
 from configparser import ConfigParser
 from pathlib import Path
 from typing import List, Tuple, Union
 
-import pandas as pd
 from box import Box
 from deprecated.sphinx import deprecated, versionadded
 
-from sepal_ui.conf import config_file
+from sepal_ui.conf import cache_dir, config_file
+from sepal_ui.scripts.cache import LRUCache
+
+BUNDLE_VERSION: int = 1
+"The version of the compiled translation bundles, increase it to invalidate the existing files"
+
+bundles: LRUCache = LRUCache(maxsize=16)
+"The compiled translations of the process, keyed by folder, locales and file modification times"
 
 
 class Translator(Box):
@@ -23,6 +30,8 @@ class Translator(Box):
         "available_locales",
         "merge_dict",
         "delete_empty",
+        "_bundle_key",
+        "_compile",
     ] + dir(Box)
     "keys that cannot be used as var names as they are protected for methods"
 
@@ -48,33 +57,19 @@ class Translator(Box):
             target: The language code (IETF BCP 47) of the target lang (it should be the same as the target dictionary). Default to either the language specified in the parameter file or the default one.
             default: The language code (IETF BCP 47) of the source lang. default to "en" (it should be the same as the source dictionary)
         """
-        # the name of the 5 variables that cannot be used as init keys
-        FORBIDDEN_KEYS = ["_folder", "_default", "_target", "_targeted", "_match"]
-
         # init the box with the folder
         folder = Path(json_folder)
 
-        # reading the default dict
-        default_dict = self.merge_dict(folder / default)
-
-        # create a dictionary in the target language
+        # find the target language
         targeted, target = self.find_target(folder, target)
         target = target or default
-        target_dict = self.merge_dict(folder / target)
 
         # evaluate the matching of requested and obtained values
         match = targeted == target
 
-        # create the composite dictionary
-        ms_dict = self._update(default_dict, target_dict)
-
-        # check if forbidden keys are being used
-        # this will raise an error if any
-        [self.search_key(ms_dict, k) for k in FORBIDDEN_KEYS + self._protected_keys]
-
-        # # unpack the json as a simple namespace
-        ms_json = json.dumps(ms_dict)
-        ms_boxes = json.loads(ms_json, object_hook=lambda d: Box(**d, frozen_box=True))
+        # get the compiled dictionaries as frozen boxes
+        key = self._bundle_key(folder, default, target)
+        ms_boxes = bundles.get_or_set(key, lambda: self._compile(folder, default, target, key))
 
         private_keys = {
             "_folder": str(folder),
@@ -89,6 +84,67 @@ class Translator(Box):
         # it the meantime it's easy to call the translator using a frozen_box argument
         super(Box, self).__init__(**private_keys, **ms_boxes)
 
+    @staticmethod
+    def _bundle_key(folder: Path, default: str, target: str) -> str:
+        """Build a key that changes whenever a file of the used locales is modified.
+
+        Args:
+            folder: the folder where the languages dictionaries are stored
+            default: the default language code
+            target: the target language code
+
+        Returns:
+            the hash of the folder, the locales and the modification time of their files
+        """
+        files = sorted(f for lang in {default, target} for f in (folder / lang).glob("*.json"))
+        stats = [(str(f), f.stat().st_mtime_ns, f.stat().st_size) for f in files]
+        key = [BUNDLE_VERSION, str(folder.resolve()), default, target, stats]
+
+        return hashlib.md5(json.dumps(key).encode()).hexdigest()
+
+    def _compile(self, folder: Path, default: str, target: str, key: str) -> Box:
+        """Read the compiled bundle of the locales or compile and save it.
+
+        Args:
+            folder: the folder where the languages dictionaries are stored
+            default: the default language code
+            target: the target language code
+            key: the bundle key (see ``_bundle_key``)
+
+        Returns:
+            the merged dictionaries as frozen boxes
+        """
+        # the name of the 5 variables that cannot be used as init keys
+        FORBIDDEN_KEYS = ["_folder", "_default", "_target", "_targeted", "_match"]
+
+        bundle = cache_dir / "translator" / f"{key}.json"
+
+        # a corrupted or unreadable bundle is simply ignored, it will be overwritten
+        try:
+            return Box(json.loads(bundle.read_text()), frozen_box=True)
+        except (OSError, ValueError):
+            pass
+
+        # create the composite dictionary
+        default_dict = self.merge_dict(folder / default)
+        target_dict = self.merge_dict(folder / target)
+        ms_dict = self._update(default_dict, target_dict)
+
+        # check if forbidden keys are being used
+        # this will raise an error if any
+        [self.search_key(ms_dict, k) for k in FORBIDDEN_KEYS + self._protected_keys]
+
+        # saving the bundle is only an optimization, read-only homes are fine
+        try:
+            bundle.parent.mkdir(parents=True, exist_ok=True)
+            tmp = bundle.with_suffix(".json.tmp")
+            tmp.write_text(json.dumps(ms_dict))
+            tmp.replace(bundle)
+        except OSError:
+            pass
+
+        return Box(ms_dict, frozen_box=True)
+
     @versionadded(version="2.7.0")
     @staticmethod
     def find_target(folder: Path, target: str = "") -> Tuple[str, str]:
@@ -279,6 +335,8 @@ class Translator(Box):
         Returns:
             the list of unused keys
         """
+        import pandas as pd
+
         # cannot set FORBIDDEN_KEY in the Box as it would lock another key
         FORBIDDEN_KEYS = ["_folder", "_default", "_target", "_targeted", "_match"]
 
@@ -2,12 +2,17 @@
 
 from pathlib import Path
 from typing import List
+from unittest.mock import patch
 
 import ee
+import geopandas as gpd
+import pygadm
 import pytest
+from shapely import geometry as sg
 from traitlets import Dict, Unicode
 
 from sepal_ui import aoi
+from sepal_ui import mapping as sm
 
 
 def test_init_no_ee(fake_vector: Path) -> None:
@@ -270,6 +275,114 @@ def test_from_admin(gee_dir: Path) -> None:
     return
 
 
+def test_admin_cache(tmp_path: Path, monkeypatch) -> None:
+    """Check the administrative boundaries are read from the cache.
+
+    Args:
+        tmp_path: the folder used as cache
+        monkeypatch: the pytest patcher
+    """
+    monkeypatch.setattr(aoi.AoiModel, "ADMIN_CACHE_DIR", tmp_path)
+    aoi_model = aoi.AoiModel(gee=False)
+
+    # nothing is cached yet
+    assert aoi_model._read_admin_cache("VAT") is None
+
+    # a fake vatican city
+    gdf = gpd.GeoDataFrame(
+        {"GID_0": ["VAT"], "NAME_0": ["Vatican City"]},
+        geometry=[sg.box(12.44, 41.9, 12.46, 41.91)],
+        crs="EPSG:4326",
+    )
+    aoi_model._write_admin_cache("VAT", gdf)
+    assert aoi_model._admin_cache_file("VAT").is_file()
+
+    # the model is built without requesting pygadm
+    with patch.object(pygadm, "AdmItems", side_effect=Exception("no network")):
+        aoi_model = aoi.AoiModel(gee=False, admin="VAT")
+
+    assert aoi_model.name == "VAT"
+    assert aoi_model.gdf.equals(gdf)
+
+    return
+
+
+def test_admin_cache_simplified(tmp_path: Path, monkeypatch) -> None:
+    """Check the simplified boundaries are cached separately.
+
+    Args:
+        tmp_path: the folder used as cache
+        monkeypatch: the pytest patcher
+    """
+    monkeypatch.setattr(aoi.AoiModel, "ADMIN_CACHE_DIR", tmp_path)
+    monkeypatch.setattr(ee.data, "_credentials", True)
+
+    full_file = aoi.AoiModel()._admin_cache_file("110")
+    simple_file = aoi.AoiModel(simplify_tolerance=1000)._admin_cache_file("110")
+    assert full_file != simple_file
+    assert simple_file != aoi.AoiModel(simplify_tolerance=10)._admin_cache_file("110")
+
+    return
+
+
+@pytest.mark.skipif(not ee.data._credentials, reason="GEE is not set")
+def test_admin_cache_precision(tmp_path: Path, monkeypatch) -> None:
+    """Check a full precision model never reads the simplified boundaries.
+
+    Args:
+        tmp_path: the folder used as cache
+        monkeypatch: the pytest patcher
+    """
+    monkeypatch.setattr(aoi.AoiModel, "ADMIN_CACHE_DIR", tmp_path)
+
+    # load italy simplified first and then in full precision
+    simple_model = aoi.AoiModel(admin="122", simplify_tolerance=1000)
+    aoi_model = aoi.AoiModel(admin="122")
+
+    nb_coords = aoi_model.gdf.get_coordinates().shape[0]
+    assert simple_model.gdf.get_coordinates().shape[0] < nb_coords
+    assert not aoi_model.gdf.geometry.geom_equals(simple_model.gdf.geometry).all()
+
+    return
+
+
+@pytest.mark.skipif(not ee.data._credentials, reason="GEE is not set")
+def test_load_gdf(monkeypatch) -> None:
+    """Check the gdf is loaded by pages.
+
+    Args:
+        monkeypatch: the pytest patcher
+    """
+    monkeypatch.setattr(aoi.AoiModel, "PAGE_SIZE", 5)
+    ee_col = ee.FeatureCollection("FAO/GAUL/2015/level1").filter(
+        ee.Filter.eq("ADM0_NAME", "France")
+    )
+
+    aoi_model = aoi.AoiModel()
+    aoi_model.feature_collection = ee_col
+    aoi_model._load_gdf()
+    assert len(aoi_model.gdf) == ee_col.size().getInfo()
+    assert aoi_model.gdf.crs == "EPSG:4326"
+
+    # simplified geometries are lighter
+    simple_model = aoi.AoiModel(simplify_tolerance=1000)
+    simple_model.feature_collection = ee_col
+    simple_model._load_gdf()
+    nb_coords = aoi_model.gdf.get_coordinates().shape[0]
+    assert simple_model.gdf.get_coordinates().shape[0] < nb_coords
+
+    return
+
+
+def test_get_iso() -> None:
+    """Check the GAUL codes are converted in ISO codes."""
+    assert aoi.AoiModel.get_iso(110) == "VAT"
+    assert aoi.AoiModel.get_iso("110") == "VAT"
+    assert aoi.AoiModel._iso is not None
+
+    return
+
+
 @pytest.mark.skipif(not ee.data._credentials, reason="GEE is not set")
 def test_from_point(fake_points: Path, gee_dir: Path) -> None:
     """Get an AoiModel from point file.
@@ -382,6 +495,33 @@ def test_from_geo_json(gee_dir, square: dict) -> None:
     return
 
 
+def test_get_ipygeojson() -> None:
+    """Check the simplified geometries are switched with the map zoom."""
+    aoi_model = aoi.AoiModel(gee=False)
+    aoi_model.name = "circle"
+    circle = sg.Point(12.45, 41.9).buffer(1, quad_segs=256)
+    aoi_model.gdf = gpd.GeoDataFrame(geometry=[circle], crs=4326)
+
+    layer = aoi_model.get_ipygeojson()
+    assert list(layer.levels) == [0, 6, 10, 14]
+    assert layer.level == 0
+    assert layer.data["features"][0]["properties"]["name"] == "circle"
+
+    # coarse levels have less vertices
+    sizes = [len(d["features"][0]["geometry"]["coordinates"][0]) for d in layer.levels.values()]
+    assert sizes == sorted(sizes)
+    assert sizes[0] < sizes[-1] == 1025
+
+    # the levels are switched by the map
+    m = sm.SepalMap(["OpenStreetMap"], gee=False, zoom=12)
+    m.add_layer(layer)
+    assert layer.level == 10
+    m.zoom = 2
+    assert layer.level == 0
+
+    return
+
+
 @pytest.mark.skipif(not ee.data._credentials, reason="GEE is not set")
 def test_from_geo_json_gee(gee_dir, square: dict) -> None:
     """Get an AoiModel from a geojson (equivalent to draw).
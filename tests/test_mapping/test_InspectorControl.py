@@ -1,11 +1,17 @@
 """Test the Inspector Control."""
 
 import math
+import os
 from pathlib import Path
 
 import ee
 import geopandas as gpd
+import numpy as np
 import pytest
+import rasterio as rio
+from ipyleaflet import GeoJSON, TileLayer
+from rasterio.transform import from_origin
+from shapely import geometry as sg
 
 from sepal_ui import mapping as sm
 
@@ -97,6 +103,33 @@ def test_free_eelayer(world_temp: ee.imagecollection, ee_adm2: ee.FeatureCollect
     data = inspector_control._from_eelayer(ee_adm2, [12.457, 41.902])
     assert data == {"ADM2_CODE": 18350}
 
+    # check all the layers at once
+    ee_objs = [world_temp.mosaic(), ee_adm2]
+    data = inspector_control._from_eelayers(ee_objs, [12.457, 41.902])
+    assert data == [{"temperature_2m": 296.00286865234375}, {"ADM2_CODE": 18350}]
+
+    return
+
+
+def test_read_data_layers(adm0_vatican: dict) -> None:
+    """Check the values of every local layers are displayed in the map order.
+
+    Args:
+        adm0_vatican: the geo_interface of the vatican
+    """
+    m = sm.SepalMap()
+    inspector_control = sm.InspectorControl(m)
+    m.add(inspector_control)
+    m.add_layer(GeoJSON(data=adm0_vatican, name="vatican"))
+    m.add_layer(TileLayer(name="tiles"))
+
+    inspector_control.menu.v_model = True
+    inspector_control.read_data(type="click", coordinates=[41.902, 12.457])
+
+    items = inspector_control.text.children[-1].items
+    assert [i["name"] for i in items] == ["vatican", "tiles"]
+    assert items[0]["children"][0] == {"name": "GID_0: VAT"}
+
     return
 
 
@@ -118,6 +151,42 @@ def test_from_geojson(adm0_vatican: dict) -> None:
     data = inspector_control._from_geojson(adm0_vatican, [12.457, 41.902])
     assert data == {"GID_0": "VAT", "COUNTRY": "VaticanCity"}
 
+    # the dataframe is built only once for the same data
+    _, gdf, _ = inspector_control.geodataframes.get(id(adm0_vatican))
+    inspector_control._from_geojson(adm0_vatican, [12.457, 41.902])
+    assert inspector_control.geodataframes.get(id(adm0_vatican))[1] is gdf
+
+    # and rebuilt for new data
+    new_data = dict(adm0_vatican)
+    data = inspector_control._from_geojson(new_data, [12.457, 41.902])
+    assert data == {"GID_0": "VAT", "COUNTRY": "VaticanCity"}
+    assert inspector_control.geodataframes.get(id(new_data))[1] is not gdf
+
+    return
+
+
+def test_from_geojson_layer() -> None:
+    """Check the dataframes are cached per layer and reused for the tiled layers."""
+    m = sm.SepalMap(["OpenStreetMap"], gee=False)
+    inspector_control = sm.InspectorControl(m)
+    squares = [sg.box(x, 0, x + 1, 1) for x in range(10)]
+    gdf = gpd.GeoDataFrame({"id": range(10)}, geometry=squares, crs=4326)
+
+    # the dataframe of a layer replaces the one of its former data
+    layer = GeoJSON(data=gdf.__geo_interface__)
+    inspector_control._from_geojson(layer.data, [8.5, 0.5], layer)
+    layer.data = gdf.iloc[:5].__geo_interface__
+    assert inspector_control._from_geojson(layer.data, [8.5, 0.5], layer) == {"id": None}
+    assert inspector_control._from_geojson(layer.data, [3.5, 0.5], layer) == {"id": 3}
+    assert inspector_control.geodataframes.get(layer.model_id)[0] is layer.data
+
+    # the tiled layers are read from their full dataset whatever the displayed tiles
+    tiled = sm.TiledGeoJSON(gdf)
+    tiled.set_bounds([[0, 0], [1, 1]], 10)
+    size = len(inspector_control.geodataframes)
+    assert inspector_control._from_geojson(tiled.data, [8.5, 0.5], tiled) == {"id": 8}
+    assert len(inspector_control.geodataframes) == size
+
     return
 
 
@@ -137,9 +206,77 @@ def test_from_raster(rgb: Path) -> None:
 
     # check the featurecollection on vatican city
     data = inspector_control._from_raster(rgb, [-78.072, 24.769])
-    assert math.isclose(data["band 1"], 70.46553, rel_tol=1e-5)
-    assert math.isclose(data["band 2"], 91.41595, rel_tol=1e-5)
-    assert math.isclose(data["band 3"], 93.08673, rel_tol=1e-5)
+    assert math.isclose(data["band 1"], 68.90622, rel_tol=1e-5)
+    assert math.isclose(data["band 2"], 89.78166, rel_tol=1e-5)
+    assert math.isclose(data["band 3"], 90.78045, rel_tol=1e-5)
+
+    return
+
+
+def test_close_datasets(tmp_path: Path) -> None:
+    """Check the raster datasets are closed when they are dropped.
+
+    Args:
+        tmp_path: the folder where the raster is created
+    """
+    m = sm.SepalMap(["OpenStreetMap"], gee=False)
+    inspector_control = sm.InspectorControl(m)
+    m.add(inspector_control)
+    raster = tmp_path / "ones.tif"
+    profile = {"driver": "GTiff", "width": 10, "height": 10, "count": 1, "dtype": "uint8"}
+    profile.update(crs="EPSG:4326", transform=from_origin(0, 10, 1, 1))
+    with rio.open(raster, "w", **profile) as dst:
+        dst.write(np.ones((1, 10, 10), dtype="uint8"))
+
+    # the stale dataset is closed when the file is modified
+    assert inspector_control._from_raster(raster, [5, 5]) == {"band 1": 1.0}
+    ds = inspector_control.datasets.get(str(raster.resolve()))[0]
+    os.utime(raster, ns=(0, 0))
+    assert inspector_control._from_raster(raster, [5, 5]) == {"band 1": 1.0}
+    assert ds.closed
+    ds = inspector_control.datasets.get(str(raster.resolve()))[0]
+    assert not ds.closed
+
+    # the datasets of the other inspectors are kept open
+    other_control = sm.InspectorControl(sm.SepalMap(["OpenStreetMap"], gee=False))
+    assert other_control._from_raster(raster, [5, 5]) == {"band 1": 1.0}
+    other_ds = other_control.datasets.get(str(raster.resolve()))[0]
+
+    # all the datasets are closed when the control is removed
+    m.remove(inspector_control)
+    assert ds.closed
+    assert len(inspector_control.datasets) == 0
+    assert not other_ds.closed
+
+    # a dataset that keeps being closed is read from a new one
+    other_ds.close()
+    assert other_control._from_raster(raster, [5, 5]) == {"band 1": 1.0}
+
+    return
+
+
+@pytest.mark.parametrize("zoom", [2, 10, 18])
+def test_from_raster_zoom(tmp_path: Path, zoom: int) -> None:
+    """Check the raster values are read at any zoom level.
+
+    Args:
+        tmp_path: the folder where the raster is created
+        zoom: the zoom level of the map
+    """
+    m = sm.SepalMap(["OpenStreetMap"], gee=False, zoom=zoom)
+    inspector_control = sm.InspectorControl(m)
+    raster = tmp_path / "range.tif"
+    profile = {"driver": "GTiff", "width": 10, "height": 10, "count": 1, "dtype": "uint8"}
+    profile.update(crs="EPSG:4326", transform=from_origin(0, 10, 1, 1))
+    with rio.open(raster, "w", **profile) as dst:
+        dst.write(np.arange(100, dtype="uint8").reshape(1, 10, 10))
+
+    # the pixel of the point is always read when the map pixels are smaller than the raster ones
+    data = inspector_control._from_raster(raster, [3.5, 6.5])
+    if zoom > 2:
+        assert data == {"band 1": 33.0}
+    else:
+        assert data["band 1"] is not None
 
     return
 
@@ -3,6 +3,7 @@
 import json
 import math
 import random
+from concurrent.futures import Future
 from pathlib import Path
 
 import ee
@@ -13,7 +14,10 @@ from ipyleaflet import GeoJSON
 from sepal_ui import mapping as sm
 from sepal_ui.frontend import styles as ss
 from sepal_ui.frontend.styles import get_theme
+from sepal_ui.mapping.layer import EELayer
 from sepal_ui.mapping.legend_control import LegendControl
+from sepal_ui.message import ms
+from sepal_ui.scripts.warning import SepalWarning
 
 # create a seed so that we can check values
 random.seed(42)
@@ -246,6 +250,98 @@ def test_add_ee_layer(image_id: str) -> None:
     return
 
 
+@pytest.mark.skipif(not ee.data._credentials, reason="GEE is not set")
+def test_get_tile_url() -> None:
+    """Check the tile urls are cached."""
+    sm.SepalMap.map_id_cache.clear()
+    image = ee.Image.constant(1)
+    vis_params = {"min": 0, "max": 1}
+
+    url = sm.SepalMap.get_tile_url(image, vis_params)
+    assert sm.SepalMap.map_id_cache.misses == 1
+
+    # the same expression reuses the same url
+    assert sm.SepalMap.get_tile_url(ee.Image.constant(1), dict(vis_params)) == url
+    assert sm.SepalMap.map_id_cache.hits == 1
+
+    # different parameters need a new url
+    sm.SepalMap.get_tile_url(image, {**vis_params, "max": 2})
+    assert sm.SepalMap.map_id_cache.misses == 2
+
+    # the cache can be bypassed
+    sm.SepalMap.get_tile_url(image, vis_params, cache=False)
+    assert sm.SepalMap.map_id_cache.hits == 1
+
+    return
+
+
+@pytest.mark.skipif(not ee.data._credentials, reason="GEE is not set")
+def test_add_ee_layer_async() -> None:
+    """Check the EE layers can be resolved in the background."""
+    m = sm.SepalMap(statebar=True)
+    image = ee.Image.constant(1)
+
+    futures = [m.addLayer(image, {"min": 0, "max": i}, asynchronous=True) for i in [1, 2]]
+
+    # the placeholders are displayed at once
+    assert len(m.layers) == 3
+    assert all(lyr.url == sm.sepal_map.PLACEHOLDER_URL for lyr in m.layers[1:])
+
+    [f.result() for f in futures]
+    assert all(lyr.url.startswith("https://") for lyr in m.layers[1:])
+    assert m.state.nb_loading_layer == 0
+
+    return
+
+
+def test_set_ee_layer() -> None:
+    """Check the placeholder layers are updated when the resolution is finished."""
+    m = sm.SepalMap(["OpenStreetMap"], gee=False, statebar=True)
+
+    # a successful resolution
+    layer = EELayer(ee_object=None, url=sm.sepal_map.PLACEHOLDER_URL, name="success")
+    m.add_layer(layer)
+    layer.set_trait("loading", True)
+    assert m.state.nb_loading_layer == 1
+
+    future = Future()
+    future.set_result(("toto", "https://tile.url/{z}/{x}/{y}"))
+    m._set_ee_layer(layer, future)
+    assert layer.url == "https://tile.url/{z}/{x}/{y}"
+    assert layer.ee_object == "toto"
+    assert m.state.nb_loading_layer == 0
+
+    # a failed resolution removes the placeholder
+    layer = EELayer(ee_object=None, url=sm.sepal_map.PLACEHOLDER_URL, name="failure")
+    m.add_layer(layer)
+    layer.set_trait("loading", True)
+
+    future = Future()
+    future.set_exception(EEException("toto"))
+    with pytest.warns(SepalWarning):
+        m._set_ee_layer(layer, future)
+    assert m.find_layer("failure", none_ok=True) is None
+    assert m.state.nb_loading_layer == 0
+    assert m.state.w_state.msg == ms.layer_state.error.format("failure", "toto")
+
+    return
+
+
+def test_pending_ee_layer() -> None:
+    """Check the pending EE layers are ignored by the inspector."""
+    m = sm.SepalMap(["OpenStreetMap"], gee=False, vinspector=True)
+    layer = EELayer(ee_object=None, url=sm.sepal_map.PLACEHOLDER_URL, name="pending")
+    layer.pending = True
+    m.add_layer(layer)
+
+    # the click is not aborted by the unresolved layer
+    m.v_inspector.menu.v_model = True
+    m.v_inspector.read_data(type="click", coordinates=[0, 0])
+    assert m.v_inspector.text.children[-1].items[0]["name"] == "pending"
+
+    return
+
+
 def test_get_basemap_list() -> None:
     """Set multiple basemaps on the SepalMap."""
     # Retrieve 5 random maps
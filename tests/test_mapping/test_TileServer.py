@@ -0,0 +1,234 @@
+"""Test the TileServer object."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import numpy as np
+import pytest
+import rasterio as rio
+import rasterio.shutil
+from rasterio.transform import from_origin
+
+from sepal_ui import mapping as sm
+from sepal_ui import sepalwidgets as sw
+from sepal_ui.mapping import tile_server
+from sepal_ui.scripts.tiles import tile_index
+
+STYLE = {"bands": [{"band": 1, "palette": "#f00"}]}
+"A simple style of the first band"
+
+
+def test_get_client(rgb: Path) -> None:
+    """Check the clients are reused for the same file.
+
+    Args:
+        rgb: the path to a rgb image (3 bands)
+    """
+    server = sm.TileServer()
+
+    client = server.get_client(rgb)
+    assert client.rasterio.count == 3
+    assert server.get_client(str(rgb)) is client
+
+    return
+
+
+def test_get_tile(rgb: Path) -> None:
+    """Check the tiles are served and cached.
+
+    Args:
+        rgb: the path to a rgb image (3 bands)
+    """
+    server = sm.TileServer(max_workers=2)
+    layer_id = server.register(server.get_client(rgb), STYLE)
+    x, y = tile_index(24.769, -78.072, 8)
+
+    # request the same tile twice through the server
+    url = server.get_url(layer_id).format(z=8, x=x, y=y)
+    tiles = [urlopen(url).read() for _ in range(2)]
+
+    assert tiles[0].startswith(b"\x89PNG")
+    assert tiles[0] == tiles[1]
+    assert server.tiles.stats()["misses"] == 1
+    assert server.tiles.stats()["hits"] == 1
+
+    # unknown layers are not served
+    with pytest.raises(HTTPError):
+        urlopen(url.replace(layer_id, "toto"))
+
+    return
+
+
+def test_prewarm(rgb: Path) -> None:
+    """Check the tiles covering the bounds are rendered in advance.
+
+    Args:
+        rgb: the path to a rgb image (3 bands)
+    """
+    server = sm.TileServer(max_bytes=2**30)
+    layer_id = server.register(server.get_client(rgb), STYLE)
+
+    # the full extent of the image
+    futures = server.prewarm(layer_id, None, 8)
+    [f.result() for f in futures]
+    assert len(server.tiles) == len(futures) > 0
+
+    # already rendered tiles are skipped
+    assert server.prewarm(layer_id, None, 8) == []
+
+    # bounds out of the image
+    assert server.prewarm(layer_id, [[0, 0], [1, 1]], 8) == []
+
+    return
+
+
+def test_get_tile_pool(monkeypatch) -> None:
+    """Check the tiles are rendered once in the thread pool when they are requested concurrently.
+
+    Args:
+        monkeypatch: the pytest patcher
+    """
+    server = sm.TileServer(max_workers=2)
+    renders, release = [], threading.Event()
+
+    def render(layer_id: str, z: int, x: int, y: int) -> bytes:
+        renders.append(threading.current_thread())
+        release.wait(5)
+        return b"tile"
+
+    monkeypatch.setattr(server, "_render", render)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(server.get_tile, "toto", 0, 0, 0) for _ in range(4)]
+        time.sleep(0.1)
+        release.set()
+        tiles = [f.result() for f in futures]
+
+    assert tiles == [b"tile"] * 4
+    assert len(renders) == 1
+    assert renders[0] in server.executor._threads
+    assert server.get_tile("toto", 0, 0, 0) == b"tile"
+    assert len(renders) == 1
+
+    return
+
+
+def test_unregister() -> None:
+    """Check the raster layers are unregistered when they are removed from the map."""
+    m = sm.SepalMap(["OpenStreetMap"], gee=False)
+    server = tile_server.tile_server
+    server.sources["toto"] = (None, STYLE)
+    layer = sm.BoundTileLayer("toto.tif", "toto", url="", name="toto")
+
+    # adding the same layer twice keeps it registered
+    m.add_layer(layer)
+    m.add_layer(layer)
+    assert m.layers.count(layer) == 1
+    assert "toto" in server.sources
+
+    m.remove_layer(layer)
+    assert "toto" not in server.sources
+
+    return
+
+
+def test_configure() -> None:
+    """Check the server resources can be changed."""
+    server = sm.TileServer()
+    server.configure(max_workers=2, max_bytes=1000)
+
+    assert server.max_workers == 2
+    assert server.executor._max_workers == 2
+    assert server.tiles.maxbytes == 1000
+
+    return
+
+
+def test_get_cog(big_raster: Path, rgb: Path, tmp_path: Path, monkeypatch) -> None:
+    """Check the sidecar COG is created once for big rasters.
+
+    Args:
+        big_raster: the path to a big striped raster without overviews
+        rgb: the path to a small rgb image
+        tmp_path: the folder used as cache
+        monkeypatch: the pytest patcher
+    """
+    monkeypatch.setattr(tile_server, "cache_dir", tmp_path)
+
+    # small images are displayed as is
+    assert tile_server.needs_cog(rgb) is False
+    assert tile_server.get_cog(rgb) == rgb.resolve()
+
+    # big ones are optimized
+    alert = sw.Alert()
+    assert tile_server.needs_cog(big_raster) is True
+    cog = tile_server.get_cog(big_raster, alert)
+
+    assert cog.parent == tmp_path / "cog"
+    assert alert.progress_bar.n == 1
+    with rio.open(cog) as ds:
+        assert ds.profile["tiled"] is True
+        assert ds.overviews(1) == [2, 4]
+    assert tile_server.needs_cog(cog) is False
+
+    # the sidecar is reused
+    mtime = cog.stat().st_mtime_ns
+    assert tile_server.get_cog(big_raster) == cog
+    assert cog.stat().st_mtime_ns == mtime
+
+    return
+
+
+def test_get_cog_interrupted(big_raster: Path, tmp_path: Path, monkeypatch) -> None:
+    """Check an interrupted generation leaves no file behind.
+
+    Args:
+        big_raster: the path to a big striped raster without overviews
+        tmp_path: the folder used as cache
+        monkeypatch: the pytest patcher
+    """
+    monkeypatch.setattr(tile_server, "cache_dir", tmp_path)
+
+    def copy(*args, **kwargs) -> None:
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as m:
+        m.setattr(rio.shutil, "copy", copy)
+        with pytest.raises(KeyboardInterrupt):
+            tile_server.get_cog(big_raster)
+    assert list((tmp_path / "cog").iterdir()) == []
+
+    # the next call generates a complete sidecar
+    cog = tile_server.get_cog(big_raster)
+    assert list((tmp_path / "cog").iterdir()) == [cog]
+    with rio.open(cog) as ds:
+        assert ds.overviews(1) == [2, 4]
+
+    return
+
+
+@pytest.fixture
+def big_raster(tmp_path: Path) -> Path:
+    """Create a striped raster without overviews.
+
+    Returns:
+        the path to the raster
+    """
+    file = tmp_path / "big.tif"
+    profile = {
+        "driver": "GTiff",
+        "width": 2000,
+        "height": 1500,
+        "count": 1,
+        "dtype": "uint8",
+        "crs": "EPSG:4326",
+        "transform": from_origin(0, 10, 0.001, 0.001),
+    }
+    with rio.open(file, "w", **profile) as dst:
+        dst.write(np.ones((1, 1500, 2000), dtype="uint8"))
+
+    return file
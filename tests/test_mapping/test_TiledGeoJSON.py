@@ -0,0 +1,83 @@
+"""Test the custom TiledGeoJSON layer."""
+
+import geopandas as gpd
+import pytest
+from shapely import geometry as sg
+
+from sepal_ui import mapping as sm
+
+
+def test_init(grid: gpd.GeoDataFrame) -> None:
+    """Check nothing is sent before the map bounds are known.
+
+    Args:
+        grid: a grid of 100 squares
+    """
+    layer = sm.TiledGeoJSON(grid.to_crs(3857), name="grid")
+
+    assert layer.data["features"] == []
+    assert layer.gdf.crs.to_epsg() == 4326
+
+    return
+
+
+def test_tile_bounds() -> None:
+    """Check the bounds of the tiles in the web-mercator grid."""
+    assert sm.TiledGeoJSON.tile_bounds(1, 1, 0) == pytest.approx((0, 0, 180, 85.0511), abs=1e-4)
+
+    return
+
+
+def test_set_bounds(grid: gpd.GeoDataFrame) -> None:
+    """Check only the features of the visible tiles are sent.
+
+    Args:
+        grid: a grid of 100 squares
+    """
+    layer = sm.TiledGeoJSON(grid)
+
+    # the full grid
+    layer.set_bounds([[-1, -1], [11, 11]], 4)
+    assert len(layer.data["features"]) == 100
+
+    # a single tile, already cut tiles are reused
+    data = layer.data
+    layer.set_bounds([[0.5, 0.5], [1.5, 1.5]], 8)
+    assert 0 < len(layer.data["features"]) < 10
+    layer.set_bounds([[0.6, 0.6], [1.4, 1.4]], 8)
+    assert layer.tiles.stats()["misses"] == len(layer.tiles)
+
+    # back to the first bounds
+    layer.set_bounds([[-1, -1], [11, 11]], 4)
+    assert layer.data == data
+    assert layer.tiles.stats()["hits"] > 0
+
+    return
+
+
+def test_sepal_map(grid: gpd.GeoDataFrame) -> None:
+    """Check the tiles are updated by the map.
+
+    Args:
+        grid: a grid of 100 squares
+    """
+    m = sm.SepalMap(["OpenStreetMap"], gee=False, zoom=4)
+    layer = sm.TiledGeoJSON(grid, name="grid")
+    m.add_layer(layer)
+    assert layer.data["features"] == []
+
+    m.set_trait("bounds", ((-1, -1), (11, 11)))
+    assert len(layer.data["features"]) == 100
+
+    return
+
+
+@pytest.fixture
+def grid() -> gpd.GeoDataFrame:
+    """A grid of 1 degree squares.
+
+    Returns:
+        the squares with their index as attribute
+    """
+    squares = [sg.box(x, y, x + 1, y + 1) for x in range(10) for y in range(10)]
+    return gpd.GeoDataFrame({"id": range(100)}, geometry=squares, crs=4326)
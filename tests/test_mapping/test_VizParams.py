@@ -0,0 +1,81 @@
+"""Test the VizParams object."""
+
+import ee
+import pytest
+
+from sepal_ui import mapping as sm
+from sepal_ui.scripts.warning import SepalWarning
+
+
+def test_init() -> None:
+    """Parse the visualization properties of an image."""
+    properties = {
+        "system:index": "toto",
+        "visualization_0_name": "RGB",
+        "visualization_0_bands": "red,green,blue",
+        "visualization_0_min": 0,
+        "visualization_0_max": 2000,
+        "visualization_1_name": "Classification",
+        "visualization_1_bands": "class",
+        "visualization_1_type": "categorical",
+        "visualization_1_values": "5,200,1000",
+        "visualization_1_palette": "#042333,#b15f82,#e8fa5b",
+        "visualization_2_name": "NDWI",
+        "visualization_2_bands": "ndwi,ndwi_rmse",
+        "visualization_2_min": "-1,0",
+        "visualization_2_max": "1,10",
+        "visualization_2_type": "continuous",
+        "visualization_2_inverted": "false,True",
+    }
+    viz = sm.VizParams(properties)
+
+    assert viz.names == ["RGB", "Classification", "NDWI"]
+    assert viz["0"]["type"] == "rgb"
+    assert viz["0"]["bands"] == ["red", "green", "blue"]
+    assert viz["1"]["values"] == [5, 200, 1000]
+    assert viz["2"]["min"] == [-1.0, 0.0]
+    assert viz["2"]["inverted"] == [False, True]
+
+    # incomplete properties
+    with pytest.warns(SepalWarning):
+        viz = sm.VizParams({"visualization_0_bands": "a,b"})
+    assert viz == {}
+
+    return
+
+
+def test_get_params() -> None:
+    """Check the params are copies of the parsed values."""
+    viz = sm.VizParams({"visualization_0_name": "toto", "visualization_0_bands": "a"})
+
+    params = viz.get_params()
+    assert params == {"name": "toto", "bands": ["a"], "type": "continuous"}
+
+    params["bands"].append("b")
+    assert viz.get_params("toto")["bands"] == ["a"]
+
+    assert viz.get_params("tutu") is None
+    assert sm.VizParams().get_params() is None
+
+    return
+
+
+@pytest.mark.skipif(not ee.data._credentials, reason="GEE is not set")
+def test_from_image(image_id: str) -> None:
+    """Check the parameters are requested once per image.
+
+    Args:
+        image_id: the AssetId of the Daniel W. image
+    """
+    sm.VizParams.cache.clear()
+
+    viz = sm.VizParams.from_image(ee.Image(image_id))
+    assert sorted(viz.names) == ["Classification", "NDWI", "NDWI harmonics", "RGB"]
+
+    sm.VizParams.from_image(ee.Image(image_id))
+    assert sm.VizParams.cache.hits == 1
+
+    # an image without viz properties
+    assert sm.VizParams.from_image(ee.Image.constant(1)) == {}
+
+    return
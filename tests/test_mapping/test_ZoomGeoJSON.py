@@ -0,0 +1,31 @@
+"""Test the custom ZoomGeoJSON layer."""
+
+from sepal_ui import mapping as sm
+
+
+def test_init() -> None:
+    """Check the coarsest level is displayed first."""
+    levels = {10: {"type": "FeatureCollection", "features": []}, 0: {}}
+    layer = sm.ZoomGeoJSON(levels=levels, name="toto")
+
+    assert list(layer.levels) == [0, 10]
+    assert layer.level == 0
+
+    return
+
+
+def test_set_zoom() -> None:
+    """Check the data are switched with the zoom."""
+    coarse = {"type": "FeatureCollection", "features": []}
+    fine = {"type": "FeatureCollection", "features": [], "name": "fine"}
+    layer = sm.ZoomGeoJSON(levels={0: coarse, 8: fine})
+
+    layer.set_zoom(12)
+    assert layer.level == 8
+    assert layer.data["name"] == "fine"
+
+    layer.set_zoom(7.5)
+    assert layer.level == 0
+    assert "name" not in layer.data
+
+    return
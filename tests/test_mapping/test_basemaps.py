@@ -1,5 +1,6 @@
 """Test the basemaps registered in the SepalMap."""
 
+import pytest
 from ipyleaflet import TileLayer
 
 from sepal_ui import mapping as sm
@@ -38,3 +39,32 @@ def test_xyz_to_leaflet() -> None:
         assert isinstance(tile, TileLayer)
 
     return
+
+
+def test_basemap_registry() -> None:
+    """Check the registry only builds the requested TileLayers."""
+    registry = sm.basemaps.BasemapRegistry()
+
+    # listing the basemaps doesn't create any widget
+    assert "HYBRID" in registry
+    assert "OpenTopoMap" in registry.keys()
+    assert len(registry) == len(sm.basemaps.get_basemap_params())
+    assert registry._layers == {}
+
+    # the layer is created once and then reused
+    layer = registry["OpenTopoMap"]
+    assert isinstance(layer, TileLayer)
+    assert layer.base is True
+    assert registry["OpenTopoMap"] is layer
+    assert list(registry._layers) == ["OpenTopoMap"]
+
+    # box-like attribute access
+    assert registry.HYBRID is registry["HYBRID"]
+
+    with pytest.raises(KeyError):
+        registry["toto"]
+
+    with pytest.raises(AttributeError):
+        registry.toto
+
+    return
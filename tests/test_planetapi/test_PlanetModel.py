@@ -1,14 +1,19 @@
 """Test the planet PlanetModel model."""
 
+import asyncio
 import os
+import threading
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Any, Union
 
 import planet
 import pytest
 from pytest import FixtureRequest
 
+from sepal_ui import sepalwidgets as sw
 from sepal_ui.planetapi import PlanetModel
+from sepal_ui.planetapi import planet_model as planet_model_module
 
 
 @pytest.mark.skipif("PLANET_API_KEY" not in os.environ, reason="requires Planet")
@@ -241,6 +246,248 @@ def test_get_quad(planet_key: str, data_regression) -> None:
     data_regression.check(quad)
 
 
+def test_run() -> None:
+    """Check the coroutines are executed in the background loop of the model."""
+    planet_model = PlanetModel()
+
+    async def get_loop() -> asyncio.AbstractEventLoop:
+        return asyncio.get_running_loop()
+
+    assert planet_model.run(get_loop()) is planet_model.loop
+    assert planet_model.submit(get_loop()).result() is planet_model.loop
+
+    # the sync wrappers can be used from a running loop (e.g. in Jupyter)
+    async def main() -> asyncio.AbstractEventLoop:
+        return planet_model.run(get_loop())
+
+    assert asyncio.run(main()) is planet_model.loop
+
+    # the loop is kept when the model is reinitialized and shared with the other models
+    loop, threads = planet_model.loop, threading.active_count()
+    planet_model.__init__()
+    assert planet_model.loop is loop
+    assert PlanetModel().loop is loop
+    assert threading.active_count() == threads
+
+    return
+
+
+def test_async_methods() -> None:
+    """Check the session is only used in the model loop, whatever the calling loop."""
+    planet_model = PlanetModel()
+    loops = []
+
+    class FakeSession:
+        async def request(self, method: str, url: str) -> SimpleNamespace:
+            loops.append(asyncio.get_running_loop())
+            return SimpleNamespace(status_code=200, json=lambda: [{"plan": "toto"}])
+
+    planet_model.session = FakeSession()
+
+    assert planet_model.get_subscriptions() == [{"plan": "toto"}]
+    assert asyncio.run(planet_model.get_subscriptions_async()) == [{"plan": "toto"}]
+    assert loops == [planet_model.loop, planet_model.loop]
+
+    return
+
+
+def test_mosaic_catalogue(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Check all the pages of the catalogue are loaded once and indexed."""
+    monkeypatch.setattr(PlanetModel, "MOSAICS_CACHE_DIR", tmp_path)
+    url = "https://api.planet.com/basemaps/v1/mosaics"
+    pages = {
+        url: {
+            "mosaics": [
+                {
+                    "name": "jan",
+                    "first_acquired": "2022-01-01T00:00:00.000Z",
+                    "last_acquired": "2022-02-01T00:00:00.000Z",
+                }
+            ],
+            "_links": {"_next": f"{url}?_page=2"},
+        },
+        f"{url}?_page=2": {
+            "mosaics": [
+                {
+                    "name": "feb",
+                    "first_acquired": "2022-02-01T00:00:00.000Z",
+                    "last_acquired": "2022-03-01T00:00:00.000Z",
+                }
+            ],
+            "_links": {},
+        },
+    }
+    requests = []
+
+    class FakeSession:
+        async def request(self, method: str, url: str) -> SimpleNamespace:
+            requests.append(url)
+            await asyncio.sleep(0.01)
+            return SimpleNamespace(json=lambda: pages[url])
+
+    planet_model = PlanetModel()
+    planet_model.auth = SimpleNamespace(_key="toto")
+    planet_model.session = FakeSession()
+
+    # concurrent calls share the same load
+    futures = [planet_model.submit(planet_model.get_mosaics_async()) for _ in range(3)]
+    assert [m["name"] for m in futures[0].result()] == ["jan", "feb"]
+    assert all(f.result() == futures[0].result() for f in futures)
+    assert requests == list(pages)
+
+    # lookups by name and date
+    assert planet_model.get_mosaic("feb")["name"] == "feb"
+    assert planet_model.get_mosaic("toto") == {}
+    assert [m["name"] for m in planet_model.get_mosaics_by_date("2022-02-01")] == ["feb"]
+    assert [m["name"] for m in planet_model.get_mosaics_by_date("2022-01-15T12:00:00Z")] == ["jan"]
+    assert planet_model.get_mosaics_by_date("2023-01-01") == []
+
+    # a new model with the same key reads the disk cache
+    planet_model = PlanetModel()
+    planet_model.auth = SimpleNamespace(_key="toto")
+    planet_model.session = FakeSession()
+    assert len(planet_model.get_mosaics()) == 2
+    assert len(requests) == 2
+
+    # unless the catalogue is refreshed
+    assert len(planet_model.get_mosaics(refresh=True)) == 2
+    assert len(requests) == 4
+
+    return
+
+
+def test_split_aoi() -> None:
+    """Check the AOI cells sent to the API are only polygons."""
+    # a U shape whose top-left cell also touches the inner edges of the U
+    coords = [[0, 0], [2, 0], [2, 2], [1, 2], [1, 1], [0.5, 1], [0.5, 2], [0, 2], [0, 0]]
+    aoi = {"type": "Polygon", "coordinates": [coords]}
+
+    cells = PlanetModel._split_aoi(aoi, 2)
+    assert len(cells) == 4
+    assert {c["type"] for c in cells} <= {"Polygon", "MultiPolygon"}
+    assert sum(PlanetModel._aoi_geometry(c).area for c in cells) == 3.5
+
+    return
+
+
+def test_iter_items(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Check the items are streamed and deduplicated when the AOI is split."""
+    searches = []
+
+    class FakeClient:
+        def __init__(self, session: Any) -> None:
+            return
+
+        async def search(self, item_types: list, search_filter: dict, **kwargs) -> Any:
+            geometry = search_filter["config"][0]["config"]
+            searches.append(geometry)
+            west, south = PlanetModel._aoi_geometry(geometry).bounds[:2]
+
+            # each cell finds its own item and the one shared by all the cells
+            for id in [f"item_{west:.0f}_{south:.0f}", "shared"]:
+                await asyncio.sleep(0.01)
+                yield {"id": id}
+
+    monkeypatch.setattr(planet_model_module, "DataClient", FakeClient)
+    planet_model = PlanetModel()
+    aoi = {"type": "Polygon", "coordinates": [[[0, 0], [2, 0], [2, 2], [0, 2], [0, 0]]]}
+    args = (aoi, "2020-11-18", "2020-11-19", 0.5)
+
+    # single search streamed
+    items = planet_model.iter_items(*args)
+    assert next(items) == {"id": "item_0_0"}
+    assert list(items) == [{"id": "shared"}]
+
+    # concurrent searches in the cells of the aoi
+    searches.clear()
+    items = planet_model.get_items(*args, split=2)
+    ids = ["item_0_0", "item_0_1", "item_1_0", "item_1_1", "shared"]
+    assert len(searches) == 4
+    assert sorted(i["id"] for i in items) == ids
+
+    # the limit applies to the whole search
+    assert len(planet_model.get_items(*args, limit=3, split=2)) == 3
+
+    # async iterator from another event loop
+    async def collect() -> list:
+        return [i async for i in planet_model.iter_items_async(*args)]
+
+    assert asyncio.run(collect()) == [{"id": "item_0_0"}, {"id": "shared"}]
+
+    return
+
+
+def test_get_quad_ids() -> None:
+    """Check the quads intersecting an AOI are found in the mosaic grid."""
+    mosaic = {
+        "bbox": [-180, -85.051129, 180, 85.051129],
+        "grid": {"quad_size": 4096, "resolution": 4.77731426782},
+    }
+
+    # bbox
+    assert PlanetModel.get_quad_ids(mosaic, [2.3, 48.8, 2.4, 48.9]) == ["1037-1342", "1037-1343"]
+
+    # geometry, feature and feature collection
+    point = {"type": "Point", "coordinates": [0.1, 0.1]}
+    feature = {"type": "Feature", "properties": {}, "geometry": point}
+    collection = {"type": "FeatureCollection", "features": [feature]}
+    assert PlanetModel.get_quad_ids(mosaic, point) == ["1024-1024"]
+    assert PlanetModel.get_quad_ids(mosaic, feature) == ["1024-1024"]
+    assert PlanetModel.get_quad_ids(mosaic, collection) == ["1024-1024"]
+
+    # out of the mosaic
+    mosaic["bbox"] = [10, 10, 11, 11]
+    assert PlanetModel.get_quad_ids(mosaic, point) == []
+
+    return
+
+
+def test_get_quads(tmp_path: Path) -> None:
+    """Check the quads are requested concurrently and downloaded."""
+    planet_model = PlanetModel()
+    mosaic = {
+        "id": "mosaic",
+        "grid": {"quad_size": 4096, "resolution": 4.77731426782},
+    }
+    download = "https://download/{}"
+
+    class FakeSession:
+        async def request(self, method: str, url: str) -> SimpleNamespace:
+            quad_id = url.split("/")[-1]
+            if quad_id == "1037-1343":
+                raise planet.exceptions.MissingResource("toto")
+            links = {"download": download.format(quad_id)}
+            return SimpleNamespace(json=lambda: {"id": quad_id, "_links": links})
+
+        def stream(self, method: str, url: str) -> Any:
+            class Response:
+                async def __aenter__(self) -> "Response":
+                    return self
+
+                async def __aexit__(self, *args) -> None:
+                    return
+
+                async def aiter_bytes(self) -> Any:
+                    yield url.encode()
+
+            return Response()
+
+    planet_model.session = FakeSession()
+    alert = sw.Alert()
+    quads = planet_model.get_quads(mosaic, [2.3, 48.8, 2.4, 48.9], tmp_path, alert)
+
+    # missing quads are skipped
+    assert [q["id"] for q in quads] == ["1037-1342"]
+    assert alert.progress_bar.n == 1
+
+    # the quads are written on disk
+    file = tmp_path / "1037-1342.tif"
+    assert quads[0]["file"] == str(file)
+    assert file.read_text() == download.format("1037-1342")
+
+    return
+
+
 def hide_key(collection: Union[dict, list], key: str) -> dict:
     """Hide the planet_key anywhere it could appears in the dict result."""
     # create a generator from the data type
@@ -0,0 +1,160 @@
+"""Test the cache objects."""
+
+import time
+
+from sepal_ui.scripts.cache import LRUCache
+
+
+def test_init() -> None:
+    """Init an empty cache."""
+    cache = LRUCache(maxsize=2, ttl=10)
+
+    assert len(cache) == 0
+    assert cache.stats() == {
+        "hits": 0,
+        "misses": 0,
+        "size": 0,
+        "nbytes": 0,
+        "hit_ratio": 0.0,
+        "saved_time": 0.0,
+    }
+
+    return
+
+
+def test_get_or_set() -> None:
+    """Check values are only computed once."""
+    cache = LRUCache()
+    calls = []
+
+    def compute() -> str:
+        calls.append(1)
+        time.sleep(0.01)
+        return "toto"
+
+    assert cache.get_or_set("key", compute) == "toto"
+    assert cache.get_or_set("key", compute) == "toto"
+
+    assert len(calls) == 1
+    assert cache.hits == 1
+    assert cache.misses == 1
+    assert cache.saved_time >= 0.01
+
+    # errors are not cached
+    def fail() -> None:
+        raise ValueError("toto")
+
+    for _ in range(2):
+        try:
+            cache.get_or_set("error", fail)
+        except ValueError:
+            pass
+
+    assert "error" not in cache
+    assert cache.misses == 3
+
+    return
+
+
+def test_eviction() -> None:
+    """Check the least recently used entries are evicted."""
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    # use "a" so that "b" becomes the least recently used
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert len(cache) == 2
+
+    return
+
+
+def test_maxbytes() -> None:
+    """Check the entries are evicted when the cache is too heavy."""
+    cache = LRUCache(maxbytes=10)
+    cache.set("a", b"a" * 4)
+    cache.set("b", b"b" * 4)
+    assert cache.nbytes == 8
+
+    # "a" is evicted to make room for "c"
+    cache.set("c", b"c" * 4)
+    assert "a" not in cache
+    assert cache.nbytes == 8
+
+    # replacing a value doesn't count it twice
+    cache.set("c", b"c" * 2)
+    assert cache.nbytes == 6
+
+    cache.pop("b")
+    assert cache.nbytes == 2
+
+    # a single value larger than the limit is kept
+    cache.set("d", b"d" * 20)
+    assert list(cache._data) == ["d"]
+    assert cache.nbytes == 20
+
+    return
+
+
+def test_ttl() -> None:
+    """Check the entries expire."""
+    cache = LRUCache(ttl=0.01)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    time.sleep(0.02)
+    assert "a" not in cache
+    assert cache.get("a", "default") == "default"
+
+    return
+
+
+def test_clear() -> None:
+    """Check the cache and its counters can be reset."""
+    cache = LRUCache()
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+    assert cache.pop("a") == 1
+
+    cache.set("a", 1)
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.hits == cache.misses == 0
+
+    return
+
+
+def test_on_evict() -> None:
+    """Check the dropped entries are sent to the eviction callback."""
+    dropped = []
+    cache = LRUCache(maxsize=2, ttl=0.01, on_evict=lambda k, v: dropped.append((k, v)))
+
+    # eviction and replacement
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    cache.set("b", 4)
+    assert dropped == [("a", 1), ("b", 2)]
+
+    # pop returns the value to the caller
+    assert cache.pop("b") == 4
+    assert dropped == [("a", 1), ("b", 2)]
+
+    # expiration
+    time.sleep(0.02)
+    cache.get("c")
+    assert dropped[-1] == ("c", 3)
+
+    # clear
+    cache.set("d", 5)
+    cache.clear()
+    assert dropped[-1] == ("d", 5)
+
+    return
@@ -45,6 +45,127 @@ def test_wait_for_completion(alert: sw.Alert, fake_task: str, gee_dir: Path, _ha
     return
 
 
+def test_task_monitor(monkeypatch) -> None:
+    """Check the watched tasks are polled together until they end.
+
+    Args:
+        monkeypatch: the pytest patcher
+    """
+    states = {"a": ["READY", "RUNNING", "COMPLETED"], "b": ["RUNNING", "RUNNING", "FAILED"]}
+    calls = []
+
+    def get_task_status(ids: list) -> list:
+        calls.append(ids)
+        return [
+            {"id": i, "state": states[i].pop(0) if len(states[i]) > 1 else states[i][0]}
+            for i in ids
+        ]
+
+    monkeypatch.setattr(ee.data, "getTaskStatus", get_task_status)
+    monitor = gee.TaskMonitor()
+    monitor.MIN_DELAY = 0.01
+
+    changes = []
+    future_a = monitor.watch("a", lambda status: changes.append(status["state"]))
+    future_b = monitor.watch("b")
+
+    assert future_a.result(timeout=5)["state"] == "COMPLETED"
+    with pytest.raises(Exception, match="FAILED"):
+        future_b.result(timeout=5)
+
+    assert changes == ["READY", "RUNNING", "COMPLETED"]
+    assert ["a", "b"] in calls
+    assert monitor.tasks == {}
+
+    return
+
+
+def test_task_monitor_callback_error(monkeypatch) -> None:
+    """Check a failing callback only ends its own task and the monitor can restart.
+
+    Args:
+        monkeypatch: the pytest patcher
+    """
+    states = {"a": "RUNNING", "b": "COMPLETED"}
+    monkeypatch.setattr(
+        ee.data, "getTaskStatus", lambda ids: [{"id": i, "state": states[i]} for i in ids]
+    )
+    monitor = gee.TaskMonitor()
+    monitor.MIN_DELAY = 0.01
+
+    def callback(status: dict) -> None:
+        raise ValueError("alert error")
+
+    future_a = monitor.watch("a", callback)
+    future_b = monitor.watch("b")
+
+    with pytest.raises(ValueError, match="alert error"):
+        future_a.result(timeout=5)
+    assert future_b.result(timeout=5)["state"] == "COMPLETED"
+
+    # the monitor is restarted for the next task
+    states["c"] = "COMPLETED"
+    assert monitor.watch("c").result(timeout=5)["state"] == "COMPLETED"
+
+    return
+
+
+def test_delete_assets(monkeypatch, capsys) -> None:
+    """Check the nested assets are deleted first and the failures are reported.
+
+    Args:
+        monkeypatch: the pytest patcher
+        capsys: the pytest output capture
+    """
+    root = "projects/toto/assets/root"
+    names = ["a", "b", "f", "f/c", "f/d", "g", "g/e"]
+    assets = [{"name": f"{root}/{n}", "type": "FOLDER" if n in "fg" else "TABLE"} for n in names]
+    deleted, attempts = [], {}
+
+    def delete_asset(name: str) -> None:
+        attempts[name] = attempts.get(name, 0) + 1
+        if name.endswith("c") and attempts[name] == 1:
+            raise ee.EEException("Too Many Requests: quota exceeded")
+        if name.endswith("e"):
+            raise ee.EEException("Permission denied")
+        deleted.append(name)
+
+    monkeypatch.setattr(ee.data, "_credentials", True)
+    monkeypatch.setattr(ee.data, "getAsset", lambda id: {"name": id, "type": "FOLDER"})
+    monkeypatch.setattr(ee.data, "deleteAsset", delete_asset)
+    monkeypatch.setattr(gee, "get_assets", lambda folder: assets)
+    monkeypatch.setattr(gee.time, "sleep", lambda s: None)
+
+    # nothing is deleted in dry run
+    summary = gee.delete_assets(root)
+    assert deleted == []
+    assert sorted(summary["to_delete"]) == sorted([a["name"] for a in assets] + [root])
+    assert summary["to_delete"][-1] == root
+    assert summary["deleted"] == summary["failed"] == summary["skipped"] == []
+    assert "to_delete: 8" in capsys.readouterr().out
+
+    # the nested assets are deleted first and the failures prevent the folder deletion
+    alert = sw.Alert()
+    with pytest.raises(Exception, match=f"{root}/g/e"):
+        gee.delete_assets(root, False, alert)
+    assert set(deleted[:2]) == {f"{root}/f/c", f"{root}/f/d"}
+    assert sorted(deleted) == sorted(f"{root}/{n}" for n in ["a", "b", "f", "f/c", "f/d"])
+    assert attempts[f"{root}/f/c"] == 2
+    assert alert.progress_bar.n == 1
+    assert alert.type == "error"
+    assert "deleted: 5, failed: 1, skipped: 2" in capsys.readouterr().out
+
+    # the deleted assets are returned when everything succeeds
+    deleted.clear()
+    monkeypatch.setattr(gee, "get_assets", lambda folder: assets[:2])
+    summary = gee.delete_assets(root, False)
+    assert sorted(summary["deleted"]) == [root, f"{root}/a", f"{root}/b"]
+    assert summary["to_delete"] == [f"{root}/a", f"{root}/b", root]
+    assert summary["failed"] == summary["skipped"] == []
+
+    return
+
+
 @pytest.mark.skipif(not ee.data._credentials, reason="GEE is not set")
 def test_is_task(fake_task: str) -> None:
     """Check a name is a task.
@@ -84,6 +205,93 @@ def test_get_assets(gee_dir: Path) -> None:
     return
 
 
+@pytest.mark.skipif(not ee.data._credentials, reason="GEE is not set")
+def test_list_folder(gee_dir: Path) -> None:
+    """Check the folder listings are cached.
+
+    Args:
+        gee_dir: gee_dir: the directory where gee files are exported
+    """
+    gee.clear_asset_cache()
+    list_ = gee.list_folder(gee_dir)
+    assert [a["name"] for a in list_] == [
+        str(gee_dir / name) for name in ["feature_collection", "image", "subfolder"]
+    ]
+
+    # the listing is reused until one of the assets is modified
+    assert gee.list_folder(gee_dir) is list_
+    gee.clear_asset_cache(gee_dir / "toto")
+    assert gee.list_folder(gee_dir) is not list_
+
+    return
+
+
+@pytest.mark.skipif(not ee.data._credentials, reason="GEE is not set")
+def test_iter_assets(gee_dir: Path) -> None:
+    """Check the folders are walked one nesting level at a time.
+
+    Args:
+        gee_dir: gee_dir: the directory where gee files are exported
+    """
+    levels = list(gee.iter_assets(gee_dir))
+    assert list(levels[0]) == [str(gee_dir)]
+    assert list(levels[1]) == [str(gee_dir / "subfolder")]
+
+    # unchanged subfolders are not listed again on refresh
+    subfolder = gee.list_folder(gee_dir / "subfolder")
+    list(gee.iter_assets(gee_dir, refresh=True))
+    assert gee.list_folder(gee_dir / "subfolder") is subfolder
+
+    return
+
+
+def test_get_assets_cache(monkeypatch) -> None:
+    """Check the assets are listed again unless the cache is explicitly used.
+
+    Args:
+        monkeypatch: the pytest patcher
+    """
+    folder = "projects/toto/assets/cache"
+    calls = []
+
+    def list_assets(params: dict) -> dict:
+        calls.append(params["parent"])
+        return {"assets": [{"name": f"{folder}/image_{len(calls)}", "type": "IMAGE"}]}
+
+    monkeypatch.setattr(ee.data, "_credentials", True)
+    monkeypatch.setattr(ee.data, "listAssets", list_assets)
+    gee.clear_asset_cache()
+
+    # an asset created by other means is seen by a default call
+    assert [a["name"] for a in gee.get_assets(folder)] == [f"{folder}/image_1"]
+    assert [a["name"] for a in gee.get_assets(folder)] == [f"{folder}/image_2"]
+
+    # the cached listing is reused on demand
+    assert [a["name"] for a in gee.get_assets(folder, cache=True)] == [f"{folder}/image_2"]
+    assert len(calls) == 2
+
+    gee.clear_asset_cache()
+
+    return
+
+
+def test_clear_asset_cache() -> None:
+    """Check the listings of the modified folders are removed."""
+    gee.asset_cache.set("projects/toto/assets/folder", [])
+    gee.asset_cache.set("projects/toto/assets/folder/subfolder", [])
+    gee.asset_cache.set("projects/toto/assets/other", [])
+
+    gee.clear_asset_cache("projects/toto/assets/folder/subfolder")
+    assert "projects/toto/assets/folder" not in gee.asset_cache
+    assert "projects/toto/assets/folder/subfolder" not in gee.asset_cache
+    assert "projects/toto/assets/other" in gee.asset_cache
+
+    gee.clear_asset_cache()
+    assert len(gee.asset_cache) == 0
+
+    return
+
+
 @pytest.mark.skipif(not ee.data._credentials, reason="GEE is not set")
 def test_is_asset(gee_dir: Path) -> None:
     """Check if the asset exist.
@@ -102,6 +310,59 @@ def test_is_asset(gee_dir: Path) -> None:
     return
 
 
+@pytest.mark.parametrize(
+    "msg, expected",
+    [
+        ("Asset 'projects/toto/assets/image' not found.", True),
+        (
+            "Asset 'projects/toto/assets/image' does not exist or doesn't allow this operation.",
+            True,
+        ),
+        ("Permission 'earthengine.assets.get' denied on resource 'projects/toto'.", False),
+        ("Quota exceeded for quota metric 'Requests'.", False),
+    ],
+)
+def test_is_not_found_error(msg: str, expected: bool) -> None:
+    """Check the GEE messages of the missing assets are recognized.
+
+    Args:
+        msg: the message of the GEE error
+        expected: whether the message reports a missing asset
+    """
+    assert gee._is_not_found_error(ee.EEException(msg)) is expected
+
+    return
+
+
+def test_is_asset_errors(monkeypatch) -> None:
+    """Check that only the missing assets are reported as non existing.
+
+    Args:
+        monkeypatch: the pytest patcher
+    """
+    folder = "projects/test/assets/folder"
+
+    def get_asset(id: str) -> dict:
+        if id.endswith("missing"):
+            raise ee.EEException(f"Asset '{id}' not found.")
+        elif id.endswith("forbidden"):
+            raise ee.EEException("Permission denied.")
+        return {"name": id, "type": "IMAGE"}
+
+    monkeypatch.setattr(ee.data, "_credentials", True)
+    monkeypatch.setattr(ee.data, "getAsset", get_asset)
+
+    assert gee.is_asset(f"{folder}/image") is True
+    assert gee.is_asset(f"{folder}/image", folder) is True
+    assert gee.is_asset("projects/test/assets/other/image", folder) is False
+    assert gee.is_asset(f"{folder}/missing", folder) is False
+
+    with pytest.raises(ee.EEException, match="Permission denied"):
+        gee.is_asset(f"{folder}/forbidden", folder)
+
+    return
+
+
 @pytest.mark.skipif(not ee.data._credentials, reason="GEE is not set")
 def test_is_running(fake_task: str) -> None:
     """Check if a task can be monitored.
@@ -0,0 +1,104 @@
+"""Test the lazy loading of the sepal-ui packages."""
+
+import json
+import subprocess
+import sys
+import time
+from types import ModuleType
+
+import pytest
+
+from sepal_ui import mapping as sm
+from sepal_ui import sepalwidgets as sw
+from sepal_ui.scripts import lazy
+
+# the dependencies that should never be loaded when importing a sepal-ui package
+HEAVY_DEPENDENCIES = [
+    "ee",
+    "geopandas",
+    "ipyleaflet",
+    "ipyvuetify",
+    "localtileserver",
+    "matplotlib",
+    "pandas",
+    "planet",
+    "pygadm",
+    "pygaul",
+    "rasterio",
+    "rioxarray",
+]
+
+
+@pytest.mark.parametrize(
+    "package",
+    [
+        "sepal_ui",
+        "sepal_ui.aoi",
+        "sepal_ui.mapping",
+        "sepal_ui.planetapi",
+        "sepal_ui.sepalwidgets",
+    ],
+)
+def test_import(package: str) -> None:
+    """Check that importing a package does not load any heavy dependency.
+
+    Args:
+        package: the name of the package to import
+    """
+    code = f"import json, sys; import {package}; print(json.dumps(list(sys.modules)))"
+    res = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    modules = json.loads(res.stdout.splitlines()[-1])
+
+    loaded = [m for m in HEAVY_DEPENDENCIES if m in modules]
+    assert loaded == []
+
+    return
+
+
+def test_attach() -> None:
+    """Check the lazy members are resolved and cached in the package."""
+    # a fake package that expose the "time" members from a "clock" submodule
+    package = ModuleType("fake_package")
+    sys.modules["fake_package"] = package
+    sys.modules["fake_package.clock"] = time
+
+    getattr_, dir_, all_ = lazy.attach("fake_package", {"clock": ["perf_counter"]})
+    package.__getattr__ = getattr_
+
+    assert all_ == ["clock", "perf_counter"]
+    assert dir_() == ["clock", "perf_counter"]
+    assert package.perf_counter is time.perf_counter
+    assert "perf_counter" in vars(package)
+    assert package.clock is time
+
+    with pytest.raises(AttributeError):
+        package.toto
+
+    del sys.modules["fake_package"], sys.modules["fake_package.clock"]
+
+    return
+
+
+def test_lazy_members() -> None:
+    """Check that the lazy members are the one from the sepal-ui modules."""
+    # customized widgets are overwriting the ipyvuetify ones
+    assert sw.Btn.__module__ == "sepal_ui.sepalwidgets.btn"
+    assert sw.Tooltip.__module__ == "sepal_ui.sepalwidgets.sepalwidget"
+
+    # other widgets are resolved in the generated module
+    assert sw.Card.__module__ == "sepal_ui.sepalwidgets.sepal_ipyvuetify"
+    assert "Card" in sw.__all__ and "Btn" in dir(sw)
+
+    # submodules are still accessible
+    assert isinstance(sm.basemaps, ModuleType)
+    assert sm.SepalMap.__module__ == "sepal_ui.mapping.sepal_map"
+
+    # the members of the former star imports are still exposed
+    from sepal_ui import planetapi
+    from sepal_ui.message import ms
+
+    assert planetapi.ms is ms
+    assert sm.sw is sw and planetapi.sw is sw
+    assert planetapi.Model.__module__ == "sepal_ui.model.model"
+
+    return
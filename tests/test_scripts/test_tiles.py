@@ -0,0 +1,13 @@
+"""Test the web-mercator tile helpers."""
+
+from sepal_ui.scripts import tiles
+
+
+def test_tile_index() -> None:
+    """Check the index of the tiles in the web-mercator grid."""
+    assert tiles.tile_index(0, 0, 0) == (0, 0)
+    assert tiles.tile_index(85, -180, 2) == (0, 0)
+    assert tiles.tile_index(-90, 180, 2) == (3, 3)
+    assert tiles.tile_index(48.85, 2.35, 10) == (518, 352)
+
+    return
@@ -0,0 +1,121 @@
+"""Test the vector schema helpers."""
+
+import os
+from pathlib import Path
+
+import ee
+import geopandas as gpd
+import pytest
+from shapely import geometry as sg
+
+from sepal_ui.scripts import vector
+
+
+def test_get_file_columns(points: Path) -> None:
+    """Check the columns are read once per file version.
+
+    Args:
+        points: the path to a vector file
+    """
+    assert vector.get_file_columns(points) == ["id", "name"]
+
+    hits = vector.schemas.stats()["hits"]
+    assert vector.get_file_columns(str(points)) == ["id", "name"]
+    assert vector.schemas.stats()["hits"] == hits + 1
+
+    # a modified file is read again
+    gdf = gpd.read_file(points).assign(new=1)
+    gdf.to_file(points)
+    os.utime(points, ns=(0, 0))
+    assert vector.get_file_columns(points) == ["id", "name", "new"]
+
+    return
+
+
+def test_get_file_values(points: Path) -> None:
+    """Check the distinct values of a single column are read.
+
+    Args:
+        points: the path to a vector file
+    """
+    assert vector.get_file_values(points, "name") == ["a", "b"]
+    assert vector.get_file_values(points, "id") == [0, 1, 2]
+
+    return
+
+
+@pytest.mark.skipif(not ee.data._credentials, reason="GEE is not set")
+def test_get_ee_columns() -> None:
+    """Check the columns and the values of a table are fetched separately."""
+    fc = ee.FeatureCollection("FAO/GAUL/2015/level0").filter(ee.Filter.eq("ADM0_CODE", 110))
+
+    columns = vector.get_ee_columns(fc)
+    assert "system:index" not in columns
+    assert "ADM0_NAME" in columns
+    assert vector.get_ee_columns(fc) is columns
+
+    assert vector.get_ee_values(fc, "ADM0_NAME") == ["Holy See"]
+
+    return
+
+
+def test_sorted() -> None:
+    """Check the mixed values are sorted as strings."""
+    assert vector._sorted([2, 10, 1]) == [1, 2, 10]
+    assert vector._sorted([2, None, "a"]) == [2, None, "a"]
+
+    return
+
+
+@pytest.fixture
+def points(tmp_path: Path) -> Path:
+    """Create a vector file with 3 points.
+
+    Returns:
+        the path to the file
+    """
+    file = tmp_path / "points.gpkg"
+    points = [sg.Point(i, i) for i in range(3)]
+    gdf = gpd.GeoDataFrame({"id": [0, 1, 2], "name": ["a", "b", "a"]}, geometry=points, crs=4326)
+    gdf.to_file(file)
+
+    return file
+
+
+@pytest.mark.parametrize("sep", [",", ";", "\t"])
+def test_get_table_columns(tmp_path: Path, sep: str) -> None:
+    """Check the header of the point tables is read with the sniffed delimiter.
+
+    Args:
+        tmp_path: the folder where to write the tables
+        sep: the delimiter of the table
+    """
+    file = tmp_path / "points.csv"
+    file.write_text(sep.join(["id", "lat", "lng", "name"]) + "\n" + sep.join("01ab") + "\n")
+
+    assert vector.get_delimiter(file) == sep
+    assert vector.get_table_columns(file) == ["id", "lat", "lng", "name"]
+
+    return
+
+
+def test_read_points(tmp_path: Path) -> None:
+    """Check only the selected columns are parsed and cached.
+
+    Args:
+        tmp_path: the folder where to write the table
+    """
+    file = tmp_path / "points.csv"
+    file.write_text("name;lat;id;lng\na;1.5;0;2.5\nb;3.5;1;4.5\n")
+
+    df = vector.read_points(file, ["id", "lng", "lat"])
+    assert df.columns.to_list() == ["id", "lng", "lat"]
+    assert df.lng.to_list() == [2.5, 4.5]
+
+    # the cached frame cannot be modified by the callers
+    df["id"] = 10
+    hits = vector.tables.stats()["hits"]
+    assert vector.read_points(file, ["id", "lng", "lat"]).id.to_list() == [0, 1]
+    assert vector.tables.stats()["hits"] == hits + 1
+
+    return
@@ -1,13 +1,14 @@
 """Test the AssetSelect widget."""
 
 from pathlib import Path
-from typing import List
+from typing import Iterator, List
 
 import ee
 import pytest
 
 from sepal_ui import sepalwidgets as sw
 from sepal_ui.message import ms
+from sepal_ui.scripts import gee
 
 
 @pytest.mark.skipif(not ee.data._credentials, reason="GEE is not set")
@@ -20,11 +21,13 @@ def test_init(gee_dir: Path, gee_user_dir: Path) -> None:
     """
     # create an asset select that points to the folder I created for testing
     asset_select = sw.AssetSelect(folder=str(gee_dir))
+    asset_select.future.result()
     assert isinstance(asset_select, sw.AssetSelect)
     assert str(gee_user_dir / "image") in asset_select.items
 
     # create an asset select with an undefined type
     asset_select = sw.AssetSelect(folder=str(gee_dir), types=["toto"])
+    asset_select.future.result()
 
     # zero assets are represented by a disabled item
     no_asset_item = [
@@ -100,12 +103,14 @@ def test_check_types(asset_select: sw.AssetSelect, gee_user_dir: Path) -> None:
         gee_user_dir: the path to the GEE directory
     """
     # check that the list of asset is complete
+    asset_select.future.result()
     assert str(gee_user_dir / "image") in asset_select.items
     assert str(gee_user_dir / "feature_collection") in asset_select.items
     assert str(gee_user_dir / "subfolder/subfolder_feature_collection") in asset_select.items
 
     # set an IMAGE type
     asset_select.types = ["IMAGE"]
+    asset_select.future.result()
     assert str(gee_user_dir / "image") in asset_select.items
     assert str(gee_user_dir / "feature_collection") not in asset_select.items
     assert str(gee_user_dir / "subfolder/subfolder_feature_collection") not in asset_select.items
@@ -128,6 +133,7 @@ def test_get_items(asset_select: sw.AssetSelect, gee_user_dir: Path) -> None:
     # test function itself
     asset_select.items = []
     asset_select._get_items()
+    asset_select.future.result()
 
     assert str(gee_user_dir / "image") in asset_select.items
 
@@ -136,10 +142,54 @@ def test_get_items(asset_select: sw.AssetSelect, gee_user_dir: Path) -> None:
     # that is 30 extra seconds so we cannot afford yet
     asset_select.items = []
     asset_select.fire_event("click:prepend", None)
+    asset_select.future.result()
 
     assert str(gee_user_dir / "image") in asset_select.items
 
 
+def test_get_items_errors(monkeypatch) -> None:
+    """Check that a failed listing does not leave the widget loading.
+
+    Args:
+        monkeypatch: the pytest patcher
+    """
+    folder = "projects/test/assets"
+    image = {"id": f"{folder}/image", "name": f"{folder}/image", "type": "IMAGE"}
+
+    def iter_assets(folder: str, refresh: bool = False) -> Iterator[dict]:
+        if fail_level == 0:
+            raise ee.EEException("Permission denied.")
+        yield {folder: [image]}
+        raise ee.EEException("Permission denied.")
+
+    monkeypatch.setattr(ee.data, "_credentials", True)
+    monkeypatch.setattr(gee, "iter_assets", iter_assets)
+
+    # the nested levels fail in the background
+    fail_level = 1
+    asset_select = sw.AssetSelect(folder=folder)
+    with pytest.raises(ee.EEException):
+        asset_select.future.result()
+    assert image["id"] in asset_select.items
+    assert asset_select.loading is False
+    assert asset_select.disabled is False
+    assert "Permission denied" in asset_select.error_messages
+
+    # the first level fails when the items are loaded
+    fail_level = 0
+    with pytest.raises(ee.EEException):
+        asset_select._get_items()
+    assert asset_select.loading is False
+    assert asset_select.disabled is False
+
+    # an outdated loading cannot set the items
+    items = asset_select.items
+    asset_select._set_items([], [], asset_select._load_id - 1)
+    assert asset_select.items == items
+
+    return
+
+
 @pytest.fixture(scope="session")
 def default_items() -> List[str]:
     """Some default public data from GEE.
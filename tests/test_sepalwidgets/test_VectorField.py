@@ -3,7 +3,9 @@
 from pathlib import Path
 
 import ee
+import geopandas as gpd
 import pytest
+from shapely import geometry as sg
 
 from sepal_ui import sepalwidgets as sw
 
@@ -125,6 +127,27 @@ def test_update_column(fake_vector: Path) -> None:
     return
 
 
+def test_df(tmp_path: Path) -> None:
+    """Check the deprecated dataframe of the selected file is still available.
+
+    Args:
+        tmp_path: the folder where the vector file is created
+    """
+    vector_file = tmp_path / "points.geojson"
+    points = [sg.Point(0, 0), sg.Point(1, 1)]
+    gpd.GeoDataFrame({"name": ["a", "b"]}, geometry=points, crs=4326).to_file(vector_file)
+
+    vector_field = sw.VectorField()
+    with pytest.deprecated_call():
+        assert vector_field.df is None
+
+    vector_field._update_file({"new": str(vector_file)})
+    with pytest.deprecated_call():
+        assert vector_field.df.columns.to_list() == ["name"]
+
+    return
+
+
 @pytest.mark.skipif(not ee.data._credentials, reason="GEE is not set")
 def test_update_column_gee(gee_dir: Path, fake_asset: Path) -> None:
     """Update a single column in a vector field in GEE context.
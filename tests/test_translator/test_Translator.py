@@ -8,7 +8,7 @@ import pytest
 
 from sepal_ui.conf import config_file
 from sepal_ui.message import ms
-from sepal_ui.translator import Translator
+from sepal_ui.translator import Translator, translator
 
 
 def test_init(translation_folder: Path, tmp_config_file: Path) -> None:
@@ -50,6 +50,37 @@ def test_init(translation_folder: Path, tmp_config_file: Path) -> None:
     return
 
 
+def test_bundle(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Check the compiled bundles are reused until a file is modified.
+
+    Args:
+        tmp_path: the folder used as cache and translation folder
+        monkeypatch: the pytest patcher
+    """
+    monkeypatch.setattr(translator, "cache_dir", tmp_path / "cache")
+    for lang, value in {"en": "Test key", "fr": "Clef de test"}.items():
+        (tmp_path / lang).mkdir()
+        (tmp_path / lang / "locale.json").write_text(json.dumps({"test_key": value}))
+
+    # the bundle is compiled once per locale
+    assert Translator(tmp_path, "fr").test_key == "Clef de test"
+    assert Translator(tmp_path, "en").test_key == "Test key"
+    bundles = list((tmp_path / "cache" / "translator").glob("*.json"))
+    assert len(bundles) == 2
+
+    # it's read from the disk in a new process
+    translator.bundles.clear()
+    bundle = next(b for b in bundles if "Clef" in b.read_text())
+    bundle.write_text(json.dumps({"test_key": "from bundle"}))
+    assert Translator(tmp_path, "fr").test_key == "from bundle"
+
+    # and recompiled when a file changes
+    (tmp_path / "fr" / "locale.json").write_text(json.dumps({"test_key": "Nouvelle clef"}))
+    assert Translator(tmp_path, "fr").test_key == "Nouvelle clef"
+
+    return
+
+
 def test_search_key() -> None:
     """Check that a key can be searched in the bbuild messages."""
     # assert that having a wrong key  at root level